@@ -4,16 +4,30 @@ from typing import Optional, Dict
 
 import jwt
 from fastapi import HTTPException, Depends, Request
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_db
 from app import models
+from app.config import AuthenticationSettings, User as Claims
+from app.utils.cache import TTLCache
 
 # ⚠️ en producción, usá variables de entorno
 SECRET_KEY = "change-me-in-env"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24h
 
+# Usuarios ya cargados por id: se guardan los valores de las columnas y cada
+# request arma su propia instancia (no se comparte un objeto ORM entre threads).
+# Invalidar con invalidar_usuario() después de cualquier cambio al usuario.
+# Lo dimensiona create_app con sus settings (ver configurar).
+_usuarios_cache = TTLCache(maxsize=0, ttl=0)
+
+def configurar(cfg: AuthenticationSettings) -> None:
+    """Cambia tamaño/TTL del cache de usuarios según AuthenticationSettings (arranca vacío)."""
+    global _usuarios_cache
+    _usuarios_cache = TTLCache(maxsize=cfg.user_cache_size, ttl=cfg.user_cache_ttl)
+
 def create_access_token(payload: Dict, expires_delta: Optional[timedelta] = None) -> str:
     data = payload.copy()
     # PyJWT exige sub string
@@ -26,7 +40,8 @@ def create_access_token(payload: Dict, expires_delta: Optional[timedelta] = None
 def decode_token(token: str) -> Dict:
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> models.Usuario:
+def get_current_claims(request: Request) -> Claims:
+    """Solo valida el JWT: id/username/rol salen del token, sin tocar la DB."""
     auth = request.headers.get("Authorization")
     if not auth or not auth.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Token inválido o no proporcionado")
@@ -49,7 +64,48 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> models.
     except ValueError:
         raise HTTPException(status_code=401, detail="Token inválido")
 
-    usuario = db.query(models.Usuario).filter(models.Usuario.id == user_id).first()
+    return Claims(
+        sub=user_id,
+        username=payload.get("username") or "",
+        rol=payload.get("rol"),
+        exp=payload.get("exp"),
+        token=token,
+    )
+
+def _datos_usuario(db: Session, usuario_id: int) -> Optional[Dict]:
+    """Columnas del usuario (del cache si está); None si ya no existe."""
+    datos = _usuarios_cache.get(usuario_id)
+    if datos is not None:
+        return datos
+
+    usuario = db.query(models.Usuario).filter(models.Usuario.id == usuario_id).first()
     if not usuario:
+        return None
+    datos = {c.key: getattr(usuario, c.key) for c in sa_inspect(models.Usuario).column_attrs}
+    if _usuarios_cache.maxsize > 0:
+        _usuarios_cache.set(usuario_id, datos)
+    return datos
+
+def get_current_user(
+    claims: Claims = Depends(get_current_claims), db: Session = Depends(get_db)
+) -> models.Usuario:
+    """Usuario del token; instancia propia del request, sin sesión (nada de lazy loads)."""
+    datos = _datos_usuario(db, claims.sub)
+    if datos is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    return usuario
+    return models.Usuario(**datos)
+
+def get_claims_vigentes(
+    claims: Claims = Depends(get_current_claims), db: Session = Depends(get_db)
+) -> Claims:
+    """
+    Como get_current_claims, pero además verifica que el usuario siga existiendo
+    (un token firmado sobrevive al borrado del usuario). Para rutas que escriben;
+    pasa por el cache de usuarios, así que en caliente no toca la DB.
+    """
+    if _datos_usuario(db, claims.sub) is None:
+        raise HTTPException(status_code=401, detail="Usuario inexistente")
+    return claims
+
+def invalidar_usuario(usuario_id: int) -> None:
+    _usuarios_cache.delete(usuario_id)
@@ -0,0 +1,118 @@
+# app/cli.py
+"""
+Comandos de mantenimiento:
+
+    python -m app.cli migraciones   # lista las migraciones pendientes
+    python -m app.cli migrar        # aplica las pendientes
+    python -m app.cli recontar-ocupados [--turno ID]
+    python -m app.cli reconstruir-estadisticas [--emprendedor ID] [--servicio ID]
+    python -m app.cli importar turnos|reservas ARCHIVO [--emprendedor ID] [--formato csv|ndjson]
+"""
+import argparse
+import sys
+
+from app import database
+from app import migrations
+from app.crud import estadisticas as crud_estadisticas
+from app.crud import importacion as crud_importacion
+from app.crud import reservas as crud_reservas
+
+
+def cmd_migraciones(args) -> int:
+    pendientes = migrations.pendientes(database.engine)
+    if not pendientes:
+        print("Sin migraciones pendientes")
+        return 0
+    for version, nombre in pendientes:
+        print(f"{version:04d}  {nombre}")
+    return 0
+
+
+def cmd_migrar(args) -> int:
+    aplicadas = migrations.migrar(database.engine)
+    for version, nombre in aplicadas:
+        print(f"aplicada {version:04d}  {nombre}")
+    if not aplicadas:
+        print("Sin migraciones pendientes")
+    return 0
+
+
+def cmd_recontar_ocupados(args) -> int:
+    db = database.SessionLocal()
+    try:
+        corregidos = crud_reservas.recontar_ocupados(db, args.turno)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Turnos corregidos: {corregidos}")
+    if corregidos:
+        print("Conviene correr reconstruir-estadisticas (el rollup usa ocupados)")
+    return 0
+
+
+def cmd_reconstruir_estadisticas(args) -> int:
+    db = database.SessionLocal()
+    try:
+        filas = crud_estadisticas.reconstruir_en(db, args.emprendedor, args.servicio)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Filas de estadísticas: {filas}")
+    return 0
+
+
+def cmd_importar(args) -> int:
+    formato = args.formato or ("csv" if args.archivo.lower().endswith(".csv") else "ndjson")
+    archivo = sys.stdin if args.archivo == "-" else open(args.archivo, encoding="utf-8-sig", newline="")
+    db = database.SessionLocal()
+    try:
+        origen = crud_importacion.filas(archivo, formato)
+        if args.que == "turnos":
+            reporte = crud_importacion.importar_turnos(
+                db, origen, args.emprendedor, args.permitir_superposicion, args.lote
+            )
+        else:
+            reporte = crud_importacion.importar_reservas(db, origen, args.emprendedor, args.lote)
+    finally:
+        db.close()
+        if archivo is not sys.stdin:
+            archivo.close()
+    for e in reporte["detalle"]:
+        print(f"fila {e['fila']}: {e['error']}", file=sys.stderr)
+    if reporte["detalle_truncado"]:
+        print(f"… y {reporte['errores'] - len(reporte['detalle'])} errores más", file=sys.stderr)
+    print(f"Procesadas: {reporte['procesadas']}  importadas: {reporte['importadas']}  con error: {reporte['errores']}")
+    return 1 if reporte["errores"] else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    sub.add_parser("migraciones", help="lista las migraciones pendientes").set_defaults(fn=cmd_migraciones)
+    sub.add_parser("migrar", help="aplica las migraciones pendientes").set_defaults(fn=cmd_migrar)
+
+    p = sub.add_parser("recontar-ocupados", help="recalcula Turno.ocupados desde reservas")
+    p.add_argument("--turno", type=int, default=None, help="solo este turno")
+    p.set_defaults(fn=cmd_recontar_ocupados)
+
+    p = sub.add_parser("reconstruir-estadisticas", help="recalcula el rollup diario desde turnos")
+    p.add_argument("--emprendedor", type=int, default=None, help="solo este emprendedor")
+    p.add_argument("--servicio", type=int, default=None, help="solo este servicio")
+    p.set_defaults(fn=cmd_reconstruir_estadisticas)
+
+    p = sub.add_parser("importar", help="importa turnos o reservas desde CSV/NDJSON (en lotes)")
+    p.add_argument("que", choices=["turnos", "reservas"])
+    p.add_argument("archivo", help="ruta, o - para stdin")
+    p.add_argument("--formato", choices=crud_importacion.FORMATOS, default=None, help="default: según la extensión")
+    p.add_argument("--emprendedor", type=int, default=None, help="solo servicios/turnos de este emprendedor")
+    p.add_argument("--permitir-superposicion", action="store_true", help="turnos: no rechazar superpuestos")
+    p.add_argument("--lote", type=int, default=crud_importacion.TAMANO_LOTE, help="filas por transacción")
+    p.set_defaults(fn=cmd_importar)
+
+    args = parser.parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,18 @@
 # examples/standard/app/config.py
 
+import os
+
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 
 
+def _env_bool(nombre: str, defecto: bool = False) -> bool:
+    valor = os.getenv(nombre)
+    if valor is None:
+        return defecto
+    return valor.strip().lower() in ("1", "true", "yes", "si", "on")
+
+
 class User(BaseModel):
     username: str
     password: str
@@ -15,6 +24,28 @@ class AuthenticationSettings(BaseModel):
     jwt_algorithm: str = "HS256"
     expiration_seconds: int = 3600 * 24  # 1 hour
 
+    # Cache de usuarios de get_current_user (0 = sin cache)
+    user_cache_size: int = 2048
+    user_cache_ttl: int = 60  # segundos
+
+    # bcrypt: costo y executor propio (ver app/utils/passwords.py)
+    bcrypt_rounds: int = 12
+    hash_executor: str = "thread"  # "thread" | "process"
+    hash_workers: int = 2
+    hash_max_pending: int = 64  # más que esto en cola → 503
+
+    @classmethod
+    def from_env(cls) -> "AuthenticationSettings":
+        d = cls()
+        return cls(
+            user_cache_size=int(os.getenv("AUTH_USER_CACHE_SIZE", d.user_cache_size)),
+            user_cache_ttl=int(os.getenv("AUTH_USER_CACHE_TTL", d.user_cache_ttl)),
+            bcrypt_rounds=int(os.getenv("BCRYPT_ROUNDS", d.bcrypt_rounds)),
+            hash_executor=os.getenv("PASSWORD_HASH_EXECUTOR", d.hash_executor),
+            hash_workers=int(os.getenv("PASSWORD_HASH_WORKERS", d.hash_workers)),
+            hash_max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", d.hash_max_pending)),
+        )
+
     
 # 👇 este es el schema que el middleware usa para request.state.user
 class User(BaseModel):
@@ -24,4 +55,179 @@ class User(BaseModel):
     exp: int | None = None
     token: str | None = None
 
-__all__ = ["AuthenticationSettings"]
\ No newline at end of file
+# =========================
+# Base de datos
+# =========================
+class DatabaseSettings(BaseModel):
+    url: str = "sqlite:///./basedatos.db"
+    # DB_ASYNC=1 → AsyncSession (aiosqlite) SOLO en las lecturas del catálogo
+    # (routers/catalogo_async.py) y en los horarios (routers/horarios_async.py).
+    # Todo lo demás sigue sync en el threadpool, con este flag o sin él: reservas,
+    # /turnos/* (altas, bulk, cambios), /mis/agenda, disponibilidad, usuarios e importación
+    async_mode: bool = False
+    # Aplicar migraciones pendientes al arrancar (con varios workers: DB_AUTO_MIGRATE=0
+    # y correr `python -m app.cli migrar` en el deploy)
+    auto_migrate: bool = True
+
+    # Pool (no aplica a SQLite en memoria)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_recycle: int = 1800  # segundos
+    pool_timeout: int = 30
+
+    # PRAGMAs que se aplican en cada conexión SQLite
+    sqlite_journal_mode: str = "WAL"       # lectores y escritor no se bloquean
+    sqlite_synchronous: str = "NORMAL"     # con WAL: fsync en checkpoint, no en cada commit
+    sqlite_busy_timeout: int = 5000        # ms esperando el lock antes de "database is locked"
+    sqlite_cache_size: int = -20000        # negativo = KiB (≈20 MB)
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        d = cls()
+        return cls(
+            url=os.getenv("DATABASE_URL", d.url),
+            async_mode=_env_bool("DB_ASYNC", d.async_mode),
+            auto_migrate=_env_bool("DB_AUTO_MIGRATE", d.auto_migrate),
+            pool_size=int(os.getenv("DB_POOL_SIZE", d.pool_size)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", d.max_overflow)),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", d.pool_recycle)),
+            pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", d.pool_timeout)),
+            sqlite_journal_mode=os.getenv("SQLITE_JOURNAL_MODE", d.sqlite_journal_mode),
+            sqlite_synchronous=os.getenv("SQLITE_SYNCHRONOUS", d.sqlite_synchronous),
+            sqlite_busy_timeout=int(os.getenv("SQLITE_BUSY_TIMEOUT", d.sqlite_busy_timeout)),
+            sqlite_cache_size=int(os.getenv("SQLITE_CACHE_SIZE", d.sqlite_cache_size)),
+            sqlite_mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", d.sqlite_mmap_size)),
+        )
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.url.startswith("sqlite")
+
+    @property
+    def is_memory(self) -> bool:
+        return self.is_sqlite and (self.url.endswith(":memory:") or self.url.rstrip("/") == "sqlite:")
+
+
+# =========================
+# API
+# =========================
+class ApiSettings(BaseModel):
+    # API_FAST_JSON=1 → listas grandes por filas (.mappings()) + TypeAdapter + orjson
+    # (ver app/utils/serializacion.py). El OpenAPI no cambia.
+    fast_json: bool = False
+    # Latencia/status/queries por ruta en GET /metrics (ver app/utils/metricas.py).
+    # Opt-in (API_METRICS=1): /metrics, /cache/respuestas y /push/estadisticas no
+    # piden token; exponerlos solo en la red interna
+    metrics: bool = False
+    server_timing: bool = False  # header Server-Timing: db;dur=..., app;dur=...
+
+    @classmethod
+    def from_env(cls) -> "ApiSettings":
+        d = cls()
+        return cls(
+            fast_json=_env_bool("API_FAST_JSON", d.fast_json),
+            metrics=_env_bool("API_METRICS", d.metrics),
+            server_timing=_env_bool("API_SERVER_TIMING", d.server_timing),
+        )
+
+
+# =========================
+# Agenda pública
+# =========================
+class AgendaSettings(BaseModel):
+    # Turnos próximos que se anidan en servicios_por_codigo (los pasados nunca)
+    horizonte_dias: int = 30
+    # Ventana del feed .ics (ver app/utils/ical.py)
+    ical_dias_atras: int = 30
+    ical_dias_adelante: int = 90
+    # Los Horario son horas de reloj en esta zona; los turnos se guardan en UTC
+    # (ver app/utils/zona.py)
+    zona_horaria: str = "America/Argentina/Buenos_Aires"
+
+    @classmethod
+    def from_env(cls) -> "AgendaSettings":
+        d = cls()
+        return cls(
+            horizonte_dias=int(os.getenv("AGENDA_HORIZONTE_DIAS", d.horizonte_dias)),
+            ical_dias_atras=int(os.getenv("AGENDA_ICAL_DIAS_ATRAS", d.ical_dias_atras)),
+            ical_dias_adelante=int(os.getenv("AGENDA_ICAL_DIAS_ADELANTE", d.ical_dias_adelante)),
+            zona_horaria=os.getenv("AGENDA_ZONA_HORARIA", d.zona_horaria),
+        )
+
+
+# =========================
+# Cache de respuestas
+# =========================
+class CacheSettings(BaseModel):
+    # Catálogo público (ver app/utils/respuestas.py). "memoria" | "off"
+    response_backend: str = "memoria"
+    response_size: int = 1024  # entradas
+    response_ttl: int = 300    # segundos; la invalidación por escritura es inmediata
+
+    @classmethod
+    def from_env(cls) -> "CacheSettings":
+        d = cls()
+        return cls(
+            response_backend=os.getenv("RESPONSE_CACHE", d.response_backend),
+            response_size=int(os.getenv("RESPONSE_CACHE_SIZE", d.response_size)),
+            response_ttl=int(os.getenv("RESPONSE_CACHE_TTL", d.response_ttl)),
+        )
+
+
+# =========================
+# Push (SSE / WebSocket)
+# =========================
+class PushSettings(BaseModel):
+    # Ver app/utils/push.py
+    cola: int = 256                # mensajes pendientes por conexión antes de mandar "resync"
+    max_conexiones: int = 10_000   # por proceso; las que sobran reciben 503
+    ping: float = 15.0             # segundos sin mensajes hasta mandar un comentario SSE
+
+    @classmethod
+    def from_env(cls) -> "PushSettings":
+        d = cls()
+        return cls(
+            cola=int(os.getenv("PUSH_COLA", d.cola)),
+            max_conexiones=int(os.getenv("PUSH_MAX_CONEXIONES", d.max_conexiones)),
+            ping=float(os.getenv("PUSH_PING", d.ping)),
+        )
+
+
+class Settings(BaseModel):
+    database: DatabaseSettings = Field(default_factory=DatabaseSettings)
+    auth: AuthenticationSettings = Field(default_factory=AuthenticationSettings)
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    agenda: AgendaSettings = Field(default_factory=AgendaSettings)
+    api: ApiSettings = Field(default_factory=ApiSettings)
+    push: PushSettings = Field(default_factory=PushSettings)
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            database=DatabaseSettings.from_env(),
+            auth=AuthenticationSettings.from_env(),
+            cache=CacheSettings.from_env(),
+            agenda=AgendaSettings.from_env(),
+            api=ApiSettings.from_env(),
+            push=PushSettings.from_env(),
+        )
+
+
+_settings: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    global _settings
+    if _settings is None:
+        _settings = Settings.from_env()
+    return _settings
+
+
+def usar_settings(settings: Settings) -> None:
+    """Reemplaza la config del proceso (ver app.main.create_app)."""
+    global _settings
+    _settings = settings
+
+
+__all__ = ["AgendaSettings", "ApiSettings", "AuthenticationSettings", "CacheSettings", "DatabaseSettings", "Settings", "get_settings", "usar_settings"]
\ No newline at end of file
@@ -0,0 +1,231 @@
+# app/crud/estadisticas.py
+"""
+Rollup diario de reservas/ingresos/ocupación (models.EstadisticaDiaria).
+
+Se actualiza incrementalmente en la misma transacción que cada escritura de
+turnos y reservas, así el dashboard lee solo el rollup. Nada de esto hace commit.
+Los UPDATE de suma no tienen carrera en SQLite: corren después de que la
+transacción ya tomó el lock de escritura.
+
+Los días son del calendario LOCAL (AGENDA_ZONA_HORARIA), no de UTC: un turno
+del lunes 22:00 en Buenos Aires cuenta para el lunes. Si cambia la zona hay
+que correr `reconstruir-estadisticas`.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import String, cast, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils.zona import a_local
+
+E = models.EstadisticaDiaria
+precio_efectivo = func.coalesce(models.Turno.precio, models.Servicio.precio, 0)
+LOTE = 1000
+
+
+def dia_local(valor) -> date:
+    """Día del rollup: un datetime (UTC sin zona) va al día local; un date queda igual."""
+    return a_local(valor).date() if isinstance(valor, datetime) else valor
+
+
+def sumar(db: Session, emprendedor_id: int, servicio_id: int, dia, *,
+          turnos=0, cupos=0, reservas=0, ingresos=0.0) -> None:
+    dia = dia_local(dia)
+    clave = (E.emprendedor_id == emprendedor_id, E.servicio_id == servicio_id, E.dia == dia)
+    hecho = db.execute(
+        update(E).where(*clave).values(
+            turnos=E.turnos + turnos,
+            cupos=E.cupos + cupos,
+            reservas=E.reservas + reservas,
+            ingresos=E.ingresos + ingresos,
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    if not hecho:
+        db.execute(insert(E).values(
+            emprendedor_id=emprendedor_id, servicio_id=servicio_id, dia=dia,
+            turnos=turnos, cupos=cupos, reservas=reservas, ingresos=ingresos,
+        ))
+    elif turnos < 0:
+        # Día sin turnos: la fila no aporta nada, igual que si nunca hubiera existido
+        db.execute(delete(E).where(*clave, E.turnos <= 0))
+
+
+def datos_turno(db: Session, turno_id: int):
+    """(emprendedor_id, servicio_id, fecha_hora_inicio, capacidad, ocupados, precio) del turno."""
+    return db.execute(
+        select(
+            models.Servicio.emprendedor_id,
+            models.Turno.servicio_id,
+            models.Turno.fecha_hora_inicio,
+            models.Turno.capacidad,
+            models.Turno.ocupados,
+            precio_efectivo.label("precio"),
+        )
+        .join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
+        .where(models.Turno.id == turno_id)
+    ).first()
+
+
+def aplicar_turno(db: Session, t, signo: int = 1) -> None:
+    """Suma (o resta con signo=-1) el aporte completo de un turno (fila de datos_turno)."""
+    if t is None:
+        return
+    sumar(
+        db, t.emprendedor_id, t.servicio_id, t.fecha_hora_inicio,
+        turnos=signo, cupos=signo * t.capacidad, reservas=signo * (t.ocupados or 0),
+        ingresos=signo * (t.ocupados or 0) * (t.precio or 0),
+    )
+
+
+def aplicar_turnos_nuevos(db: Session, emprendedor_id: int, servicio_id: int, filas: Iterable[dict]) -> None:
+    """Alta masiva: un UPDATE/INSERT por día, no por turno."""
+    por_dia = defaultdict(lambda: [0, 0])
+    for f in filas:
+        acc = por_dia[dia_local(f["fecha_hora_inicio"])]
+        acc[0] += 1
+        acc[1] += f["capacidad"]
+    for dia, (turnos, cupos) in por_dia.items():
+        sumar(db, emprendedor_id, servicio_id, dia, turnos=turnos, cupos=cupos)
+
+
+def aplicar_reserva(db: Session, turno_id: int, signo: int = 1):
+    """Devuelve la fila de datos_turno, ya con `ocupados` actualizado (None si no existe)."""
+    t = datos_turno(db, turno_id)
+    if t is None:
+        return None
+    sumar(
+        db, t.emprendedor_id, t.servicio_id, t.fecha_hora_inicio,
+        reservas=signo, ingresos=signo * (t.precio or 0),
+    )
+    return t
+
+
+def quitar_reservas_de_usuario(db: Session, usuario_id: int) -> set:
+    """Devuelve los emprendedor_id afectados."""
+    filas = db.execute(
+        select(
+            models.Servicio.emprendedor_id,
+            models.Turno.servicio_id,
+            models.Turno.fecha_hora_inicio,
+            precio_efectivo.label("precio"),
+        )
+        .select_from(models.Reserva)
+        .join(models.Turno, models.Reserva.turno_id == models.Turno.id)
+        .join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
+        .where(models.Reserva.usuario_id == usuario_id)
+    ).all()
+    por_clave = defaultdict(lambda: [0, 0.0])
+    for f in filas:
+        acc = por_clave[(f.emprendedor_id, f.servicio_id, dia_local(f.fecha_hora_inicio))]
+        acc[0] += 1
+        acc[1] += f.precio or 0
+    for (emprendedor_id, servicio_id, dia), (n, ingresos) in por_clave.items():
+        sumar(db, emprendedor_id, servicio_id, dia, reservas=-n, ingresos=-ingresos)
+    return {emprendedor_id for emprendedor_id, _, _ in por_clave}
+
+
+def _filtro(tabla_emp, tabla_serv, emprendedor_id, servicio_id):
+    cond = []
+    if emprendedor_id is not None:
+        cond.append(tabla_emp == emprendedor_id)
+    if servicio_id is not None:
+        cond.append(tabla_serv == servicio_id)
+    return cond
+
+
+def reconstruir_en(conn, emprendedor_id: Optional[int] = None, servicio_id: Optional[int] = None) -> int:
+    """
+    Recalcula desde turnos (reservas = Turno.ocupados, no hace falta leer reservas).
+    Agrupa por día local en Python: pasar de UTC a la zona del negocio no es SQL portable.
+    Sirve tanto con Connection (migración) como con Session.
+    """
+    conn.execute(delete(E).where(*_filtro(E.emprendedor_id, E.servicio_id, emprendedor_id, servicio_id)))
+    filas = conn.execute(
+        select(
+            models.Servicio.emprendedor_id,
+            models.Turno.servicio_id,
+            models.Turno.fecha_hora_inicio,
+            models.Turno.capacidad,
+            models.Turno.ocupados,
+            (models.Turno.ocupados * precio_efectivo).label("ingresos"),
+        )
+        .join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
+        .where(*_filtro(models.Servicio.emprendedor_id, models.Turno.servicio_id, emprendedor_id, servicio_id))
+        .execution_options(yield_per=LOTE)
+    )
+    por_clave = defaultdict(lambda: [0, 0, 0, 0.0])
+    for f in filas:
+        acc = por_clave[(f.emprendedor_id, f.servicio_id, dia_local(f.fecha_hora_inicio))]
+        acc[0] += 1
+        acc[1] += f.capacidad
+        acc[2] += f.ocupados
+        acc[3] += f.ingresos or 0
+    if por_clave:
+        conn.execute(insert(E), [
+            {
+                "emprendedor_id": emprendedor_id, "servicio_id": servicio_id, "dia": dia,
+                "turnos": turnos, "cupos": cupos, "reservas": reservas, "ingresos": ingresos,
+            }
+            for (emprendedor_id, servicio_id, dia), (turnos, cupos, reservas, ingresos) in por_clave.items()
+        ])
+    return len(por_clave)
+
+
+def borrar(db: Session, emprendedor_id: Optional[int] = None, servicio_id: Optional[int] = None) -> None:
+    db.execute(delete(E).where(*_filtro(E.emprendedor_id, E.servicio_id, emprendedor_id, servicio_id)))
+
+
+def consultar(
+    db: Session,
+    emprendedor_id: int,
+    granularidad: str = "dia",
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    servicio_id: Optional[int] = None,
+):
+    """Series por período y totales por servicio, leyendo solo el rollup."""
+    periodo = E.dia if granularidad == "dia" else func.substr(cast(E.dia, String), 1, 7)
+    cond = [E.emprendedor_id == emprendedor_id]
+    if servicio_id is not None:
+        cond.append(E.servicio_id == servicio_id)
+    if desde is not None:
+        cond.append(E.dia >= desde)
+    if hasta is not None:
+        cond.append(E.dia <= hasta)
+
+    sumas = (
+        func.sum(E.turnos).label("turnos"),
+        func.sum(E.cupos).label("cupos"),
+        func.sum(E.reservas).label("reservas"),
+        func.sum(E.ingresos).label("ingresos"),
+    )
+    periodos = db.execute(
+        select(periodo.label("periodo"), *sumas).where(*cond).group_by(periodo).order_by(periodo)
+    ).all()
+    por_servicio = db.execute(
+        select(E.servicio_id, *sumas).where(*cond).group_by(E.servicio_id).order_by(E.servicio_id)
+    ).all()
+
+    def fila(r, **extra):
+        return {
+            **extra,
+            "turnos": r.turnos or 0,
+            "cupos": r.cupos or 0,
+            "reservas": r.reservas or 0,
+            "ingresos": round(r.ingresos or 0, 2),
+            "ocupacion": round((r.reservas or 0) / r.cupos, 4) if r.cupos else 0.0,
+        }
+
+    serie = [fila(r, periodo=str(r.periodo)) for r in periodos]
+    total = {k: sum(p[k] for p in serie) for k in ("turnos", "cupos", "reservas", "ingresos")}
+    total["ingresos"] = round(total["ingresos"], 2)
+    total["ocupacion"] = round(total["reservas"] / total["cupos"], 4) if total["cupos"] else 0.0
+    return {
+        "granularidad": granularidad,
+        "periodos": serie,
+        "por_servicio": [fila(r, servicio_id=r.servicio_id) for r in por_servicio],
+        "totales": total,
+    }
@@ -2,6 +2,7 @@
 from sqlalchemy.orm import Session
 from app.models import Horario
 from app.schemas import HorarioCreate
+from app.utils.cambios import registrar_cambio
 
 def get_horarios(db: Session, emprendedor_id: int):
     return db.query(Horario).filter(Horario.emprendedor_id == emprendedor_id).all()
@@ -9,6 +10,7 @@ def get_horarios(db: Session, emprendedor_id: int):
 def create_horario(db: Session, emprendedor_id: int, horario: HorarioCreate):
     db_horario = Horario(**horario.dict(), emprendedor_id=emprendedor_id)
     db.add(db_horario)
+    registrar_cambio(db, emprendedor_id, "horario")
     db.commit()
     db.refresh(db_horario)
     return db_horario
@@ -19,6 +21,7 @@ def update_horario(db: Session, horario_id: int, horario: HorarioCreate):
         return None
     for key, value in horario.dict().items():
         setattr(db_horario, key, value)
+    registrar_cambio(db, db_horario.emprendedor_id, "horario")
     db.commit()
     db.refresh(db_horario)
     return db_horario
@@ -28,5 +31,6 @@ def delete_horario(db: Session, horario_id: int):
     if not db_horario:
         return None
     db.delete(db_horario)
+    registrar_cambio(db, db_horario.emprendedor_id, "horario")
     db.commit()
     return True
\ No newline at end of file
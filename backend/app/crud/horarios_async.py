@@ -0,0 +1,45 @@
+# app/crud/horarios_async.py
+# Versión AsyncSession de app/crud/horarios.py (modo DB_ASYNC=1)
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Horario
+from app.schemas import HorarioCreate
+from app.utils.cambios import registrar_cambio
+
+async def get_horarios(db: AsyncSession, emprendedor_id: int):
+    result = await db.execute(select(Horario).where(Horario.emprendedor_id == emprendedor_id))
+    return result.scalars().all()
+
+async def create_horario(db: AsyncSession, emprendedor_id: int, horario: HorarioCreate):
+    db_horario = Horario(**horario.dict(), emprendedor_id=emprendedor_id)
+    db.add(db_horario)
+    registrar_cambio(db, emprendedor_id, "horario")
+    await db.commit()
+    await db.refresh(db_horario)
+    return db_horario
+
+async def replace_horarios(db: AsyncSession, emprendedor_id: int, horarios: list[HorarioCreate]):
+    await db.execute(delete(Horario).where(Horario.emprendedor_id == emprendedor_id))
+    db.add_all([Horario(**h.dict(), emprendedor_id=emprendedor_id) for h in horarios])
+    registrar_cambio(db, emprendedor_id, "horario")
+    await db.commit()
+
+async def update_horario(db: AsyncSession, horario_id: int, horario: HorarioCreate):
+    db_horario = await db.get(Horario, horario_id)
+    if not db_horario:
+        return None
+    for key, value in horario.dict().items():
+        setattr(db_horario, key, value)
+    registrar_cambio(db, db_horario.emprendedor_id, "horario")
+    await db.commit()
+    await db.refresh(db_horario)
+    return db_horario
+
+async def delete_horario(db: AsyncSession, horario_id: int):
+    db_horario = await db.get(Horario, horario_id)
+    if not db_horario:
+        return None
+    await db.delete(db_horario)
+    registrar_cambio(db, db_horario.emprendedor_id, "horario")
+    await db.commit()
+    return True
@@ -0,0 +1,343 @@
+# app/crud/importacion.py
+"""
+Importación masiva de turnos y reservas desde CSV o NDJSON (endpoint y CLI).
+
+Todo es streaming: las filas se leen de a una, se agrupan en lotes de
+TAMANO_LOTE y cada lote se valida, resuelve (un SELECT por tabla y lote) e
+inserta en su propia transacción. Una fila inválida no frena la carga: queda en
+el reporte con su número (la primera fila de datos es la 1) y el resto sigue.
+La memoria depende del tamaño del lote, no del archivo.
+
+Columnas:
+  turnos:   servicio_id | servicio (nombre, requiere emprendedor), fecha_hora_inicio,
+            duracion_minutos, capacidad, precio (opcional)
+  reservas: turno_id, usuario_id | email
+"""
+import codecs
+import csv
+import json
+from collections import defaultdict
+from contextlib import ExitStack
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.crud import estadisticas
+from app.crud import turnos as crud_turnos
+from app.utils import agenda
+from app.utils.agenda import naive_utc
+from app.utils.cambios import registrar_cambio
+
+TAMANO_LOTE = 1000
+MAX_ERRORES_DETALLE = 1000  # el resto solo se cuenta
+FORMATOS = ("csv", "ndjson")
+
+Fila = Tuple[int, object]  # (número, dict | mensaje de error de parseo)
+
+
+class Reporte:
+    def __init__(self):
+        self.procesadas = 0
+        self.importadas = 0
+        self.errores = 0
+        self.detalle: List[dict] = []
+
+    def error(self, fila: int, mensaje: str) -> None:
+        self.errores += 1
+        if len(self.detalle) < MAX_ERRORES_DETALLE:
+            self.detalle.append({"fila": fila, "error": mensaje})
+
+    def como_dict(self) -> dict:
+        return {
+            "procesadas": self.procesadas,
+            "importadas": self.importadas,
+            "errores": self.errores,
+            "detalle": sorted(self.detalle, key=lambda e: e["fila"]),
+            "detalle_truncado": self.errores > len(self.detalle),
+        }
+
+
+# =========================
+# Lectura
+# =========================
+def lineas(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Bytes en pedazos arbitrarios → líneas de texto (con su \\n, como las da un archivo)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = ""
+    for chunk in chunks:
+        resto += decoder.decode(chunk)
+        *completas, resto = resto.split("\n")
+        for linea in completas:
+            yield linea + "\n"
+    resto += decoder.decode(b"", final=True)
+    if resto:
+        yield resto
+
+
+def filas(lineas_texto: Iterable[str], formato: str) -> Iterator[Fila]:
+    if formato == "csv":
+        lector = csv.DictReader(lineas_texto)
+        for nro, fila in enumerate(lector, start=1):
+            if None in fila:
+                yield nro, "Más columnas que el encabezado"
+                continue
+            # celdas vacías = campo ausente (ej. precio opcional)
+            yield nro, {k.strip(): v for k, v in fila.items() if k and v not in (None, "")}
+        return
+    nro = 0
+    for linea in lineas_texto:
+        if not linea.strip():
+            continue
+        nro += 1
+        try:
+            fila = json.loads(linea)
+        except ValueError as exc:
+            yield nro, f"JSON inválido: {exc}"
+            continue
+        yield nro, fila if isinstance(fila, dict) else "Cada línea tiene que ser un objeto JSON"
+
+
+def _lotes(origen: Iterable[Fila], tamano: int) -> Iterator[List[Fila]]:
+    it = iter(origen)
+    while True:
+        lote = list(islice(it, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def _mensaje(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc']) or 'fila'}: {e['msg']}" for e in exc.errors()
+    )
+
+
+# =========================
+# Turnos
+# =========================
+def importar_turnos(
+    db: Session,
+    origen: Iterable[Fila],
+    emprendedor_id: Optional[int] = None,
+    permitir_superposicion: bool = False,
+    tamano_lote: int = TAMANO_LOTE,
+) -> dict:
+    """Con `emprendedor_id`, solo acepta servicios de ese emprendedor."""
+    reporte = Reporte()
+    for lote in _lotes(origen, tamano_lote):
+        reporte.procesadas += len(lote)
+        _lote_turnos(db, lote, reporte, emprendedor_id, permitir_superposicion)
+    return reporte.como_dict()
+
+
+def _lote_turnos(db, lote, reporte, emprendedor_id, permitir_superposicion):
+    # Nombres de servicio → id, en un solo SELECT (solo con emprendedor conocido)
+    nombres = {f["servicio"] for _, f in lote if isinstance(f, dict) and "servicio_id" not in f and "servicio" in f}
+    por_nombre = {}
+    if nombres and emprendedor_id is not None:
+        por_nombre = dict(db.execute(
+            select(models.Servicio.nombre, models.Servicio.id)
+            .where(models.Servicio.emprendedor_id == emprendedor_id, models.Servicio.nombre.in_(nombres))
+        ).all())
+
+    validas = []
+    for nro, fila in lote:
+        if not isinstance(fila, dict):
+            reporte.error(nro, fila)
+            continue
+        if "servicio_id" not in fila and "servicio" in fila:
+            if emprendedor_id is None:
+                reporte.error(nro, "Para usar `servicio` por nombre hay que indicar el emprendedor")
+                continue
+            if fila["servicio"] not in por_nombre:
+                reporte.error(nro, f"Servicio '{fila['servicio']}' no encontrado")
+                continue
+            fila = {**fila, "servicio_id": por_nombre[fila["servicio"]]}
+        try:
+            validas.append((nro, schemas.TurnoCreate.model_validate(fila)))
+        except ValidationError as exc:
+            reporte.error(nro, _mensaje(exc))
+
+    q = select(models.Servicio.id, models.Servicio.emprendedor_id).where(
+        models.Servicio.id.in_({t.servicio_id for _, t in validas})
+    )
+    if emprendedor_id is not None:
+        q = q.where(models.Servicio.emprendedor_id == emprendedor_id)
+    duenio = dict(db.execute(q).all()) if validas else {}
+
+    por_emprendedor: Dict[int, list] = defaultdict(list)
+    for nro, t in validas:
+        if t.servicio_id not in duenio:
+            reporte.error(nro, f"Servicio {t.servicio_id} no encontrado")
+            continue
+        por_emprendedor[duenio[t.servicio_id]].append((nro, t))
+    if not por_emprendedor:
+        return
+
+    # Mismo lock que crear_turno: validar → insertar → commit sin carreras
+    with ExitStack() as locks:
+        for lk in agenda.locks(por_emprendedor):
+            locks.enter_context(lk)
+        importadas = 0
+        for eid, items in por_emprendedor.items():
+            items = [
+                (nro, t, inicio, agenda.fin_de(inicio, t.duracion_minutos))
+                for nro, t in items
+                for inicio in (naive_utc(t.fecha_hora_inicio),)
+            ]
+            # Turnos del rango del lote, leídos con la agenda ya bloqueada
+            agenda.bloquear(db, eid)
+            idx = agenda.indice(db, eid, min(i[2] for i in items), max(i[3] for i in items))
+            en_lote = agenda.AgendaIndex()  # superposiciones entre filas del mismo archivo
+            por_servicio: Dict[int, List[dict]] = defaultdict(list)
+            for nro, t, inicio, fin in items:
+                error = agenda.problema(idx, inicio, fin, permitir_superposicion=permitir_superposicion)
+                if error is None and not permitir_superposicion and en_lote.superpuestos(inicio, fin):
+                    error = 409, f"El turno de {inicio.isoformat()} se superpone con otra fila del archivo"
+                if error:
+                    reporte.error(nro, error[1])
+                    continue
+                en_lote.agregar(nro, inicio, fin)
+                por_servicio[t.servicio_id].append({
+                    "fecha_hora_inicio": inicio, "duracion_minutos": t.duracion_minutos,
+                    "capacidad": t.capacidad, "precio": t.precio,
+                })
+
+            for sid, nuevas in por_servicio.items():
+                crud_turnos.insertar_turnos(db, sid, nuevas)
+                estadisticas.aplicar_turnos_nuevos(db, eid, sid, nuevas)
+            if por_servicio:
+                registrar_cambio(db, eid, "turno")
+                importadas += sum(len(nuevas) for nuevas in por_servicio.values())
+        db.commit()
+    reporte.importadas += importadas
+
+
+# =========================
+# Reservas
+# =========================
+def importar_reservas(
+    db: Session,
+    origen: Iterable[Fila],
+    emprendedor_id: Optional[int] = None,
+    tamano_lote: int = TAMANO_LOTE,
+) -> dict:
+    """Con `emprendedor_id`, solo acepta turnos de servicios de ese emprendedor."""
+    reporte = Reporte()
+    for lote in _lotes(origen, tamano_lote):
+        reporte.procesadas += len(lote)
+        _lote_reservas(db, lote, reporte, emprendedor_id)
+    return reporte.como_dict()
+
+
+def _lote_reservas(db, lote, reporte, emprendedor_id):
+    emails = {f["email"] for _, f in lote if isinstance(f, dict) and "usuario_id" not in f and "email" in f}
+    por_email = dict(db.execute(
+        select(models.Usuario.email, models.Usuario.id).where(models.Usuario.email.in_(emails))
+    ).all()) if emails else {}
+
+    validas = []
+    for nro, fila in lote:
+        if not isinstance(fila, dict):
+            reporte.error(nro, fila)
+            continue
+        if "usuario_id" not in fila and "email" in fila:
+            if fila["email"] not in por_email:
+                reporte.error(nro, f"Usuario '{fila['email']}' no encontrado")
+                continue
+            fila = {**fila, "usuario_id": por_email[fila["email"]]}
+        try:
+            validas.append((nro, schemas.ReservaCreate.model_validate(fila)))
+        except ValidationError as exc:
+            reporte.error(nro, _mensaje(exc))
+    if not validas:
+        return
+
+    turno_ids = {r.turno_id for _, r in validas}
+    usuario_ids = {r.usuario_id for _, r in validas}
+    q = (
+        select(
+            models.Turno.id, models.Turno.capacidad, models.Turno.ocupados,
+            models.Turno.servicio_id, models.Turno.fecha_hora_inicio,
+            models.Servicio.emprendedor_id, estadisticas.precio_efectivo.label("precio"),
+        )
+        .join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
+        .where(models.Turno.id.in_(turno_ids))
+    )
+    if emprendedor_id is not None:
+        q = q.where(models.Servicio.emprendedor_id == emprendedor_id)
+    turnos = {t.id: t for t in db.execute(q).all()}
+    usuarios = set(db.scalars(select(models.Usuario.id).where(models.Usuario.id.in_(usuario_ids))))
+    tomadas = set(db.execute(
+        select(models.Reserva.turno_id, models.Reserva.usuario_id).where(
+            models.Reserva.turno_id.in_(turno_ids), models.Reserva.usuario_id.in_(usuario_ids)
+        )
+    ).all())
+
+    por_turno: Dict[int, list] = defaultdict(list)
+    for nro, r in validas:
+        t = turnos.get(r.turno_id)
+        if t is None:
+            reporte.error(nro, f"Turno {r.turno_id} no encontrado")
+        elif r.usuario_id not in usuarios:
+            reporte.error(nro, f"Usuario {r.usuario_id} no encontrado")
+        elif (r.turno_id, r.usuario_id) in tomadas:
+            reporte.error(nro, "El usuario ya reservó este turno")
+        elif t.ocupados + len(por_turno[r.turno_id]) >= t.capacidad:
+            reporte.error(nro, "No hay lugares disponibles en este turno")
+        else:
+            tomadas.add((r.turno_id, r.usuario_id))
+            por_turno[r.turno_id].append((nro, r.usuario_id))
+    if not por_turno:
+        return
+
+    # Mismo UPDATE condicional que crud/reservas.reservar, uno por turno del lote
+    aceptadas = []
+    for turno_id, items in por_turno.items():
+        n = len(items)
+        hecho = db.execute(
+            update(models.Turno)
+            .where(models.Turno.id == turno_id, models.Turno.ocupados + n <= models.Turno.capacidad)
+            .values(ocupados=models.Turno.ocupados + n)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not hecho:  # otra reserva entró mientras tanto
+            for nro, _ in items:
+                reporte.error(nro, "No hay lugares disponibles en este turno")
+            continue
+        aceptadas.append((turno_id, items))
+    if not aceptadas:
+        db.rollback()
+        return
+
+    try:
+        db.execute(insert(models.Reserva), [
+            {"turno_id": turno_id, "usuario_id": uid} for turno_id, items in aceptadas for _, uid in items
+        ])
+    except IntegrityError:
+        # Otra reserva del mismo usuario entró entre el SELECT y el INSERT: el lote entero vuelve atrás
+        db.rollback()
+        for _, items in aceptadas:
+            for nro, _ in items:
+                reporte.error(nro, "Conflicto con otra reserva concurrente; reintentar la fila")
+        return
+
+    por_dia = defaultdict(lambda: [0, 0.0])
+    turnos_por_emprendedor = defaultdict(list)
+    for turno_id, items in aceptadas:
+        t = turnos[turno_id]
+        acc = por_dia[(t.emprendedor_id, t.servicio_id, estadisticas.dia_local(t.fecha_hora_inicio))]
+        acc[0] += len(items)
+        acc[1] += len(items) * (t.precio or 0)
+        turnos_por_emprendedor[t.emprendedor_id].append(turno_id)
+    for (eid, sid, dia), (n, ingresos) in por_dia.items():
+        estadisticas.sumar(db, eid, sid, dia, reservas=n, ingresos=ingresos)
+    for eid, ids in turnos_por_emprendedor.items():
+        registrar_cambio(db, eid, "reserva", turno_ids=ids)
+    db.commit()
+    reporte.importadas += sum(len(items) for _, items in aceptadas)
@@ -0,0 +1,93 @@
+# app/crud/reservas.py
+"""
+Reservas con contador de ocupación en Turno.
+
+`Turno.ocupados` se mantiene en la misma transacción que el INSERT/DELETE de la
+reserva. La toma de lugar es un UPDATE condicional (`ocupados < capacidad`), así
+que dos requests concurrentes no pueden sobrevender el último lugar.
+Estas funciones NO hacen commit: lo hace el endpoint.
+"""
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.crud import estadisticas
+from app.utils import push
+from app.utils.cambios import registrar_cambio
+
+
+def _registrar(db: Session, turno_id: int, t) -> None:
+    if t is not None:
+        registrar_cambio(db, t.emprendedor_id, "reserva", turno_id=turno_id, deltas=[push.cupo(turno_id, t)])
+
+
+def reservar(db: Session, turno_id: int, usuario_id: int) -> models.Reserva:
+    tomado = db.execute(
+        update(models.Turno)
+        .where(models.Turno.id == turno_id, models.Turno.ocupados < models.Turno.capacidad)
+        .values(ocupados=models.Turno.ocupados + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not tomado:
+        existe = db.query(models.Turno.id).filter(models.Turno.id == turno_id).first()
+        db.rollback()
+        if not existe:
+            raise HTTPException(status_code=404, detail="Turno no encontrado")
+        raise HTTPException(status_code=400, detail="No hay lugares disponibles en este turno")
+
+    nueva = models.Reserva(turno_id=turno_id, usuario_id=usuario_id)
+    db.add(nueva)
+    try:
+        db.flush()
+    except IntegrityError:
+        # uq_turno_usuario: el rollback también deshace el +1 de ocupados
+        db.rollback()
+        raise HTTPException(status_code=400, detail="El usuario ya reservó este turno")
+    _registrar(db, turno_id, estadisticas.aplicar_reserva(db, turno_id))
+    return nueva
+
+
+def liberar(db: Session, reserva: models.Reserva) -> None:
+    db.execute(
+        update(models.Turno)
+        .where(models.Turno.id == reserva.turno_id, models.Turno.ocupados > 0)
+        .values(ocupados=models.Turno.ocupados - 1)
+        .execution_options(synchronize_session=False)
+    )
+    _registrar(db, reserva.turno_id, estadisticas.aplicar_reserva(db, reserva.turno_id, -1))
+    db.delete(reserva)
+
+
+def liberar_reservas_de_usuario(db: Session, usuario_id: int) -> None:
+    """Borra las reservas del usuario devolviendo sus lugares (uq_turno_usuario: 1 por turno)."""
+    for emprendedor_id in estadisticas.quitar_reservas_de_usuario(db, usuario_id):
+        registrar_cambio(db, emprendedor_id, "reserva")
+    turnos_del_usuario = select(models.Reserva.turno_id).where(models.Reserva.usuario_id == usuario_id)
+    db.execute(
+        update(models.Turno)
+        .where(models.Turno.id.in_(turnos_del_usuario), models.Turno.ocupados > 0)
+        .values(ocupados=models.Turno.ocupados - 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.query(models.Reserva).filter(models.Reserva.usuario_id == usuario_id).delete(
+        synchronize_session=False
+    )
+
+
+def recontar_ocupados(db: Session, turno_id: Optional[int] = None) -> int:
+    """Recalcula `ocupados` desde reservas. Devuelve cuántos turnos estaban desfasados."""
+    real = (
+        select(func.count(models.Reserva.id))
+        .where(models.Reserva.turno_id == models.Turno.id)
+        .scalar_subquery()
+    )
+    q = update(models.Turno).where(models.Turno.ocupados != real)
+    if turno_id is not None:
+        q = q.where(models.Turno.id == turno_id)
+    return db.execute(
+        q.values(ocupados=real).execution_options(synchronize_session=False)
+    ).rowcount
@@ -0,0 +1,186 @@
+# app/crud/turnos.py
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.utils.zona import a_utc
+
+MAX_TURNOS_BULK = 20_000
+MAX_DIAS_AGENDA = 366
+
+
+def filtrar_turnos(
+    q,
+    servicio_id: Optional[int] = None,
+    emprendedor_id: Optional[int] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+):
+    """Aplica los filtros comunes sobre una query que ya incluye Turno."""
+    if servicio_id is not None:
+        q = q.filter(models.Turno.servicio_id == servicio_id)
+    if emprendedor_id is not None:
+        q = q.join(models.Servicio, models.Turno.servicio_id == models.Servicio.id).filter(
+            models.Servicio.emprendedor_id == emprendedor_id
+        )
+    if desde is not None:
+        q = q.filter(models.Turno.fecha_hora_inicio >= desde)
+    if hasta is not None:
+        q = q.filter(models.Turno.fecha_hora_inicio < hasta)
+    return q
+
+
+def turnos_disponibles(
+    db: Session,
+    servicio_id: int,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    limit: int = 100,
+):
+    """
+    Turnos futuros del servicio con lugar libre, en UNA sola consulta
+    (usa el contador `Turno.ocupados`, sin join a reservas).
+    Devuelve dicts con los campos del turno + `cupos_disponibles`.
+    """
+    ahora = datetime.utcnow()
+    desde = max(desde, ahora) if desde else ahora
+
+    cupos = (models.Turno.capacidad - models.Turno.ocupados).label("cupos_disponibles")
+
+    q = db.query(
+        models.Turno.id,
+        models.Turno.fecha_hora_inicio,
+        models.Turno.duracion_minutos,
+        models.Turno.capacidad,
+        models.Turno.precio,
+        cupos,
+    ).filter(
+        models.Turno.servicio_id == servicio_id,
+        models.Turno.fecha_hora_inicio >= desde,
+        models.Turno.ocupados < models.Turno.capacidad,
+    )
+    if hasta:
+        q = q.filter(models.Turno.fecha_hora_inicio < hasta)
+
+    filas = (
+        q.order_by(models.Turno.fecha_hora_inicio.asc(), models.Turno.id.asc())
+        .limit(limit)
+        .all()
+    )
+    return [dict(f._mapping) for f in filas]
+
+
+def agenda(db: Session, emprendedor_id: int, desde: datetime, hasta: datetime) -> dict:
+    """
+    Servicios del emprendedor + sus turnos en [desde, hasta), en UNA sola consulta:
+    Servicio LEFT JOIN Turno (acotado a la ventana, usa ix_turnos_servicio_inicio).
+    Los servicios sin turnos en la ventana vienen igual (con columnas de turno en NULL).
+    Lo reservado sale del contador `Turno.ocupados`, sin join a reservas.
+    """
+    filas = db.execute(
+        select(
+            models.Servicio.id.label("servicio_id"),
+            models.Servicio.nombre.label("servicio_nombre"),
+            models.Servicio.duracion,
+            models.Servicio.precio.label("servicio_precio"),
+            models.Servicio.descripcion,
+            models.Turno.id,
+            models.Turno.fecha_hora_inicio,
+            models.Turno.fecha_hora_fin,
+            models.Turno.duracion_minutos,
+            models.Turno.capacidad,
+            models.Turno.ocupados.label("reservados"),
+            models.Turno.precio,
+        )
+        .outerjoin(
+            models.Turno,
+            and_(
+                models.Turno.servicio_id == models.Servicio.id,
+                models.Turno.fecha_hora_inicio >= desde,
+                models.Turno.fecha_hora_inicio < hasta,
+            ),
+        )
+        .where(models.Servicio.emprendedor_id == emprendedor_id)
+        .order_by(models.Turno.fecha_hora_inicio, models.Turno.id)
+    ).all()
+
+    servicios, turnos = {}, []
+    for f in filas:
+        if f.servicio_id not in servicios:
+            servicios[f.servicio_id] = {
+                "id": f.servicio_id, "nombre": f.servicio_nombre, "duracion": f.duracion,
+                "precio": f.servicio_precio, "descripcion": f.descripcion,
+            }
+        if f.id is not None:
+            turnos.append({
+                "id": f.id, "servicio_id": f.servicio_id, "servicio_nombre": f.servicio_nombre,
+                "fecha_hora_inicio": f.fecha_hora_inicio, "fecha_hora_fin": f.fecha_hora_fin,
+                "duracion_minutos": f.duracion_minutos, "capacidad": f.capacidad,
+                "reservados": f.reservados, "precio": f.precio,
+            })
+    return {
+        "emprendedor_id": emprendedor_id,
+        "desde": desde,
+        "hasta": hasta,
+        "servicios": sorted(servicios.values(), key=lambda s: s["id"]),
+        "turnos": turnos,
+    }
+
+
+def expandir_recurrencia(regla: schemas.RecurrenciaTurnos, duracion_default: int) -> List[dict]:
+    """Regla semanal (días y horas de reloj locales) → filas de turnos en UTC, ordenadas por fecha."""
+    duracion = regla.duracion_minutos or duracion_default
+    dias = set(regla.dias_semana)
+    filas = []
+    dia = regla.desde
+    while dia <= regla.hasta:
+        if dia.weekday() in dias:
+            for hora in regla.horas:
+                filas.append({
+                    "fecha_hora_inicio": a_utc(datetime.combine(dia, hora)),
+                    "duracion_minutos": duracion,
+                    "capacidad": regla.capacidad,
+                    "precio": regla.precio,
+                })
+        dia += timedelta(days=1)
+    filas.sort(key=lambda f: f["fecha_hora_inicio"])
+    return filas
+
+
+def insertar_turnos(db: Session, servicio_id: int, filas: List[dict]) -> List[int]:
+    """Un solo INSERT executemany (con RETURNING id). No hace commit."""
+    if not filas:
+        return []
+    for f in filas:
+        f["servicio_id"] = servicio_id
+        f["ocupados"] = 0
+        f["fecha_hora_fin"] = f["fecha_hora_inicio"] + timedelta(minutes=f["duracion_minutos"])
+    # sort_by_parameter_order: los ids vuelven en el mismo orden que `filas`
+    return list(db.scalars(
+        insert(models.Turno).returning(models.Turno.id, sort_by_parameter_order=True), filas
+    ))
+
+
+def borrar_arbol(db: Session, emprendedor_id: Optional[int] = None, servicio_id: Optional[int] = None) -> None:
+    """
+    Borra reservas y turnos (y, por emprendedor, también servicios y horarios)
+    con un DELETE por tabla. El cascade del ORM haría un SELECT por servicio y
+    por turno antes de borrar. No hace commit; el db.delete() del padre que
+    viene después encuentra las colecciones vacías.
+    """
+    servicios = select(models.Servicio.id)
+    if emprendedor_id is not None:
+        servicios = servicios.where(models.Servicio.emprendedor_id == emprendedor_id)
+    if servicio_id is not None:
+        servicios = servicios.where(models.Servicio.id == servicio_id)
+    turnos = select(models.Turno.id).where(models.Turno.servicio_id.in_(servicios))
+
+    opciones = {"synchronize_session": False}
+    db.execute(delete(models.Reserva).where(models.Reserva.turno_id.in_(turnos)).execution_options(**opciones))
+    db.execute(delete(models.Turno).where(models.Turno.servicio_id.in_(servicios)).execution_options(**opciones))
+    if servicio_id is None and emprendedor_id is not None:
+        db.execute(delete(models.Servicio).where(models.Servicio.emprendedor_id == emprendedor_id).execution_options(**opciones))
+        db.execute(delete(models.Horario).where(models.Horario.emprendedor_id == emprendedor_id).execution_options(**opciones))
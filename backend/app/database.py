@@ -1,10 +1,108 @@
-from sqlalchemy import create_engine
+import logging
+
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-DATABASE_URL = "sqlite:///./basedatos.db"
+from app.config import DatabaseSettings, get_settings
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger("uvicorn.error")
 
 Base = declarative_base()
+
+engine = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+# --- Modo async (opcional, DB_ASYNC=1) ---
+# aiosqlite solo se importa si el modo está activo.
+async_engine = None
+AsyncSessionLocal = None
+
+
+def async_url(url: str) -> str:
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+def _engine_kwargs(cfg: DatabaseSettings) -> dict:
+    if cfg.is_memory:
+        # Una sola conexión compartida: si no, cada conexión ve una DB vacía
+        return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+    kwargs = {
+        "pool_size": cfg.pool_size,
+        "max_overflow": cfg.max_overflow,
+        "pool_recycle": cfg.pool_recycle,
+        "pool_timeout": cfg.pool_timeout,
+        "pool_pre_ping": not cfg.is_sqlite,
+    }
+    if cfg.is_sqlite:
+        kwargs["connect_args"] = {"check_same_thread": False}
+    return kwargs
+
+
+def _sqlite_pragmas(cfg: DatabaseSettings):
+    pragmas = [
+        f"PRAGMA synchronous={cfg.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(cfg.sqlite_busy_timeout)}",
+        f"PRAGMA cache_size={int(cfg.sqlite_cache_size)}",
+        f"PRAGMA mmap_size={int(cfg.sqlite_mmap_size)}",
+    ]
+    if not cfg.is_memory:
+        pragmas.insert(0, f"PRAGMA journal_mode={cfg.sqlite_journal_mode}")
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return on_connect
+
+
+def init_engine(cfg: DatabaseSettings):
+    """(Re)crea engine/SessionLocal (y los async si corresponde) desde la config."""
+    global engine, async_engine, AsyncSessionLocal
+
+    engine = create_engine(cfg.url, **_engine_kwargs(cfg))
+    if cfg.is_sqlite:
+        event.listen(engine, "connect", _sqlite_pragmas(cfg))
+    SessionLocal.configure(bind=engine)
+
+    async_engine = AsyncSessionLocal = None
+    if cfg.async_mode:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_engine = create_async_engine(async_url(cfg.url), **_engine_kwargs(cfg))
+        if cfg.is_sqlite:
+            event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas(cfg))
+        AsyncSessionLocal = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+    return engine
+
+
+def describe_engine() -> dict:
+    """Configuración efectiva (leída de la conexión, no de la config)."""
+    info = {
+        "url": engine.url.render_as_string(hide_password=True),
+        "pool": type(engine.pool).__name__,
+        "pool_status": engine.pool.status(),
+        "async": async_engine is not None,
+    }
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            for pragma in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size"):
+                info[pragma] = conn.execute(text(f"PRAGMA {pragma}")).scalar()
+    return info
+
+
+def log_engine_settings():
+    for clave, valor in describe_engine().items():
+        logger.info("DB %s = %s", clave, valor)
+
+
+init_engine(get_settings().database)
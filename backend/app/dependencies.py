@@ -6,4 +6,11 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# --- Dependencia DB (modo async, DB_ASYNC=1) ---
+async def get_async_db():
+    if database.AsyncSessionLocal is None:
+        raise RuntimeError("Modo async desactivado: definí DB_ASYNC=1")
+    async with database.AsyncSessionLocal() as db:
+        yield db
@@ -1,38 +1,42 @@
 # app/main.py
-from fastapi import FastAPI, Depends, HTTPException, status
+"""
+Punto de entrada: `create_app(settings)` arma la app; `app` es la instancia que
+levanta uvicorn (`uvicorn app.main:app`). Las rutas de este módulo van en
+`router`; la inicialización de la DB (migraciones) corre una vez, en el lifespan.
+"""
+from contextlib import asynccontextmanager
+import hmac
+import secrets
+import anyio
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from pydantic import BaseModel  # <- para el modelo local
-from datetime import datetime
-from app import models, schemas, database
+from datetime import date, datetime, timedelta
+from app import auth, models, schemas, database, migrations
 from app.dependencies import get_db
-from app.auth import get_current_user, create_access_token  # JWT utils
+from app.auth import get_claims_vigentes, get_current_claims  # JWT utils
+from app.config import Settings, User as Claims, get_settings, usar_settings
+from app.crud import estadisticas as crud_estadisticas
+from app.crud import importacion as crud_importacion
+from app.crud import reservas as crud_reservas
+from app.crud import turnos as crud_turnos
+from app.utils import agenda, disponibilidad, etag, ical, metricas, passwords, push, respuestas, serializacion
+from app.utils.agenda import naive_utc
+from app.utils.cambios import registrar_cambio
 from app.utils.emprendedor import ensure_emprendedor_for_user
+from app.utils.paginacion import PaginaParams, paginar, parametros_pagina
 
 # Routers (solo el que maneja login/registro/perfil/activar)
 from app.routers.usuarios import router as router_usuarios
-from app.routers.horarios import router as router_horarios  # si lo usás
+from app.routers.emprendedores import router as router_emprendedores
+from app.routers.eventos import router as router_eventos
 
-# =========================================================
-# App + CORS
-# =========================================================
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type", "Accept", "Origin"],
-)
-
-# Routers (⚠️ evita incluir routers que dupliquen rutas de abajo)
-app.include_router(router_usuarios)
-app.include_router(router_horarios)
-
-# Crear tablas
-models.Base.metadata.create_all(bind=database.engine)
+router = APIRouter()
 
 # =========================================================
 # Modelo LOCAL para crear servicio sin enviar emprendedor_id
@@ -50,117 +54,165 @@ class ServicioCreateSimple(BaseModel):
 # Endpoints de “mi” emprendedor y mis datos
 # (IMPORTANTE: esta ruta fija va ANTES que /emprendedores/{emprendedor_id})
 # =========================================================
-@app.get("/emprendedores/mi")
+@router.get("/emprendedores/mi")
 def emprendedor_mi(
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(get_current_user),
+    claims: Claims = Depends(get_current_claims),
 ):
-    e = ensure_emprendedor_for_user(db, current_user.id)
-    return {"id": e.id, "usuario_id": e.usuario_id, "nombre": e.nombre}
+    e = ensure_emprendedor_for_user(db, claims.sub)
+    # con los datos que edita el formulario de negocio (EmprendedorForm)
+    return {
+        "id": e.id, "usuario_id": e.usuario_id, "nombre": e.nombre,
+        "apellido": e.apellido, "negocio": e.negocio,
+        "descripcion": e.descripcion, "codigo_cliente": e.codigo_cliente,
+    }
 
-@app.get("/usuarios/me/emprendedor")
+@router.get("/usuarios/me/emprendedor")
 def mi_emprendedor(
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(get_current_user),
+    claims: Claims = Depends(get_current_claims),
 ):
-    e = ensure_emprendedor_for_user(db, current_user.id)
+    e = ensure_emprendedor_for_user(db, claims.sub)
     return {"id": e.id, "usuario_id": e.usuario_id, "nombre": e.nombre}
 
-# =========================================================
-# Activar rol emprendedor (devuelve token nuevo)
-# =========================================================
-@app.put("/usuarios/{usuario_id}/activar_emprendedor")
-def activar_emprendedor(
-    usuario_id: int,
+def _suscripcion(request: Request, e: models.Emprendedor) -> dict:
+    url = request.url_for("agenda_ics", emprendedor_id=e.id).include_query_params(token=e.ical_token)
+    return {"url": str(url)}
+
+@router.get("/emprendedores/mi/calendario")
+def mi_calendario(
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(get_current_user),
+    claims: Claims = Depends(get_claims_vigentes),
 ):
-    if current_user.id != usuario_id:
-        raise HTTPException(status_code=403, detail="No autorizado")
-
-    usuario = db.query(models.Usuario).filter(models.Usuario.id == usuario_id).first()
-    if not usuario:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
-
-    if usuario.rol != "emprendedor":
-        usuario.rol = "emprendedor"
+    # URL para suscribirse desde el calendario del teléfono; el token se crea la primera vez
+    e = ensure_emprendedor_for_user(db, claims.sub)
+    if not e.ical_token:
+        e.ical_token = secrets.token_urlsafe(24)
         db.commit()
-        db.refresh(usuario)
+    return _suscripcion(request, e)
 
-    token = create_access_token({
-        "sub": str(usuario.id),
-        "username": usuario.username,
-        "rol": usuario.rol,
-    })
+@router.post("/emprendedores/mi/calendario/rotar")
+def rotar_calendario(
+    request: Request,
+    db: Session = Depends(get_db),
+    claims: Claims = Depends(get_claims_vigentes),
+):
+    # Token nuevo: las suscripciones con el viejo dejan de funcionar
+    e = ensure_emprendedor_for_user(db, claims.sub)
+    e.ical_token = secrets.token_urlsafe(24)
+    registrar_cambio(db, e.id, "emprendedor")  # saca del cache el feed con el token viejo
+    db.commit()
+    return _suscripcion(request, e)
 
-    return {
-        "user": {
-            "id": usuario.id,
-            "email": usuario.email,
-            "username": usuario.username,
-            "rol": usuario.rol,
-        },
-        "token": token,
-    }
-@app.get("/servicios/{servicio_id}/turnos", response_model=List[schemas.TurnoResponseCreate])
-def turnos_por_servicio(servicio_id: int, db: Session = Depends(get_db)):
-    return (
-        db.query(models.Turno)
-        .filter(models.Turno.servicio_id == servicio_id)
-        .order_by(models.Turno.fecha_hora_inicio.asc())
-        .all()
+@router.get("/servicios/{servicio_id}/turnos", response_model=List[schemas.TurnoResponseCreate])
+def turnos_por_servicio(
+    servicio_id: int, db: Session = Depends(get_db), rapido: bool = Depends(serializacion.activo)
+):
+    q = (
+        db.query(*serializacion.columnas(schemas.TurnoResponseCreate, models.Turno))
+        if rapido else db.query(models.Turno)
     )
-
-@app.get("/servicios/{servicio_id}/turnos/disponibles", response_model=List[schemas.TurnoResponseCreate])
-def turnos_disponibles_por_servicio(servicio_id: int, db: Session = Depends(get_db)):
-    ahora = datetime.utcnow()
     turnos = (
-        db.query(models.Turno)
-        .filter(
-            models.Turno.servicio_id == servicio_id,
-            models.Turno.fecha_hora_inicio >= ahora,
-        )
+        q.filter(models.Turno.servicio_id == servicio_id)
         .order_by(models.Turno.fecha_hora_inicio.asc())
         .all()
     )
-    disponibles = []
-    for t in turnos:
-        reservas_count = db.query(models.Reserva).filter(models.Reserva.turno_id == t.id).count()
-        if reservas_count < t.capacidad:
-            disponibles.append(t)
-    return disponibles
+    if rapido:
+        return serializacion.respuesta(List[schemas.TurnoResponseCreate], serializacion.filas(turnos))
+    return turnos
+
+@router.get("/servicios/{servicio_id}/turnos/disponibles", response_model=List[schemas.TurnoDisponible])
+def turnos_disponibles_por_servicio(
+    servicio_id: int,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    desde = naive_utc(desde) if desde else None
+    hasta = naive_utc(hasta) if hasta else None
+    # Una sola consulta agrupada (antes: 1 COUNT por turno)
+    return crud_turnos.turnos_disponibles(db, servicio_id, desde, hasta, limit)
 # =========================================================
 # MIS servicios / MIS turnos (protegidos, idempotentes)
 # =========================================================
-@app.get("/servicios/mis-servicios", response_model=List[schemas.ServicioResponseCreate])
+@router.get("/servicios/mis-servicios", response_model=List[schemas.ServicioResponseCreate])
 def mis_servicios(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(get_current_user),
+    claims: Claims = Depends(get_current_claims),
 ):
-    emprendedor = ensure_emprendedor_for_user(db, current_user.id)
+    no_modificado = etag.condicional(request, response, etag.version_de(db, usuario_id=claims.sub))
+    if no_modificado:
+        return no_modificado
+    emprendedor = ensure_emprendedor_for_user(db, claims.sub)
     return (
         db.query(models.Servicio)
         .filter(models.Servicio.emprendedor_id == emprendedor.id)
         .all()
     )
 
-@app.get("/turnos/mis-turnos", response_model=List[schemas.TurnoResponseCreate])
+@router.get("/turnos/mis-turnos", response_model=List[schemas.TurnoResponseCreate])
 def mis_turnos(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(get_current_user),
+    claims: Claims = Depends(get_current_claims),
+    rapido: bool = Depends(serializacion.activo),
 ):
-    emprendedor = ensure_emprendedor_for_user(db, current_user.id)
-    return (
-        db.query(models.Turno)
-        .join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
+    no_modificado = etag.condicional(request, response, etag.version_de(db, usuario_id=claims.sub))
+    if no_modificado:
+        return no_modificado
+    emprendedor = ensure_emprendedor_for_user(db, claims.sub)
+    q = (
+        db.query(*serializacion.columnas(schemas.TurnoResponseCreate, models.Turno))
+        if rapido else db.query(models.Turno)
+    )
+    turnos = (
+        q.join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
         .filter(models.Servicio.emprendedor_id == emprendedor.id)
         .all()
     )
+    if rapido:
+        return serializacion.respuesta(List[schemas.TurnoResponseCreate], serializacion.filas(turnos))
+    return turnos
+
+@router.get("/mis/agenda", response_model=schemas.AgendaResponse)
+def mi_agenda(
+    request: Request,
+    response: Response,
+    desde: datetime,
+    hasta: datetime,
+    db: Session = Depends(get_db),
+    claims: Claims = Depends(get_current_claims),
+    rapido: bool = Depends(serializacion.activo),
+):
+    # Lo que necesita el calendario para la ventana visible, en un solo viaje
+    # (reemplaza mis-servicios + mis-turnos, que traía todo el historial)
+    desde, hasta = naive_utc(desde), naive_utc(hasta)
+    if hasta <= desde:
+        raise HTTPException(status_code=400, detail="'hasta' tiene que ser posterior a 'desde'")
+    if hasta - desde > timedelta(days=crud_turnos.MAX_DIAS_AGENDA):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Ventana demasiado grande; máximo {crud_turnos.MAX_DIAS_AGENDA} días",
+        )
+    fila = etag.version_de(db, usuario_id=claims.sub)
+    no_modificado = etag.condicional(request, response, fila)
+    if no_modificado:
+        return no_modificado
+    emprendedor_id = fila.id if fila else ensure_emprendedor_for_user(db, claims.sub).id
+    datos = crud_turnos.agenda(db, emprendedor_id, desde, hasta)
+    if rapido:
+        return serializacion.respuesta(schemas.AgendaResponse, datos)
+    return datos
 
 # =========================================================
 # EMPRENDEDORES (POST idempotente para no romper UNIQUE)
 # =========================================================
-@app.post("/emprendedores/", response_model=schemas.EmprendedorResponse)
+@router.post("/emprendedores/", response_model=schemas.EmprendedorResponse)
 def crear_emprendedor(empr: schemas.EmprendedorCreate, db: Session = Depends(get_db)):
     existente = (
         db.query(models.Emprendedor)
@@ -170,32 +222,122 @@ def crear_emprendedor(empr: schemas.EmprendedorCreate, db: Session = Depends(get
     if existente:
         for campo, valor in empr.dict(exclude={"usuario_id"}).items():
             setattr(existente, campo, valor)
+        registrar_cambio(db, existente.id, "emprendedor")
         db.commit()
         db.refresh(existente)
         return existente
 
     nuevo = models.Emprendedor(**empr.dict())
     db.add(nuevo)
+    db.flush()
+    registrar_cambio(db, nuevo.id, "emprendedor")
     db.commit()
     db.refresh(nuevo)
     return nuevo
 
-@app.get("/emprendedores/", response_model=List[schemas.EmprendedorResponse])
-def listar_emprendedores(db: Session = Depends(get_db)):
-    return db.query(models.Emprendedor).all()
-
-@app.get("/emprendedores/{emprendedor_id}", response_model=schemas.EmprendedorResponse)
-def detalle_emprendedor(emprendedor_id: int, db: Session = Depends(get_db)):
-    emprendedor = (
-        db.query(models.Emprendedor)
-        .filter(models.Emprendedor.id == emprendedor_id)
+@router.get(
+    "/emprendedores/{emprendedor_id}/disponibilidad",
+    response_model=List[schemas.SlotDisponible],
+)
+def disponibilidad_emprendedor(
+    emprendedor_id: int,
+    servicio_id: int,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+):
+    # Slots libres calculados desde los Horarios (sin turnos pre-generados)
+    servicio = (
+        db.query(models.Servicio)
+        .filter(
+            models.Servicio.id == servicio_id,
+            models.Servicio.emprendedor_id == emprendedor_id,
+        )
         .first()
     )
-    if not emprendedor:
+    if not servicio:
+        raise HTTPException(status_code=404, detail="Servicio no encontrado")
+    if not servicio.duracion or servicio.duracion <= 0:
+        raise HTTPException(status_code=400, detail="El servicio no tiene duración")
+
+    ahora = datetime.utcnow()
+    desde = max(naive_utc(desde), ahora) if desde else ahora
+    hasta = naive_utc(hasta) if hasta else desde + timedelta(days=7)
+    if hasta <= desde or hasta - desde > timedelta(days=disponibilidad.MAX_DIAS_VENTANA):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Rango inválido (máximo {disponibilidad.MAX_DIAS_VENTANA} días)",
+        )
+
+    slots = disponibilidad.slots_libres(db, emprendedor_id, servicio.duracion, desde, hasta)
+    return [{"fecha_hora_inicio": ini, "fecha_hora_fin": fin} for ini, fin in slots]
+
+@router.get("/emprendedores/{emprendedor_id}/agenda.ics", name="agenda_ics")
+def agenda_ics(emprendedor_id: int, token: str, request: Request, db: Session = Depends(get_db)):
+    # Los calendarios pollean cada pocos minutos: casi siempre sale del cache (sin DB)
+    desde, hasta = ical.ventana()
+    cache = respuestas.cache
+    clave = ("ical", emprendedor_id, desde)
+    feed = cache.obtener(clave) if cache.activo else None
+    if feed is not None:
+        if not hmac.compare_digest(feed.token.encode(), token.encode()):
+            raise HTTPException(status_code=404, detail="Calendario no encontrado")
+        headers = ical.headers(feed.etag, feed.modificado)
+        if ical.no_modificado(request, feed.etag, feed.modificado):
+            return Response(status_code=304, headers=headers)
+        return Response(feed.cuerpo, media_type=ical.MEDIA_TYPE, headers={**headers, "X-Cache": "HIT"})
+
+    # generaciones ANTES de leer la base (ver respuestas.responder)
+    marcas = cache.marcas(ical.tags(emprendedor_id)) if cache.activo else None
+    fila = db.execute(
+        select(models.Emprendedor.version, models.Emprendedor.ical_token,
+               models.Emprendedor.nombre, models.Emprendedor.negocio)
+        .where(models.Emprendedor.id == emprendedor_id)
+    ).first()
+    if fila is None or not fila.ical_token or not hmac.compare_digest(fila.ical_token.encode(), token.encode()):
+        raise HTTPException(status_code=404, detail="Calendario no encontrado")
+
+    modificado = datetime.utcnow().replace(microsecond=0)
+    feed_etag = ical.etag_de(emprendedor_id, fila.version, desde)
+    headers = ical.headers(feed_etag, modificado)
+    if ical.no_modificado(request, feed_etag, modificado):
+        return Response(status_code=304, headers=headers)
+
+    partes = ical.generar(emprendedor_id, fila.negocio or fila.nombre, desde, hasta, modificado)
+    if cache.activo:
+        ttl = min(ical.segundos_hasta_manana(), getattr(cache.backend, "ttl", None) or float("inf"))
+        partes = ical.guardando(partes, lambda cuerpo: cache.guardar(
+            clave, marcas, ical.Feed(fila.ical_token, feed_etag, modificado, cuerpo), ttl,
+        ))
+    return StreamingResponse(partes, media_type=ical.MEDIA_TYPE, headers={**headers, "X-Cache": "MISS"})
+
+@router.get(
+    "/emprendedores/{emprendedor_id}/estadisticas",
+    response_model=schemas.Estadisticas,
+)
+def estadisticas_emprendedor(
+    emprendedor_id: int,
+    granularidad: Literal["dia", "mes"] = "dia",
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    servicio_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    claims: Claims = Depends(get_current_claims),
+):
+    # Solo lee el rollup estadisticas_diarias (sin escanear turnos/reservas)
+    if desde and hasta and hasta < desde:
+        raise HTTPException(status_code=400, detail="Rango inválido")
+    # Facturación y ocupación: solo para el dueño del emprendimiento
+    duenio = db.execute(
+        select(models.Emprendedor.usuario_id).where(models.Emprendedor.id == emprendedor_id)
+    ).scalar_one_or_none()
+    if duenio is None:
         raise HTTPException(status_code=404, detail="Emprendedor no encontrado")
-    return emprendedor
+    if duenio != claims.sub:
+        raise HTTPException(status_code=403, detail="No autorizado")
+    return crud_estadisticas.consultar(db, emprendedor_id, granularidad, desde, hasta, servicio_id)
 
-@app.put("/emprendedores/{emprendedor_id}", response_model=schemas.EmprendedorResponse)
+@router.put("/emprendedores/{emprendedor_id}", response_model=schemas.EmprendedorResponse)
 def actualizar_emprendedor(
     emprendedor_id: int, datos: schemas.EmprendedorBase, db: Session = Depends(get_db)
 ):
@@ -208,11 +350,12 @@ def actualizar_emprendedor(
         raise HTTPException(status_code=404, detail="Emprendedor no encontrado")
     for campo, valor in datos.dict().items():
         setattr(emprendedor, campo, valor)
+    registrar_cambio(db, emprendedor.id, "emprendedor")
     db.commit()
     db.refresh(emprendedor)
     return emprendedor
 
-@app.delete("/emprendedores/{emprendedor_id}")
+@router.delete("/emprendedores/{emprendedor_id}")
 def eliminar_emprendedor(emprendedor_id: int, db: Session = Depends(get_db)):
     emprendedor = (
         db.query(models.Emprendedor)
@@ -221,45 +364,43 @@ def eliminar_emprendedor(emprendedor_id: int, db: Session = Depends(get_db)):
     )
     if not emprendedor:
         raise HTTPException(status_code=404, detail="Emprendedor no encontrado")
+    crud_turnos.borrar_arbol(db, emprendedor_id=emprendedor.id)
     db.delete(emprendedor)
+    crud_estadisticas.borrar(db, emprendedor_id=emprendedor.id)
+    registrar_cambio(db, emprendedor.id)
     db.commit()
     return {"ok": True, "mensaje": "Emprendedor eliminado"}
 
 # =========================================================
 # SERVICIOS
 # =========================================================
-@app.get("/servicios/", response_model=List[schemas.ServicioResponseCreate])
-def list_servicios(db: Session = Depends(get_db)):
-    return db.query(models.Servicio).all()
-
-@app.get(
+@router.get(
     "/emprendedores/{emprendedor_id}/servicios",
     response_model=List[schemas.ServicioResponseCreate],
 )
 def listar_servicios_por_emprendedor(
-    emprendedor_id: int, db: Session = Depends(get_db)
+    emprendedor_id: int, request: Request, response: Response, db: Session = Depends(get_db)
 ):
-    emprendedor = (
-        db.query(models.Emprendedor)
-        .filter(models.Emprendedor.id == emprendedor_id)
-        .first()
-    )
-    if not emprendedor:
+    fila = etag.version_de(db, emprendedor_id)
+    if not fila:
         raise HTTPException(status_code=404, detail="Emprendedor no encontrado")
+    no_modificado = etag.condicional(request, response, fila)
+    if no_modificado:
+        return no_modificado
     return (
         db.query(models.Servicio)
-        .filter(models.Servicio.emprendedor_id == emprendedor.id)
+        .filter(models.Servicio.emprendedor_id == emprendedor_id)
         .all()
     )
 
 # Crear servicio para MI emprendedor (sin mandar emprendedor_id desde el front)
-@app.post("/mis/servicios", response_model=schemas.ServicioResponseCreate)
+@router.post("/mis/servicios", response_model=schemas.ServicioResponseCreate)
 def crear_mi_servicio(
     data: ServicioCreateSimple,  # <- modelo local
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(get_current_user),
+    claims: Claims = Depends(get_claims_vigentes),
 ):
-    e = ensure_emprendedor_for_user(db, current_user.id)
+    e = ensure_emprendedor_for_user(db, claims.sub)
     nuevo = models.Servicio(
         nombre=data.nombre,
         duracion=data.duracion,
@@ -267,11 +408,12 @@ def crear_mi_servicio(
         emprendedor_id=e.id,
     )
     db.add(nuevo)
+    registrar_cambio(db, e.id, "servicio")
     db.commit()
     db.refresh(nuevo)
     return nuevo
 
-@app.post("/servicios/", response_model=schemas.ServicioResponseCreate)
+@router.post("/servicios/", response_model=schemas.ServicioResponseCreate)
 def crear_servicio(servicio: schemas.ServicioCreate, db: Session = Depends(get_db)):
     emprendedor = (
         db.query(models.Emprendedor)
@@ -282,22 +424,12 @@ def crear_servicio(servicio: schemas.ServicioCreate, db: Session = Depends(get_d
         raise HTTPException(status_code=404, detail="Emprendedor no encontrado")
     nuevo = models.Servicio(**servicio.dict())
     db.add(nuevo)
+    registrar_cambio(db, emprendedor.id, "servicio")
     db.commit()
     db.refresh(nuevo)
     return nuevo
 
-@app.get("/servicios/{servicio_id}", response_model=schemas.ServicioResponseCreate)
-def detalle_servicio(servicio_id: int, db: Session = Depends(get_db)):
-    servicio = (
-        db.query(models.Servicio)
-        .filter(models.Servicio.id == servicio_id)
-        .first()
-    )
-    if not servicio:
-        raise HTTPException(status_code=404, detail="Servicio no encontrado")
-    return servicio
-
-@app.put("/servicios/{servicio_id}", response_model=schemas.ServicioResponseCreate)
+@router.put("/servicios/{servicio_id}", response_model=schemas.ServicioResponseCreate)
 def actualizar_servicio(
     servicio_id: int, datos: schemas.ServicioBase, db: Session = Depends(get_db)
 ):
@@ -310,11 +442,15 @@ def actualizar_servicio(
         raise HTTPException(status_code=404, detail="Servicio no encontrado")
     for campo, valor in datos.dict().items():
         setattr(servicio, campo, valor)
+    db.flush()
+    # El precio del servicio es el default de sus turnos: se recalcula su parte
+    crud_estadisticas.reconstruir_en(db, servicio.emprendedor_id, servicio.id)
+    registrar_cambio(db, servicio.emprendedor_id, "servicio", servicio_id=servicio.id)
     db.commit()
     db.refresh(servicio)
     return servicio
 
-@app.delete("/servicios/{servicio_id}")
+@router.delete("/servicios/{servicio_id}")
 def eliminar_servicio(servicio_id: int, db: Session = Depends(get_db)):
     servicio = (
         db.query(models.Servicio)
@@ -323,15 +459,22 @@ def eliminar_servicio(servicio_id: int, db: Session = Depends(get_db)):
     )
     if not servicio:
         raise HTTPException(status_code=404, detail="Servicio no encontrado")
+    crud_turnos.borrar_arbol(db, servicio_id=servicio.id)
     db.delete(servicio)
+    crud_estadisticas.borrar(db, servicio.emprendedor_id, servicio.id)
+    registrar_cambio(db, servicio.emprendedor_id, "servicio", servicio_id=servicio.id)
     db.commit()
     return {"ok": True, "mensaje": "Servicio eliminado"}
 
 # =========================================================
 # TURNOS
 # =========================================================
-@app.post("/turnos/", response_model=schemas.TurnoResponseCreate)
-def crear_turno(turno: schemas.TurnoCreate, db: Session = Depends(get_db)):
+@router.post("/turnos/", response_model=schemas.TurnoResponseCreate)
+def crear_turno(
+    turno: schemas.TurnoCreate,
+    permitir_superposicion: bool = False,  # clases grupales / turnos en paralelo
+    db: Session = Depends(get_db),
+):
     servicio = (
         db.query(models.Servicio)
         .filter(models.Servicio.id == turno.servicio_id)
@@ -339,41 +482,116 @@ def crear_turno(turno: schemas.TurnoCreate, db: Session = Depends(get_db)):
     )
     if not servicio:
         raise HTTPException(status_code=404, detail="Servicio no encontrado")
-    nuevo = models.Turno(**turno.dict())
-    db.add(nuevo)
-    db.commit()
+    inicio = naive_utc(turno.fecha_hora_inicio)
+    fin = agenda.fin_de(inicio, turno.duracion_minutos)
+    with agenda.lock(servicio.emprendedor_id):
+        agenda.validar_turnos(
+            db, servicio.emprendedor_id, [(inicio, fin)],
+            permitir_superposicion=permitir_superposicion,
+        )
+        nuevo = models.Turno(**{**turno.dict(), "fecha_hora_inicio": inicio})
+        db.add(nuevo)
+        db.flush()
+        t = crud_estadisticas.datos_turno(db, nuevo.id)
+        crud_estadisticas.aplicar_turno(db, t)
+        registrar_cambio(
+            db, servicio.emprendedor_id, "turno",
+            deltas=[push.turno(nuevo.id, servicio.id, inicio, fin, t.capacidad, t.ocupados)],
+        )
+        db.commit()
     db.refresh(nuevo)
     return nuevo
 
-@app.get("/turnos/", response_model=List[schemas.TurnoResponseCreate])
-def listar_turnos(db: Session = Depends(get_db)):
-    return db.query(models.Turno).all()
+@router.post("/turnos/bulk", response_model=schemas.TurnosBulkResponse)
+def crear_turnos_bulk(
+    datos: schemas.TurnosBulkCreate,
+    permitir_superposicion: bool = False,
+    db: Session = Depends(get_db),
+):
+    servicio = (
+        db.query(models.Servicio)
+        .filter(models.Servicio.id == datos.servicio_id)
+        .first()
+    )
+    if not servicio:
+        raise HTTPException(status_code=404, detail="Servicio no encontrado")
 
-@app.get("/turnos/{turno_id}", response_model=schemas.TurnoResponseCreate)
-def detalle_turno(turno_id: int, db: Session = Depends(get_db)):
-    turno = db.query(models.Turno).filter(models.Turno.id == turno_id).first()
-    if not turno:
-        raise HTTPException(status_code=404, detail="Turno no encontrado")
-    return turno
+    if datos.recurrencia:
+        filas = crud_turnos.expandir_recurrencia(datos.recurrencia, servicio.duracion)
+    else:
+        filas = [
+            {**t.model_dump(), "fecha_hora_inicio": naive_utc(t.fecha_hora_inicio)}
+            for t in datos.turnos
+        ]
+    if len(filas) > crud_turnos.MAX_TURNOS_BULK:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Demasiados turnos ({len(filas)}); máximo {crud_turnos.MAX_TURNOS_BULK}",
+        )
+
+    intervalos = [
+        (f["fecha_hora_inicio"], agenda.fin_de(f["fecha_hora_inicio"], f["duracion_minutos"]))
+        for f in filas
+    ]
+    with agenda.lock(servicio.emprendedor_id):
+        agenda.validar_turnos(
+            db, servicio.emprendedor_id, intervalos,
+            permitir_superposicion=permitir_superposicion,
+        )
+        # Una sola transacción y un solo executemany para todo el lote
+        ids = crud_turnos.insertar_turnos(db, servicio.id, filas)
+        crud_estadisticas.aplicar_turnos_nuevos(db, servicio.emprendedor_id, servicio.id, filas)
+        deltas = [
+            push.turno(tid, servicio.id, ini, fin, f["capacidad"], 0)
+            for tid, (ini, fin), f in zip(ids, intervalos, filas)
+        ]
+        registrar_cambio(db, servicio.emprendedor_id, "turno", deltas=deltas)
+        db.commit()
+    return {"creados": len(ids), "ids": ids}
 
-@app.put("/turnos/{turno_id}", response_model=schemas.TurnoResponseCreate)
+@router.put("/turnos/{turno_id}", response_model=schemas.TurnoResponseCreate)
 def actualizar_turno(
-    turno_id: int, datos: schemas.TurnoBase, db: Session = Depends(get_db)
+    turno_id: int,
+    datos: schemas.TurnoBase,
+    permitir_superposicion: bool = False,
+    db: Session = Depends(get_db),
 ):
     turno = db.query(models.Turno).filter(models.Turno.id == turno_id).first()
     if not turno:
         raise HTTPException(status_code=404, detail="Turno no encontrado")
-    for campo, valor in datos.dict().items():
-        setattr(turno, campo, valor)
-    db.commit()
+    emprendedor_id = turno.servicio.emprendedor_id
+    inicio = naive_utc(datos.fecha_hora_inicio)
+    fin = agenda.fin_de(inicio, datos.duracion_minutos)
+    with agenda.lock(emprendedor_id):
+        agenda.validar_turnos(
+            db, emprendedor_id, [(inicio, fin)],
+            excluir_id=turno.id, permitir_superposicion=permitir_superposicion,
+        )
+        crud_estadisticas.aplicar_turno(db, crud_estadisticas.datos_turno(db, turno.id), -1)
+        for campo, valor in {**datos.dict(), "fecha_hora_inicio": inicio}.items():
+            setattr(turno, campo, valor)
+        db.flush()
+        t = crud_estadisticas.datos_turno(db, turno.id)
+        crud_estadisticas.aplicar_turno(db, t)
+        registrar_cambio(
+            db, emprendedor_id, "turno",
+            deltas=[push.turno(turno.id, t.servicio_id, inicio, fin, t.capacidad, t.ocupados)],
+        )
+        db.commit()
     db.refresh(turno)
     return turno
 
-@app.delete("/turnos/{turno_id}")
+@router.delete("/turnos/{turno_id}")
 def eliminar_turno(turno_id: int, db: Session = Depends(get_db)):
     turno = db.query(models.Turno).filter(models.Turno.id == turno_id).first()
     if not turno:
         raise HTTPException(status_code=404, detail="Turno no encontrado")
+    registrar_cambio(
+        db, turno.servicio.emprendedor_id, "turno",
+        deltas=[push.baja(turno.id, turno.servicio_id)],
+    )
+    # Con el turno se van sus reservas: resta turno, cupos, reservas e ingresos
+    crud_estadisticas.aplicar_turno(db, crud_estadisticas.datos_turno(db, turno.id), -1)
     db.delete(turno)
     db.commit()
     return {"ok": True, "mensaje": "Turno eliminado"}
@@ -381,78 +599,237 @@ def eliminar_turno(turno_id: int, db: Session = Depends(get_db)):
 # =========================================================
 # RESERVAS
 # =========================================================
-@app.post("/reservas/", response_model=schemas.ReservaResponse)
+@router.post("/reservas/", response_model=schemas.ReservaResponse)
 def crear_reserva(reserva: schemas.ReservaCreate, db: Session = Depends(get_db)):
-    turno = db.query(models.Turno).filter(models.Turno.id == reserva.turno_id).first()
-    if not turno:
-        raise HTTPException(status_code=404, detail="Turno no encontrado")
-
-    reservas_existentes = (
-        db.query(models.Reserva).filter(models.Reserva.turno_id == turno.id).count()
+    # UPDATE condicional del contador + INSERT, en una sola transacción
+    nueva = crud_reservas.reservar(db, reserva.turno_id, reserva.usuario_id)
+    respuesta = schemas.ReservaResponse.model_validate(nueva)
+    db.commit()
+    return respuesta
+
+@router.get("/reservas/", response_model=schemas.Pagina[schemas.ReservaResponse])
+def listar_reservas(
+    usuario_id: Optional[int] = None,
+    servicio_id: Optional[int] = None,
+    emprendedor_id: Optional[int] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    pagina: PaginaParams = Depends(parametros_pagina),
+    db: Session = Depends(get_db),
+    rapido: bool = Depends(serializacion.activo),
+):
+    q = (
+        db.query(*serializacion.columnas(schemas.ReservaResponse, models.Reserva))
+        if rapido else db.query(models.Reserva)
     )
-    if reservas_existentes >= turno.capacidad:
-        raise HTTPException(status_code=400, detail="No hay lugares disponibles en este turno")
-
-    ya_reservo = (
-        db.query(models.Reserva)
-        .filter(
-            models.Reserva.turno_id == turno.id,
-            models.Reserva.usuario_id == reserva.usuario_id,
+    if usuario_id is not None:
+        q = q.filter(models.Reserva.usuario_id == usuario_id)
+    if any(v is not None for v in (servicio_id, emprendedor_id, desde, hasta)):
+        q = crud_turnos.filtrar_turnos(
+            q.join(models.Turno, models.Reserva.turno_id == models.Turno.id),
+            servicio_id, emprendedor_id, desde, hasta,
         )
-        .first()
-    )
-    if ya_reservo:
-        raise HTTPException(status_code=400, detail="El usuario ya reservó este turno")
-
-    nueva = models.Reserva(**reserva.dict())
-    db.add(nueva)
-    db.commit()
-    db.refresh(nueva)
-    return nueva
-
-@app.get("/reservas/", response_model=List[schemas.ReservaResponse])
-def listar_reservas(db: Session = Depends(get_db)):
-    return db.query(models.Reserva).all()
+    res = paginar(q, pagina, models.Reserva.id)
+    if rapido:
+        return serializacion.respuesta(
+            schemas.Pagina[schemas.ReservaResponse],
+            {**res, "items": serializacion.filas(res["items"])},
+        )
+    return res
 
-@app.get("/reservas/{reserva_id}", response_model=schemas.ReservaResponse)
+@router.get("/reservas/{reserva_id}", response_model=schemas.ReservaResponse)
 def detalle_reserva(reserva_id: int, db: Session = Depends(get_db)):
     reserva = db.query(models.Reserva).filter(models.Reserva.id == reserva_id).first()
     if not reserva:
         raise HTTPException(status_code=404, detail="Reserva no encontrada")
     return reserva
 
-@app.delete("/reservas/{reserva_id}")
+@router.delete("/reservas/{reserva_id}")
 def eliminar_reserva(reserva_id: int, db: Session = Depends(get_db)):
     reserva = db.query(models.Reserva).filter(models.Reserva.id == reserva_id).first()
     if not reserva:
         raise HTTPException(status_code=404, detail="Reserva no encontrada")
-    db.delete(reserva)
+    crud_reservas.liberar(db, reserva)
     db.commit()
     return {"ok": True, "mensaje": "Reserva eliminada"}
 
-@app.get("/usuarios/{usuario_id}/reservas", response_model=List[schemas.ReservaOut])
-def listar_reservas_usuario(usuario_id: int, db: Session = Depends(get_db)):
-    usuario = db.query(models.Usuario).filter(models.Usuario.id == usuario_id).first()
-    if not usuario:
+@router.get("/usuarios/{usuario_id}/reservas", response_model=schemas.Pagina[schemas.ReservaOut])
+def listar_reservas_usuario(
+    usuario_id: int,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    cuando: Optional[Literal["proximas", "pasadas"]] = None,
+    pagina: PaginaParams = Depends(parametros_pagina),
+    db: Session = Depends(get_db),
+):
+    if not db.query(models.Usuario.id).filter(models.Usuario.id == usuario_id).first():
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    reservas = (
-        db.query(models.Reserva)
+    # Una sola query de columnas (sin cargar Reserva/Turno/Servicio ni lazy loads)
+    q = (
+        db.query(
+            models.Reserva.id.label("id"),
+            models.Reserva.turno_id.label("turno_id"),
+            models.Turno.fecha_hora_inicio.label("fecha_hora_inicio"),
+            models.Turno.precio.label("precio"),
+            models.Servicio.nombre.label("servicio_nombre"),
+            models.Servicio.emprendedor_id.label("emprendedor_id"),
+        )
         .join(models.Turno, models.Reserva.turno_id == models.Turno.id)
         .join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
         .filter(models.Reserva.usuario_id == usuario_id)
-        .all()
+    )
+    desde = naive_utc(desde) if desde else None
+    hasta = naive_utc(hasta) if hasta else None
+    ahora = datetime.utcnow()
+    if cuando == "proximas":
+        desde = max(desde, ahora) if desde else ahora
+    elif cuando == "pasadas":
+        hasta = min(hasta, ahora) if hasta else ahora
+    q = crud_turnos.filtrar_turnos(q, desde=desde, hasta=hasta)
+
+    # próximas: la más cercana primero; pasadas: la más reciente primero
+    return paginar(
+        q, pagina, models.Turno.fecha_hora_inicio, models.Reserva.id,
+        descendente=(cuando == "pasadas"),
     )
 
-    resultados = [
-        schemas.ReservaOut(
-            id=r.id,
-            turno_id=r.turno.id,
-            fecha_hora_inicio=r.turno.fecha_hora_inicio,
-            precio=r.turno.precio,
-            servicio_nombre=r.turno.servicio.nombre,
-            emprendedor_id=r.turno.servicio.emprendedor_id,
-        )
-        for r in reservas
-    ]
-    return resultados
+# =========================================================
+# IMPORTACIÓN (CSV / NDJSON, en streaming)
+# =========================================================
+def _cuerpo(request: Request):
+    """Desde un hilo del threadpool: el body del request como iterador sync de bytes."""
+    pedazos = request.stream().__aiter__()
+    while True:
+        try:
+            yield anyio.from_thread.run(pedazos.__anext__)
+        except StopAsyncIteration:
+            return
+
+async def _importar(request: Request, formato, db: Session, claims: Claims, importar, **opciones):
+    if formato is None:
+        formato = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    def trabajo():
+        # Todo el trabajo de DB en un solo hilo; el body se lee a medida que se procesa
+        e = ensure_emprendedor_for_user(db, claims.sub)
+        origen = crud_importacion.filas(crud_importacion.lineas(_cuerpo(request)), formato)
+        return importar(db, origen, emprendedor_id=e.id, **opciones)
+
+    return await run_in_threadpool(trabajo)
+
+@router.post("/importar/turnos", response_model=schemas.ImportacionResultado)
+async def importar_turnos(
+    request: Request,
+    formato: Optional[Literal["csv", "ndjson"]] = None,  # default: según Content-Type
+    permitir_superposicion: bool = False,
+    db: Session = Depends(get_db),
+    claims: Claims = Depends(get_claims_vigentes),
+):
+    return await _importar(
+        request, formato, db, claims, crud_importacion.importar_turnos,
+        permitir_superposicion=permitir_superposicion,
+    )
+
+@router.post("/importar/reservas", response_model=schemas.ImportacionResultado)
+async def importar_reservas(
+    request: Request,
+    formato: Optional[Literal["csv", "ndjson"]] = None,
+    db: Session = Depends(get_db),
+    claims: Claims = Depends(get_claims_vigentes),
+):
+    return await _importar(request, formato, db, claims, crud_importacion.importar_reservas)
+
+# =========================================================
+# MÉTRICAS / CACHE
+# =========================================================
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    if not get_settings().api.metrics:
+        raise HTTPException(status_code=404, detail="Métricas deshabilitadas")
+    return PlainTextResponse(
+        metricas.registro.prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@router.get("/cache/respuestas", include_in_schema=False)
+def estadisticas_cache_respuestas():
+    # hits/misses del cache del catálogo público, para dimensionarlo.
+    # Operación: mismo opt-in que /metrics
+    if not get_settings().api.metrics:
+        raise HTTPException(status_code=404, detail="Métricas deshabilitadas")
+    return respuestas.cache.estadisticas()
+
+@router.get("/push/estadisticas", include_in_schema=False)
+def estadisticas_push():
+    # conexiones SSE/WebSocket abiertas y consumidores lentos (desbordes → resync)
+    if not get_settings().api.metrics:
+        raise HTTPException(status_code=404, detail="Métricas deshabilitadas")
+    return push.broker.estadisticas()
+
+
+# =========================================================
+# App + CORS
+# =========================================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Una sola vez por proceso: config efectiva del engine y migraciones pendientes
+    database.log_engine_settings()
+    if get_settings().database.auto_migrate:
+        for version, nombre in migrations.migrar(database.engine):
+            database.logger.info("Migración aplicada: %04d %s", version, nombre)
+    yield
+    passwords.cerrar()
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """
+    Arma la app sin tocar la DB (eso queda para el lifespan).
+    Con `settings` propios (tests, benchmarks) reconfigura engine y caches.
+    """
+    if settings is not None:
+        usar_settings(settings)
+        database.init_engine(settings.database)
+        respuestas.configurar(settings.cache)
+    settings = get_settings()
+    auth.configurar(settings.auth)
+
+    app = FastAPI(
+        lifespan=lifespan, default_response_class=serializacion.clase_respuesta(settings.api.fast_json)
+    )
+    app.state.fast_json = settings.api.fast_json  # lo lee serializacion.activo
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+        allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "If-None-Match"],
+        expose_headers=["ETag", "Server-Timing"],
+    )
+    # Afuera de CORS: mide el request completo
+    if settings.api.metrics:
+        app.add_middleware(metricas.MetricasMiddleware, server_timing=settings.api.server_timing)
+
+    # Routers (⚠️ evita incluir routers que dupliquen rutas de `router`)
+    app.include_router(router_usuarios)
+    # servicios_por_codigo: ruta fija, tiene que ir antes que /emprendedores/{emprendedor_id}
+    app.include_router(router_emprendedores)
+    # DB_ASYNC=1 → versión AsyncSession de los horarios y de las lecturas del catálogo
+    # (misma API, para comparar). El resto de las rutas queda sync (ver DatabaseSettings).
+    # Import diferido: el modo sync no carga aiosqlite.
+    if settings.database.async_mode:
+        from app.routers.catalogo_async import router as router_catalogo
+        from app.routers.horarios_async import router as router_horarios
+    else:
+        from app.routers.catalogo import router as router_catalogo
+        from app.routers.horarios import router as router_horarios
+    app.include_router(router_horarios)
+    app.include_router(router_eventos)
+    app.include_router(router)
+    # después de `router`: sus rutas fijas (/emprendedores/mi, /turnos/mis-turnos, ...)
+    # van antes que /emprendedores/{emprendedor_id} y compañía
+    app.include_router(router_catalogo)
+    return app
+
+
+app = create_app()
@@ -0,0 +1,78 @@
+# app/migrations/__init__.py
+"""
+Migraciones versionadas y livianas (sin Alembic).
+
+Cada migración es una función `fn(conn)` registrada con @migracion(version, nombre)
+en app/migrations/versiones.py. La versión aplicada se guarda en `schema_version`.
+Las migraciones tienen que ser idempotentes: sobre una DB nueva la 1 crea el
+esquema inicial y las siguientes lo llevan al actual; sobre una DB que ya tiene
+algún cambio no deben fallar. Cada una lleva su propio DDL/SQL (no usa los modelos).
+"""
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+MIGRACIONES = []  # [(version, nombre, fn)] ordenadas por versión
+
+
+def migracion(version: int, nombre: str):
+    def registrar(fn):
+        if any(v == version for v, _, _ in MIGRACIONES):
+            raise ValueError(f"Migración {version} duplicada")
+        MIGRACIONES.append((version, nombre, fn))
+        MIGRACIONES.sort(key=lambda m: m[0])
+        return fn
+    return registrar
+
+
+def _asegurar_tabla(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        " version INTEGER PRIMARY KEY,"
+        " nombre VARCHAR NOT NULL,"
+        " aplicada_en DATETIME NOT NULL)"
+    ))
+
+
+def version_actual(conn) -> int:
+    _asegurar_tabla(conn)
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+
+def pendientes(engine):
+    """[(version, nombre)] de las migraciones todavía no aplicadas."""
+    with engine.begin() as conn:
+        actual = version_actual(conn)
+    return [(v, n) for v, n, _ in MIGRACIONES if v > actual]
+
+
+def migrar(engine):
+    """Aplica las pendientes, cada una en su propia transacción. Devuelve las aplicadas."""
+    aplicadas = []
+    for version, nombre, fn in MIGRACIONES:
+        with engine.begin() as conn:
+            if version <= version_actual(conn):
+                continue
+            fn(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version, nombre, aplicada_en) VALUES (:v, :n, :f)"),
+                {"v": version, "n": nombre, "f": datetime.utcnow()},
+            )
+        aplicadas.append((version, nombre))
+    return aplicadas
+
+
+# --- helpers para escribir migraciones idempotentes ---
+def tiene_columna(conn, tabla: str, columna: str) -> bool:
+    return any(c["name"] == columna for c in inspect(conn).get_columns(tabla))
+
+
+def agregar_columna(conn, tabla: str, columna: str, ddl: str) -> bool:
+    """ALTER TABLE ... ADD COLUMN solo si no existe. Devuelve True si la agregó."""
+    if tiene_columna(conn, tabla, columna):
+        return False
+    conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN {columna} {ddl}"))
+    return True
+
+
+from app.migrations import versiones  # noqa: E402,F401  (registra las migraciones)
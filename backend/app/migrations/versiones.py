@@ -0,0 +1,203 @@
+# app/migrations/versiones.py
+# Nueva migración = nueva función con el siguiente número. Nunca editar una ya publicada.
+#
+# Cada migración lleva su propio DDL/SQL congelado (tablas de Core declaradas acá,
+# no los modelos): los modelos cambian, lo que hizo una migración no. Sin SQL
+# propio de SQLite; lo que no es portable se calcula en Python.
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import (
+    Column, Date, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text,
+    Time, UniqueConstraint, bindparam, column, delete, func, insert, select, table, text,
+    update,
+)
+
+from app.migrations import agregar_columna, migracion
+from app.utils.zona import a_local
+
+LOTE = 1000  # filas por lote en las migraciones de datos
+
+
+@migracion(1, "esquema inicial")
+def esquema_inicial(conn):
+    # El esquema que creaba create_all antes de las migraciones. En una DB existente
+    # no toca nada: checkfirst
+    md = MetaData()
+    Table(
+        "usuarios", md,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("email", String, unique=True, index=True, nullable=False),
+        Column("username", String, unique=True, index=True, nullable=False),
+        Column("password", String, nullable=False),
+        Column("rol", String),
+        Column("token", String, nullable=True),
+    )
+    Table(
+        "emprendedores", md,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("usuario_id", Integer, ForeignKey("usuarios.id"), unique=True, nullable=False),
+        Column("nombre", String, nullable=False),
+        Column("apellido", String, nullable=True),
+        Column("negocio", String, nullable=True),
+        Column("descripcion", Text, nullable=True),
+        Column("codigo_cliente", String, unique=True, nullable=True),
+    )
+    Table(
+        "horarios", md,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("emprendedor_id", Integer, ForeignKey("emprendedores.id"), nullable=False),
+        Column("dia_semana", String, nullable=False),
+        Column("hora_inicio", Time, nullable=False),
+        Column("hora_fin", Time, nullable=False),
+    )
+    Table(
+        "servicios", md,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("nombre", String, nullable=False),
+        Column("descripcion", Text, nullable=True),
+        Column("duracion", Integer, nullable=False),
+        Column("precio", Float, nullable=True),
+        Column("emprendedor_id", Integer, ForeignKey("emprendedores.id"), nullable=False),
+    )
+    Table(
+        "turnos", md,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("servicio_id", Integer, ForeignKey("servicios.id"), nullable=False),
+        Column("fecha_hora_inicio", DateTime, nullable=False),
+        Column("duracion_minutos", Integer, nullable=False),
+        Column("capacidad", Integer, nullable=False),
+        Column("precio", Float, nullable=True),
+    )
+    Table(
+        "reservas", md,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("turno_id", Integer, ForeignKey("turnos.id"), nullable=False),
+        Column("usuario_id", Integer, ForeignKey("usuarios.id"), nullable=False),
+        UniqueConstraint("turno_id", "usuario_id", name="uq_turno_usuario"),
+    )
+    md.create_all(bind=conn)
+
+
+@migracion(2, "indices de claves foraneas y turnos por servicio/fecha")
+def indices_hot_path(conn):
+    # reservas.turno_id ya queda cubierto por uq_turno_usuario (turno_id, usuario_id)
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS ix_turnos_servicio_inicio ON turnos (servicio_id, fecha_hora_inicio)",
+        "CREATE INDEX IF NOT EXISTS ix_turnos_inicio ON turnos (fecha_hora_inicio, id)",
+        "CREATE INDEX IF NOT EXISTS ix_reservas_usuario_id ON reservas (usuario_id)",
+        "CREATE INDEX IF NOT EXISTS ix_servicios_emprendedor_id ON servicios (emprendedor_id)",
+        "CREATE INDEX IF NOT EXISTS ix_horarios_emprendedor_id ON horarios (emprendedor_id)",
+    ):
+        conn.execute(text(ddl))
+
+
+@migracion(3, "contador de ocupacion en turnos")
+def turnos_ocupados(conn):
+    agregar_columna(conn, "turnos", "ocupados", "INTEGER NOT NULL DEFAULT 0")
+    conn.execute(text(
+        "UPDATE turnos SET ocupados ="
+        " (SELECT COUNT(*) FROM reservas WHERE reservas.turno_id = turnos.id)"
+    ))
+
+
+@migracion(4, "fin calculado de turnos")
+def turnos_fecha_hora_fin(conn):
+    agregar_columna(conn, "turnos", "fecha_hora_fin", "DATETIME")
+    # fin = inicio + duración, en Python: la aritmética de fechas no es SQL portable
+    t = table(
+        "turnos", column("id", Integer), column("fecha_hora_inicio", DateTime),
+        column("duracion_minutos", Integer), column("fecha_hora_fin", DateTime),
+    )
+    cambio = update(t).where(t.c.id == bindparam("b_id")).values(fecha_hora_fin=bindparam("b_fin"))
+    ultimo = 0
+    while True:
+        filas = conn.execute(
+            select(t.c.id, t.c.fecha_hora_inicio, t.c.duracion_minutos)
+            .where(t.c.fecha_hora_fin.is_(None), t.c.id > ultimo)
+            .order_by(t.c.id)
+            .limit(LOTE)
+        ).all()
+        if not filas:
+            return
+        conn.execute(cambio, [
+            {"b_id": f.id, "b_fin": f.fecha_hora_inicio + timedelta(minutes=f.duracion_minutos)}
+            for f in filas
+        ])
+        ultimo = filas[-1].id
+
+
+def _cargar_estadisticas(conn):
+    """
+    Rellena estadisticas_diarias desde turnos (reservas = turnos.ocupados, migración 3)
+    por día LOCAL: la conversión de zona se hace en Python, en SQL no es portable.
+    """
+    t = table(
+        "turnos", column("id", Integer), column("servicio_id", Integer),
+        column("fecha_hora_inicio", DateTime), column("capacidad", Integer),
+        column("ocupados", Integer), column("precio", Float),
+    )
+    s = table("servicios", column("id", Integer), column("emprendedor_id", Integer), column("precio", Float))
+    e = table(
+        "estadisticas_diarias", column("emprendedor_id", Integer), column("dia", Date),
+        column("servicio_id", Integer), column("turnos", Integer), column("cupos", Integer),
+        column("reservas", Integer), column("ingresos", Float),
+    )
+    filas = conn.execute(
+        select(
+            s.c.emprendedor_id, t.c.servicio_id, t.c.fecha_hora_inicio, t.c.capacidad, t.c.ocupados,
+            (t.c.ocupados * func.coalesce(t.c.precio, s.c.precio, 0)).label("ingresos"),
+        )
+        .join(s, t.c.servicio_id == s.c.id)
+        .execution_options(yield_per=LOTE)
+    )
+    por_clave = defaultdict(lambda: [0, 0, 0, 0.0])
+    for f in filas:
+        acc = por_clave[(f.emprendedor_id, f.servicio_id, a_local(f.fecha_hora_inicio).date())]
+        acc[0] += 1
+        acc[1] += f.capacidad
+        acc[2] += f.ocupados
+        acc[3] += f.ingresos or 0
+    conn.execute(delete(e))
+    if por_clave:
+        conn.execute(insert(e), [
+            {
+                "emprendedor_id": eid, "servicio_id": sid, "dia": dia,
+                "turnos": turnos, "cupos": cupos, "reservas": reservas, "ingresos": ingresos,
+            }
+            for (eid, sid, dia), (turnos, cupos, reservas, ingresos) in por_clave.items()
+        ])
+
+
+@migracion(5, "rollup de estadisticas diarias")
+def estadisticas_diarias(conn):
+    md = MetaData()
+    e = Table(
+        "estadisticas_diarias", md,
+        Column("emprendedor_id", Integer, primary_key=True),
+        Column("dia", Date, primary_key=True),
+        Column("servicio_id", Integer, primary_key=True),
+        Column("turnos", Integer, nullable=False),
+        Column("cupos", Integer, nullable=False),
+        Column("reservas", Integer, nullable=False),
+        Column("ingresos", Float, nullable=False),
+    )
+    e.create(bind=conn, checkfirst=True)
+
+    _cargar_estadisticas(conn)
+
+
+@migracion(6, "version de datos por emprendedor")
+def emprendedores_version(conn):
+    agregar_columna(conn, "emprendedores", "version", "INTEGER NOT NULL DEFAULT 0")
+
+
+@migracion(7, "token del feed iCalendar")
+def emprendedores_ical_token(conn):
+    agregar_columna(conn, "emprendedores", "ical_token", "VARCHAR")
+
+
+@migracion(8, "estadisticas diarias por dia local")
+def estadisticas_dia_local(conn):
+    # La 5 agrupaba por día UTC: se recargan los días en la zona del negocio
+    _cargar_estadisticas(conn)
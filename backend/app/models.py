@@ -1,6 +1,7 @@
 from sqlalchemy import (
-    Column, Integer, String, ForeignKey, DateTime, Float, Text, UniqueConstraint, Time
+    Column, Integer, String, ForeignKey, Date, DateTime, Float, Text, UniqueConstraint, Time, Index
 )
+from sqlalchemy import event
 from sqlalchemy.orm import relationship
 from app.database import Base
 import datetime
@@ -13,7 +14,7 @@ class Horario(Base):
     __tablename__ = "horarios"
 
     id = Column(Integer, primary_key=True, index=True)
-    emprendedor_id = Column(Integer, ForeignKey("emprendedores.id"), nullable=False)
+    emprendedor_id = Column(Integer, ForeignKey("emprendedores.id"), nullable=False, index=True)
     dia_semana = Column(String, nullable=False)  # "Lunes", "Martes", etc.
     hora_inicio = Column(Time, nullable=False)
     hora_fin = Column(Time, nullable=False)
@@ -55,6 +56,10 @@ class Emprendedor(Base):
     descripcion = Column(Text, nullable=True)
 
     codigo_cliente = Column(String, unique=True, nullable=True)
+    # Versión de los datos de agenda (servicios/turnos/horarios/reservas), ver utils/etag.py
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Token del feed .ics (GET /emprendedores/{id}/agenda.ics?token=...); None = sin feed
+    ical_token = Column(String, nullable=True)
 
     usuario = relationship("Usuario", back_populates="emprendedor")
     servicios = relationship(
@@ -79,10 +84,13 @@ class Servicio(Base):
     duracion = Column(Integer, nullable=False, default=0)  # minutos
     precio = Column(Float, nullable=True, default=0)
 
-    emprendedor_id = Column(Integer, ForeignKey("emprendedores.id"), nullable=False)
+    emprendedor_id = Column(Integer, ForeignKey("emprendedores.id"), nullable=False, index=True)
 
     emprendedor = relationship("Emprendedor", back_populates="servicios")
-    turnos = relationship("Turno", back_populates="servicio", cascade="all, delete-orphan")
+    turnos = relationship(
+        "Turno", back_populates="servicio", cascade="all, delete-orphan",
+        order_by="Turno.fecha_hora_inicio",
+    )
 
 
 # =========================
@@ -96,12 +104,35 @@ class Turno(Base):
 
     fecha_hora_inicio = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
     duracion_minutos = Column(Integer, nullable=False)
+    # inicio + duración, guardado para validar superposiciones (ver _calcular_fin)
+    fecha_hora_fin = Column(DateTime, nullable=True)
     capacidad = Column(Integer, nullable=False, default=1)
+    # Reservas tomadas; lo mantiene app/crud/reservas.py (ver `recontar-ocupados`)
+    ocupados = Column(Integer, nullable=False, default=0, server_default="0")
     precio = Column(Float, nullable=True)
 
     servicio = relationship("Servicio", back_populates="turnos")
     reservas = relationship("Reserva", back_populates="turno", cascade="all, delete-orphan")
 
+    @property
+    def cupos_disponibles(self) -> int:
+        return max((self.capacidad or 0) - (self.ocupados or 0), 0)
+
+    # Índices del hot path (ver migración 2): disponibles por servicio y paginado por fecha
+    __table_args__ = (
+        Index("ix_turnos_servicio_inicio", "servicio_id", "fecha_hora_inicio"),
+        Index("ix_turnos_inicio", "fecha_hora_inicio", "id"),
+    )
+
+
+@event.listens_for(Turno, "before_insert")
+@event.listens_for(Turno, "before_update")
+def _calcular_fin(mapper, connection, turno):
+    if turno.fecha_hora_inicio is not None and turno.duracion_minutos is not None:
+        turno.fecha_hora_fin = turno.fecha_hora_inicio + datetime.timedelta(
+            minutes=turno.duracion_minutos
+        )
+
 
 # =========================
 # Reserva
@@ -111,7 +142,7 @@ class Reserva(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     turno_id = Column(Integer, ForeignKey("turnos.id"), nullable=False)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
 
     turno = relationship("Turno", back_populates="reservas")
     usuario = relationship("Usuario", back_populates="reservas")
@@ -119,3 +150,24 @@ class Reserva(Base):
     __table_args__ = (
         UniqueConstraint("turno_id", "usuario_id", name="uq_turno_usuario"),
     )
+
+
+# =========================
+# Estadísticas (rollup diario)
+# =========================
+class EstadisticaDiaria(Base):
+    """
+    Agregado por emprendedor/servicio/día del turno. Lo mantiene
+    app/crud/estadisticas.py en la misma transacción que cada escritura
+    (ver `reconstruir-estadisticas` para recalcularlo desde cero).
+    """
+    __tablename__ = "estadisticas_diarias"
+
+    emprendedor_id = Column(Integer, primary_key=True)
+    dia = Column(Date, primary_key=True)
+    servicio_id = Column(Integer, primary_key=True)
+
+    turnos = Column(Integer, nullable=False, default=0)
+    cupos = Column(Integer, nullable=False, default=0)      # suma de capacidad
+    reservas = Column(Integer, nullable=False, default=0)
+    ingresos = Column(Float, nullable=False, default=0)     # Turno.precio o Servicio.precio
@@ -0,0 +1,117 @@
+# app/routers/catalogo.py
+# Lecturas principales (listas y detalle de emprendedores, servicios y turnos).
+# Tiene versión async en catalogo_async.py (DB_ASYNC=1); las dos sirven la misma API.
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.crud import turnos as crud_turnos
+from app.dependencies import get_db
+from app.utils import respuestas, serializacion
+from app.utils.paginacion import PaginaParams, paginar, parametros_pagina
+
+router = APIRouter()
+
+
+# =========================================================
+# EMPRENDEDORES
+# =========================================================
+@router.get("/emprendedores/", response_model=schemas.Pagina[schemas.EmprendedorResponse])
+def listar_emprendedores(
+    request: Request,
+    pagina: PaginaParams = Depends(parametros_pagina),
+    db: Session = Depends(get_db),
+):
+    return respuestas.responder(
+        request, schemas.Pagina[schemas.EmprendedorResponse], ["emprendedores"],
+        lambda: paginar(db.query(models.Emprendedor), pagina, models.Emprendedor.id),
+    )
+
+@router.get("/emprendedores/{emprendedor_id}", response_model=schemas.EmprendedorResponse)
+def detalle_emprendedor(emprendedor_id: int, request: Request, db: Session = Depends(get_db)):
+    def cargar():
+        emprendedor = (
+            db.query(models.Emprendedor)
+            .filter(models.Emprendedor.id == emprendedor_id)
+            .first()
+        )
+        if not emprendedor:
+            raise HTTPException(status_code=404, detail="Emprendedor no encontrado")
+        return emprendedor
+
+    return respuestas.responder(
+        request, schemas.EmprendedorResponse, [f"emprendedor:{emprendedor_id}"], cargar
+    )
+
+
+# =========================================================
+# SERVICIOS
+# =========================================================
+@router.get("/servicios/", response_model=schemas.Pagina[schemas.ServicioResponseCreate])
+def list_servicios(
+    request: Request,
+    emprendedor_id: Optional[int] = None,
+    pagina: PaginaParams = Depends(parametros_pagina),
+    db: Session = Depends(get_db),
+):
+    q = db.query(models.Servicio)
+    if emprendedor_id is not None:
+        q = q.filter(models.Servicio.emprendedor_id == emprendedor_id)
+    tags = ["servicios"] if emprendedor_id is None else [f"servicios:{emprendedor_id}"]
+    return respuestas.responder(
+        request, schemas.Pagina[schemas.ServicioResponseCreate], tags,
+        lambda: paginar(q, pagina, models.Servicio.id),
+    )
+
+@router.get("/servicios/{servicio_id}", response_model=schemas.ServicioResponseCreate)
+def detalle_servicio(servicio_id: int, request: Request, db: Session = Depends(get_db)):
+    def cargar():
+        servicio = (
+            db.query(models.Servicio)
+            .filter(models.Servicio.id == servicio_id)
+            .first()
+        )
+        if not servicio:
+            raise HTTPException(status_code=404, detail="Servicio no encontrado")
+        return servicio
+
+    return respuestas.responder(
+        request, schemas.ServicioResponseCreate, [f"servicio:{servicio_id}"], cargar
+    )
+
+
+# =========================================================
+# TURNOS
+# =========================================================
+@router.get("/turnos/", response_model=schemas.Pagina[schemas.TurnoResponseCreate])
+def listar_turnos(
+    servicio_id: Optional[int] = None,
+    emprendedor_id: Optional[int] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    pagina: PaginaParams = Depends(parametros_pagina),
+    db: Session = Depends(get_db),
+    rapido: bool = Depends(serializacion.activo),
+):
+    q = (
+        db.query(*serializacion.columnas(schemas.TurnoResponseCreate, models.Turno))
+        if rapido else db.query(models.Turno)
+    )
+    q = crud_turnos.filtrar_turnos(q, servicio_id, emprendedor_id, desde, hasta)
+    res = paginar(q, pagina, models.Turno.fecha_hora_inicio, models.Turno.id)
+    if rapido:
+        return serializacion.respuesta(
+            schemas.Pagina[schemas.TurnoResponseCreate],
+            {**res, "items": serializacion.filas(res["items"])},
+        )
+    return res
+
+@router.get("/turnos/{turno_id}", response_model=schemas.TurnoResponseCreate)
+def detalle_turno(turno_id: int, db: Session = Depends(get_db)):
+    turno = db.query(models.Turno).filter(models.Turno.id == turno_id).first()
+    if not turno:
+        raise HTTPException(status_code=404, detail="Turno no encontrado")
+    return turno
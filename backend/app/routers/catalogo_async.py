@@ -0,0 +1,109 @@
+# app/routers/catalogo_async.py
+# Versión async de app/routers/catalogo.py (se monta cuando DB_ASYNC=1)
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.crud import turnos as crud_turnos
+from app.dependencies import get_async_db
+from app.utils import respuestas, serializacion
+from app.utils.paginacion import PaginaParams, paginar_async, parametros_pagina
+
+router = APIRouter()
+
+
+# =========================================================
+# EMPRENDEDORES
+# =========================================================
+@router.get("/emprendedores/", response_model=schemas.Pagina[schemas.EmprendedorResponse])
+async def listar_emprendedores(
+    request: Request,
+    pagina: PaginaParams = Depends(parametros_pagina),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await respuestas.responder_async(
+        request, schemas.Pagina[schemas.EmprendedorResponse], ["emprendedores"],
+        lambda: paginar_async(db, select(models.Emprendedor), pagina, models.Emprendedor.id),
+    )
+
+@router.get("/emprendedores/{emprendedor_id}", response_model=schemas.EmprendedorResponse)
+async def detalle_emprendedor(emprendedor_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def cargar():
+        emprendedor = await db.get(models.Emprendedor, emprendedor_id)
+        if not emprendedor:
+            raise HTTPException(status_code=404, detail="Emprendedor no encontrado")
+        return emprendedor
+
+    return await respuestas.responder_async(
+        request, schemas.EmprendedorResponse, [f"emprendedor:{emprendedor_id}"], cargar
+    )
+
+
+# =========================================================
+# SERVICIOS
+# =========================================================
+@router.get("/servicios/", response_model=schemas.Pagina[schemas.ServicioResponseCreate])
+async def list_servicios(
+    request: Request,
+    emprendedor_id: Optional[int] = None,
+    pagina: PaginaParams = Depends(parametros_pagina),
+    db: AsyncSession = Depends(get_async_db),
+):
+    q = select(models.Servicio)
+    if emprendedor_id is not None:
+        q = q.where(models.Servicio.emprendedor_id == emprendedor_id)
+    tags = ["servicios"] if emprendedor_id is None else [f"servicios:{emprendedor_id}"]
+    return await respuestas.responder_async(
+        request, schemas.Pagina[schemas.ServicioResponseCreate], tags,
+        lambda: paginar_async(db, q, pagina, models.Servicio.id),
+    )
+
+@router.get("/servicios/{servicio_id}", response_model=schemas.ServicioResponseCreate)
+async def detalle_servicio(servicio_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def cargar():
+        servicio = await db.get(models.Servicio, servicio_id)
+        if not servicio:
+            raise HTTPException(status_code=404, detail="Servicio no encontrado")
+        return servicio
+
+    return await respuestas.responder_async(
+        request, schemas.ServicioResponseCreate, [f"servicio:{servicio_id}"], cargar
+    )
+
+
+# =========================================================
+# TURNOS
+# =========================================================
+@router.get("/turnos/", response_model=schemas.Pagina[schemas.TurnoResponseCreate])
+async def listar_turnos(
+    servicio_id: Optional[int] = None,
+    emprendedor_id: Optional[int] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    pagina: PaginaParams = Depends(parametros_pagina),
+    db: AsyncSession = Depends(get_async_db),
+    rapido: bool = Depends(serializacion.activo),
+):
+    q = (
+        select(*serializacion.columnas(schemas.TurnoResponseCreate, models.Turno))
+        if rapido else select(models.Turno)
+    )
+    q = crud_turnos.filtrar_turnos(q, servicio_id, emprendedor_id, desde, hasta)
+    res = await paginar_async(db, q, pagina, models.Turno.fecha_hora_inicio, models.Turno.id)
+    if rapido:
+        return serializacion.respuesta(
+            schemas.Pagina[schemas.TurnoResponseCreate],
+            {**res, "items": serializacion.filas(res["items"])},
+        )
+    return res
+
+@router.get("/turnos/{turno_id}", response_model=schemas.TurnoResponseCreate)
+async def detalle_turno(turno_id: int, db: AsyncSession = Depends(get_async_db)):
+    turno = await db.get(models.Turno, turno_id)
+    if not turno:
+        raise HTTPException(status_code=404, detail="Turno no encontrado")
+    return turno
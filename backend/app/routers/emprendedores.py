@@ -1,14 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session, selectinload
 from app import models, schemas
+from app.config import get_settings
 from app.dependencies import get_db
+from app.utils import cambios, respuestas
+from app.utils.cache import TTLCache
 
 router = APIRouter(prefix="/emprendedores")
 
+# codigo_cliente -> emprendedor_id (se vacía ante cualquier cambio de emprendedores)
+_codigos = TTLCache(maxsize=4096, ttl=600)
+
+
+@cambios.suscribir
+def _invalidar_codigos(lista):
+    if any(c.tipo in (None, "emprendedor") for c in lista):
+        _codigos.clear()
+
+
+def _emprendedor_por_codigo(db: Session, codigo: str):
+    eid = _codigos.get(codigo)
+    if eid is None:
+        fila = (
+            db.query(models.Emprendedor.id)
+            .filter(models.Emprendedor.codigo_cliente == codigo)
+            .first()
+        )
+        if not fila:
+            return None
+        eid = fila.id
+        _codigos.set(codigo, eid)
+    return eid
+
+
+def _hasta_proximo_turno(servicios) -> Optional[float]:
+    # La respuesta vence cuando empieza el primer turno que incluye (deja de ser "próximo")
+    inicios = [t.fecha_hora_inicio for s in servicios for t in s.turnos]
+    if not inicios:
+        return None
+    return max((min(inicios) - datetime.utcnow()).total_seconds(), 0)
+
+
 @router.get("/servicios_por_codigo/{codigo}", response_model=list[schemas.ServicioResponse])
-def servicios_por_codigo(codigo: str, db: Session = Depends(get_db)):
-    emprendedor = db.query(models.Emprendedor).filter(models.Emprendedor.codigo_cliente == codigo).first()
-    if not emprendedor:
+def servicios_por_codigo(codigo: str, request: Request, db: Session = Depends(get_db)):
+    eid = _emprendedor_por_codigo(db, codigo)
+    if eid is None:
         raise HTTPException(status_code=404, detail="Código inválido")
-    
-    return db.query(models.Servicio).filter(models.Servicio.emprendedor_id == emprendedor.id).all()
\ No newline at end of file
+
+    def cargar():
+        # Solo turnos próximos dentro del horizonte, en UN select-in para todos los servicios
+        ahora = datetime.utcnow()
+        hasta = ahora + timedelta(days=get_settings().agenda.horizonte_dias)
+        proximos = models.Servicio.turnos.and_(
+            models.Turno.fecha_hora_inicio >= ahora,
+            models.Turno.fecha_hora_inicio < hasta,
+        )
+        return (
+            db.query(models.Servicio)
+            .options(selectinload(proximos))
+            .filter(models.Servicio.emprendedor_id == eid)
+            .all()
+        )
+
+    return respuestas.responder(
+        request, list[schemas.ServicioResponse],
+        [f"emprendedor:{eid}", f"servicios:{eid}", f"agenda:{eid}"],
+        cargar, vence=_hasta_proximo_turno,
+    )
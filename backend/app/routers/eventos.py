@@ -0,0 +1,126 @@
+# app/routers/eventos.py
+"""
+Canales push de la agenda (ver app/utils/push.py):
+
+    GET /emprendedores/{id}/eventos      SSE (EventSource)
+    GET /servicios/{id}/eventos          SSE
+    WS  /emprendedores/{id}/eventos/ws   los mismos mensajes por WebSocket
+    WS  /servicios/{id}/eventos/ws
+
+Sin auth: llevan lo mismo que /disponibilidad y /turnos/disponibles, que son
+públicos. La DB se usa solo para ubicar el canal, en una sesión corta: una
+conexión abierta no retiene una conexión del pool.
+"""
+from typing import Optional
+
+import anyio
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app import database, models
+from app.config import get_settings
+from app.utils import push
+
+router = APIRouter(tags=["eventos"])
+
+RETRY_MS = 3000  # reconexión de EventSource
+
+
+def _emprendedor(emprendedor_id: int) -> Optional[int]:
+    with database.SessionLocal() as db:
+        fila = db.query(models.Emprendedor.id).filter(models.Emprendedor.id == emprendedor_id).first()
+        return fila.id if fila else None
+
+
+def _emprendedor_del_servicio(servicio_id: int) -> Optional[int]:
+    with database.SessionLocal() as db:
+        fila = (
+            db.query(models.Servicio.emprendedor_id)
+            .filter(models.Servicio.id == servicio_id)
+            .first()
+        )
+        return fila.emprendedor_id if fila else None
+
+
+# =========================
+# SSE
+# =========================
+async def _sse(sub: push.Suscripcion):
+    ping = get_settings().push.ping
+    yield f"retry: {RETRY_MS}\n\n"
+    while True:
+        mensajes = await sub.siguientes(ping)
+        # el comentario mantiene viva la conexión en proxies y detecta clientes idos
+        yield "".join(f"data: {m}\n\n" for m in mensajes) if mensajes else ": ping\n\n"
+
+
+def _respuesta_sse(emprendedor_id: Optional[int], servicio_id: Optional[int] = None):
+    if emprendedor_id is None:
+        raise HTTPException(status_code=404, detail="Servicio no encontrado" if servicio_id else "Emprendedor no encontrado")
+    sub = push.broker.abrir(emprendedor_id, servicio_id)
+    if sub is None:
+        raise HTTPException(status_code=503, detail="Demasiadas conexiones abiertas")
+    # El cierre va como background: corre aunque el cliente se vaya antes del primer mensaje
+    return StreamingResponse(
+        _sse(sub),
+        media_type=push.MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(push.broker.cerrar, sub),
+    )
+
+
+@router.get("/emprendedores/{emprendedor_id}/eventos")
+async def eventos_emprendedor(emprendedor_id: int):
+    return _respuesta_sse(await run_in_threadpool(_emprendedor, emprendedor_id))
+
+
+@router.get("/servicios/{servicio_id}/eventos")
+async def eventos_servicio(servicio_id: int):
+    return _respuesta_sse(await run_in_threadpool(_emprendedor_del_servicio, servicio_id), servicio_id)
+
+
+# =========================
+# WebSocket
+# =========================
+async def _ws(websocket: WebSocket, emprendedor_id: Optional[int], servicio_id: Optional[int] = None):
+    if emprendedor_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    sub = push.broker.abrir(emprendedor_id, servicio_id)
+    if sub is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    try:
+        await websocket.accept()
+        async with anyio.create_task_group() as tg:
+
+            async def leer():
+                # el cliente no manda nada: solo se espera el cierre
+                while (await websocket.receive())["type"] != "websocket.disconnect":
+                    pass
+                tg.cancel_scope.cancel()
+
+            async def escribir():
+                try:
+                    while True:
+                        for m in await sub.siguientes():
+                            await websocket.send_text(m)
+                except (WebSocketDisconnect, RuntimeError):
+                    tg.cancel_scope.cancel()
+
+            tg.start_soon(leer)
+            tg.start_soon(escribir)
+    finally:
+        push.broker.cerrar(sub)
+
+
+@router.websocket("/emprendedores/{emprendedor_id}/eventos/ws")
+async def eventos_emprendedor_ws(websocket: WebSocket, emprendedor_id: int):
+    await _ws(websocket, await run_in_threadpool(_emprendedor, emprendedor_id))
+
+
+@router.websocket("/servicios/{servicio_id}/eventos/ws")
+async def eventos_servicio_ws(websocket: WebSocket, servicio_id: int):
+    await _ws(websocket, await run_in_threadpool(_emprendedor_del_servicio, servicio_id), servicio_id)
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.dependencies import get_db
 from app.crud import horarios as crud
 from app.schemas import Horario, HorarioCreate, HorarioUpdate
+from app.utils import etag
 
 router = APIRouter(prefix="/emprendedores", tags=["horarios"])
 
@@ -25,7 +26,10 @@ def update_horarios(emprendimiento_id: int, horarios: list[HorarioUpdate], db: S
 
 
 @router.get("/{emprendedor_id}/horarios", response_model=list[Horario])
-def listar_horarios(emprendedor_id: int, db: Session = Depends(get_db)):
+def listar_horarios(emprendedor_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    no_modificado = etag.condicional(request, response, etag.version_de(db, emprendedor_id))
+    if no_modificado:
+        return no_modificado
     return crud.get_horarios(db, emprendedor_id)
 
 @router.post("/{emprendedor_id}/horarios", response_model=Horario)
@@ -0,0 +1,48 @@
+# Versión async de app/routers/horarios.py (se monta cuando DB_ASYNC=1)
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_async_db
+from app.crud import horarios_async as crud
+from app.schemas import Horario, HorarioCreate, HorarioUpdate
+from app.utils import etag
+
+router = APIRouter(prefix="/emprendedores", tags=["horarios"])
+
+# Reemplaza todos los horarios de un emprendimiento.
+# Mismo body que la versión sync (HorarioUpdate); para guardar hacen falta las dos horas.
+@router.put("/emprendimiento/{emprendimiento_id}")
+async def update_horarios(emprendimiento_id: int, horarios: list[HorarioUpdate], db: AsyncSession = Depends(get_async_db)):
+    try:
+        nuevos = [HorarioCreate.model_validate(h.model_dump()) for h in horarios]
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    await crud.replace_horarios(db, emprendimiento_id, nuevos)
+    return {"message": "Horarios actualizados"}
+
+
+@router.get("/{emprendedor_id}/horarios", response_model=list[Horario])
+async def listar_horarios(emprendedor_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    fila = (await db.execute(etag.consulta_version(emprendedor_id))).first()
+    no_modificado = etag.condicional(request, response, fila)
+    if no_modificado:
+        return no_modificado
+    return await crud.get_horarios(db, emprendedor_id)
+
+@router.post("/{emprendedor_id}/horarios", response_model=Horario)
+async def crear_horario(emprendedor_id: int, horario: HorarioCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud.create_horario(db, emprendedor_id, horario)
+
+@router.put("/horarios/{horario_id}", response_model=Horario)
+async def actualizar_horario(horario_id: int, horario: HorarioCreate, db: AsyncSession = Depends(get_async_db)):
+    updated = await crud.update_horario(db, horario_id, horario)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Horario no encontrado")
+    return updated
+
+@router.delete("/horarios/{horario_id}")
+async def borrar_horario(horario_id: int, db: AsyncSession = Depends(get_async_db)):
+    deleted = await crud.delete_horario(db, horario_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Horario no encontrado")
+    return {"detail": "Horario eliminado correctamente"}
@@ -1,86 +1,110 @@
 # app/routers/usuarios.py
-import bcrypt
+from typing import Optional, Tuple
+
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app import models, schemas
+from app.crud import reservas as crud_reservas
 from app.dependencies import get_db
-from app.auth import get_current_user, create_access_token  # ⬅️ IMPORTANTE
+from app.auth import get_current_user, get_current_claims, create_access_token, invalidar_usuario  # ⬅️ IMPORTANTE
+from app.config import User as Claims
 from app.utils.emprendedor import ensure_emprendedor_for_user
-from app.auth import create_access_token, get_current_user
+from app.utils import passwords
+from app.utils.paginacion import PaginaParams, paginar, parametros_pagina
 
 router = APIRouter(prefix="/usuarios", tags=["usuarios"])
 
 # ===========================
 # Registro
 # ===========================
-@router.post("/registro")
-def sign_up(request_data: schemas.RegisterSchema, db: Session = Depends(get_db)):
+# La DB se usa en helpers sync corridos en el threadpool: con busy_timeout una
+# escritura puede esperar segundos y no debe frenar el event loop. En el loop
+# solo se espera a bcrypt (que corre en su propio executor).
+def _existe_usuario(db: Session, username: str, email: str) -> bool:
     existe = (
-        db.query(models.Usuario)
-        .filter(
-            (models.Usuario.username == request_data.username)
-            | (models.Usuario.email == request_data.email)
-        )
+        db.query(models.Usuario.id)
+        .filter((models.Usuario.username == username) | (models.Usuario.email == email))
         .first()
+        is not None
     )
-    if existe:
-        raise HTTPException(status_code=400, detail="Usuario o email ya existe")
+    # Liberamos la conexión: no retenerla del pool mientras esperamos a bcrypt
+    db.rollback()
+    return existe
 
-    # Hasheamos y GUARDAMOS como string para evitar confusiones
-    hashed_bytes = bcrypt.hashpw(request_data.password.encode("utf-8"), bcrypt.gensalt())
-    hashed_str = hashed_bytes.decode("utf-8")  # ← guardamos str
 
+def _crear_usuario(db: Session, datos: schemas.RegisterSchema, hashed_str: str) -> schemas.UsuarioResponse:
     nuevo_usuario = models.Usuario(
-        email=request_data.email,
-        username=request_data.username,
+        email=datos.email,
+        username=datos.username,
         password=hashed_str,           # ← str
-        rol=request_data.rol or "cliente",
+        rol=datos.rol or "cliente",
     )
-
     db.add(nuevo_usuario)
     db.commit()
     db.refresh(nuevo_usuario)
+    return schemas.UsuarioResponse.model_validate(nuevo_usuario)
+
 
-    schema = schemas.UsuarioResponse.model_validate(nuevo_usuario)
+@router.post("/registro")
+async def sign_up(request_data: schemas.RegisterSchema, db: Session = Depends(get_db)):
+    if await run_in_threadpool(_existe_usuario, db, request_data.username, request_data.email):
+        raise HTTPException(status_code=400, detail="Usuario o email ya existe")
+
+    # Hasheamos (en el executor de bcrypt) y GUARDAMOS como string
+    hashed_str = await passwords.hash_password(request_data.password)
+
+    schema = await run_in_threadpool(_crear_usuario, db, request_data, hashed_str)
     return {"message": schema}
 
 # ===========================
 # Login
 # ===========================
-@router.post("/login")
-def login(request_data: schemas.LoginSchema, db: Session = Depends(get_db)):
-    user = (
-        db.query(models.Usuario)
-        .filter(models.Usuario.username == request_data.username)
-        .first()
+def _buscar_para_login(db: Session, username: str) -> Optional[Tuple[schemas.UsuarioResponse, str]]:
+    user = db.query(models.Usuario).filter(models.Usuario.username == username).first()
+    if not user:
+        return None
+    encontrado = (schemas.UsuarioResponse.model_validate(user), user.password)
+    # Liberamos la conexión: no retenerla del pool mientras esperamos a bcrypt
+    db.rollback()
+    return encontrado
+
+
+def _guardar_hash(db: Session, usuario_id: int, nuevo_hash: str) -> None:
+    db.query(models.Usuario).filter(models.Usuario.id == usuario_id).update(
+        {"password": nuevo_hash}, synchronize_session=False
     )
+    db.commit()
+    invalidar_usuario(usuario_id)
 
-    if not user:
+
+@router.post("/login")
+async def login(request_data: schemas.LoginSchema, db: Session = Depends(get_db)):
+    encontrado = await run_in_threadpool(_buscar_para_login, db, request_data.username)
+    if encontrado is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuario o contraseña incorrectos",
         )
+    schema, stored = encontrado
 
-    # user.password puede venir como str (recomendado) o bytes (datos antiguos)
-    stored = user.password
-    if isinstance(stored, str):
-        stored_bytes = stored.encode("utf-8")
-    else:
-        stored_bytes = stored  # ya es bytes
-
-    ok = bcrypt.checkpw(request_data.password.encode("utf-8"), stored_bytes)
+    ok, necesita_rehash = await passwords.verify_password(request_data.password, stored)
     if not ok:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuario o contraseña incorrectos",
         )
 
-    schema = schemas.UsuarioResponse.model_validate(user)
+    # Cambió BCRYPT_ROUNDS: aprovechamos que tenemos la contraseña en claro
+    if necesita_rehash:
+        nuevo_hash = await passwords.hash_password(request_data.password)
+        await run_in_threadpool(_guardar_hash, db, schema.id, nuevo_hash)
+
     token = create_access_token({
-        "sub": user.id,            # create_access_token ya lo castea a str
-        "username": user.username,
-        "rol": user.rol,
+        "sub": schema.id,          # create_access_token ya lo castea a str
+        "username": schema.username,
+        "rol": schema.rol,
     })
 
     # El front espera user_schema y token
@@ -105,9 +129,9 @@ def get_profile_info(current_user: models.Usuario = Depends(get_current_user)):
 def activar_emprendedor(
     usuario_id: int,
     db: Session = Depends(get_db),
-    current_user: models.Usuario = Depends(get_current_user),
+    claims: Claims = Depends(get_current_claims),
 ):
-    if current_user.id != usuario_id:
+    if claims.sub != usuario_id:
         raise HTTPException(status_code=403, detail="No autorizado")
 
     usuario = db.query(models.Usuario).filter(models.Usuario.id == usuario_id).first()
@@ -118,6 +142,7 @@ def activar_emprendedor(
         usuario.rol = "emprendedor"
         db.commit()
         db.refresh(usuario)
+        invalidar_usuario(usuario.id)
 
     # ⬇️ CREA (si no existe) y asegura nombre no-nulo
     e = ensure_emprendedor_for_user(db, usuario.id)
@@ -149,9 +174,16 @@ def logout(request: Request):
 # ===========================
 # CRUD Usuarios (opcional)
 # ===========================
-@router.get("/", response_model=list[schemas.UsuarioResponse])
-def listar_usuarios(db: Session = Depends(get_db)):
-    return db.query(models.Usuario).all()
+@router.get("/", response_model=schemas.Pagina[schemas.UsuarioResponse])
+def listar_usuarios(
+    rol: Optional[str] = None,
+    pagina: PaginaParams = Depends(parametros_pagina),
+    db: Session = Depends(get_db),
+):
+    q = db.query(models.Usuario)
+    if rol is not None:
+        q = q.filter(models.Usuario.rol == rol)
+    return paginar(q, pagina, models.Usuario.id)
 
 @router.get("/{usuario_id}", response_model=schemas.UsuarioResponse)
 def detalle_usuario(usuario_id: int, db: Session = Depends(get_db)):
@@ -171,6 +203,7 @@ def actualizar_usuario(
     usuario.rol = datos.rol
     db.commit()
     db.refresh(usuario)
+    invalidar_usuario(usuario.id)
     return usuario
 
 @router.delete("/{usuario_id}")
@@ -178,6 +211,8 @@ def eliminar_usuario(usuario_id: int, db: Session = Depends(get_db)):
     usuario = db.query(models.Usuario).filter(models.Usuario.id == usuario_id).first()
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    crud_reservas.liberar_reservas_de_usuario(db, usuario.id)
     db.delete(usuario)
     db.commit()
+    invalidar_usuario(usuario_id)
     return {"ok": True, "mensaje": "Usuario eliminado"}
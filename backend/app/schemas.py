@@ -1,7 +1,17 @@
-from datetime import datetime, time
-from typing import Optional, List
+from datetime import date, datetime, time
+from typing import Generic, Optional, List, TypeVar
 
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator, model_validator
+
+T = TypeVar("T")
+
+
+# =========================
+# Paginación (keyset)
+# =========================
+class Pagina(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
 
 
 # =========================
@@ -92,6 +102,7 @@ class TurnoResponse(BaseModel):
     fecha_hora_inicio: datetime
     capacidad: int
     precio: Optional[float] = None
+    cupos_disponibles: Optional[int] = None
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -144,6 +155,98 @@ class TurnoResponseCreate(TurnoBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TurnoDisponible(TurnoResponseCreate):
+    cupos_disponibles: int
+
+
+# Agenda del emprendedor en una ventana (GET /mis/agenda): servicios + turnos
+class TurnoAgenda(BaseModel):
+    id: int
+    servicio_id: int
+    servicio_nombre: str
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: Optional[datetime] = None
+    duracion_minutos: int
+    capacidad: int
+    reservados: int
+    precio: Optional[float] = None
+
+
+class AgendaResponse(BaseModel):
+    emprendedor_id: int
+    desde: datetime
+    hasta: datetime
+    servicios: List[ServicioResponseCreate]
+    turnos: List[TurnoAgenda]
+
+
+# Alta masiva: lista explícita O regla de recurrencia (se expande en el server)
+class RecurrenciaTurnos(BaseModel):
+    dias_semana: List[int | str] = Field(min_length=1)  # 0=lunes … 6=domingo, o "Lunes"
+    horas: List[time] = Field(min_length=1)
+    desde: date
+    hasta: date  # inclusive
+    capacidad: int = Field(1, ge=1)
+    precio: Optional[float] = None
+    duracion_minutos: Optional[int] = Field(None, gt=0)  # default: Servicio.duracion
+
+    @field_validator("dias_semana")
+    @classmethod
+    def _dias(cls, dias):
+        from app.utils.disponibilidad import dia_semana_idx
+
+        normalizados = set()
+        for d in dias:
+            idx = d if isinstance(d, int) else dia_semana_idx(d)
+            if idx is None or not 0 <= idx <= 6:
+                raise ValueError(f"Día inválido: {d}")
+            normalizados.add(idx)
+        return sorted(normalizados)
+
+    @model_validator(mode="after")
+    def _rango(self):
+        if self.hasta < self.desde:
+            raise ValueError("hasta debe ser posterior a desde")
+        return self
+
+
+class TurnosBulkCreate(BaseModel):
+    servicio_id: int
+    turnos: Optional[List[TurnoBase]] = None
+    recurrencia: Optional[RecurrenciaTurnos] = None
+
+    @model_validator(mode="after")
+    def _uno_u_otro(self):
+        if (self.turnos is None) == (self.recurrencia is None):
+            raise ValueError("Enviá `turnos` o `recurrencia` (uno de los dos)")
+        return self
+
+
+class TurnosBulkResponse(BaseModel):
+    creados: int
+    ids: List[int]
+
+
+# Importación CSV/NDJSON (crud/importacion.py)
+class ErrorImportacion(BaseModel):
+    fila: int
+    error: str
+
+
+class ImportacionResultado(BaseModel):
+    procesadas: int
+    importadas: int
+    errores: int
+    detalle: List[ErrorImportacion]
+    detalle_truncado: bool = False
+
+
+# Slot libre calculado desde Horario (no es una fila de turnos)
+class SlotDisponible(BaseModel):
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+
+
 # =========================
 # Reserva
 # =========================
@@ -169,3 +272,29 @@ class ReservaOut(BaseModel):
     servicio_nombre: str
     emprendedor_id: int
     model_config = ConfigDict(from_attributes=True)
+
+
+# =========================
+# Estadísticas
+# =========================
+class EstadisticaValores(BaseModel):
+    turnos: int
+    cupos: int
+    reservas: int
+    ingresos: float
+    ocupacion: float  # reservas / cupos
+
+
+class EstadisticaPeriodo(EstadisticaValores):
+    periodo: str  # "YYYY-MM-DD" o "YYYY-MM", días locales (AGENDA_ZONA_HORARIA)
+
+
+class EstadisticaServicio(EstadisticaValores):
+    servicio_id: int
+
+
+class Estadisticas(BaseModel):
+    granularidad: str
+    periodos: List[EstadisticaPeriodo]
+    por_servicio: List[EstadisticaServicio]
+    totales: EstadisticaValores
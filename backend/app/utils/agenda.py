@@ -0,0 +1,215 @@
+# app/utils/agenda.py
+"""
+Validación de turnos nuevos contra la agenda del emprendedor.
+
+- AgendaIndex: intervalos (inicio, fin, turno_id) ordenados por inicio. Como se
+  guarda la duración máxima D, los únicos candidatos a superponerse con [a, b)
+  son los que empiezan en (a − D, b): dos bisect + los pocos que caen adentro.
+- Ventanas de Horario por día de semana, en hora local (AGENDA_ZONA_HORARIA,
+  ver app/utils/zona.py): los turnos (UTC) se pasan a local antes de comparar.
+
+Las ventanas se cachean por emprendedor (TTL corto, se invalidan con los
+cambios de horarios publicados después del commit) y sirven de filtro rápido:
+un turno fuera de horario se rechaza sin leer turnos. La superposición se
+decide siempre contra la DB, dentro de la transacción que va a insertar:
+`bloquear` toma la fila del emprendedor (serializa escrituras de su agenda
+también entre workers) y `indice` lee solo los turnos que pueden chocar con el
+rango (ix_turnos_inicio / ix_turnos_servicio_inicio).
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils import cambios
+from app.utils.cache import TTLCache
+from app.utils.disponibilidad import ventanas_por_dia
+from app.utils.zona import a_local
+
+Intervalo = Tuple[datetime, datetime, int]
+Ventana = Tuple[timedelta, timedelta]  # desde la medianoche local
+
+
+def naive_utc(dt: datetime) -> datetime:
+    """La DB guarda datetimes sin zona (UTC): normalizamos lo que llega con zona."""
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def fin_de(inicio: datetime, duracion_minutos: int) -> datetime:
+    return inicio + timedelta(minutes=duracion_minutos or 0)
+
+
+class AgendaIndex:
+    def __init__(self, intervalos: Iterable[Intervalo] = (), ventanas: Dict[int, List[Ventana]] = None):
+        self._items: List[Intervalo] = sorted(intervalos)
+        self._inicios: List[datetime] = [i[0] for i in self._items]
+        self._max_dur = max((fin - ini for ini, fin, _ in self._items), default=timedelta(0))
+        self._ventanas = ventanas or {}
+        self._ventanas_inicio = {d: [v[0] for v in vs] for d, vs in self._ventanas.items()}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def superpuestos(self, inicio: datetime, fin: datetime, excluir_id: Optional[int] = None) -> List[int]:
+        desde = bisect_right(self._inicios, inicio - self._max_dur)
+        hasta = bisect_left(self._inicios, fin)
+        return [
+            tid
+            for ini, f, tid in self._items[desde:hasta]
+            if f > inicio and ini < fin and tid != excluir_id
+        ]
+
+    def dentro_de_horario(self, inicio: datetime, fin: datetime) -> bool:
+        """`inicio`/`fin` en UTC sin zona. Sin horarios cargados no hay restricción."""
+        if not self._ventanas:
+            return True
+        inicio, fin = a_local(inicio), a_local(fin)
+        medianoche = datetime.combine(inicio.date(), time(0))
+        desde, hasta = inicio - medianoche, fin - medianoche  # un turno que termina 00:00 → 24 h
+        i = bisect_right(self._ventanas_inicio.get(inicio.weekday(), []), desde) - 1
+        if i < 0:
+            return False
+        v_ini, v_fin = self._ventanas[inicio.weekday()][i]
+        return desde >= v_ini and hasta <= v_fin
+
+    def agregar(self, turno_id: int, inicio: datetime, fin: datetime) -> None:
+        item = (inicio, fin, turno_id)
+        pos = bisect_left(self._items, item)
+        self._items.insert(pos, item)
+        self._inicios.insert(pos, inicio)
+        self._max_dur = max(self._max_dur, fin - inicio)
+
+
+# =========================
+# Ventanas cacheadas + turnos leídos en la transacción
+# =========================
+_ventanas = TTLCache(maxsize=4096, ttl=300)  # acota lo desactualizado entre workers
+# Cantidad fija de locks (no crece con los emprendedores): dos que caen en el
+# mismo se esperan entre sí, lo que solo cuesta algo de paralelismo.
+N_LOCKS = 256
+_locks = tuple(threading.Lock() for _ in range(N_LOCKS))
+
+
+def lock(emprendedor_id: int) -> threading.Lock:
+    """Serializa validar→insertar→commit de un mismo emprendedor en este proceso (evita esperas de la DB)."""
+    return _locks[emprendedor_id % N_LOCKS]
+
+
+def locks(emprendedor_ids: Iterable[int]) -> List[threading.Lock]:
+    """Los locks de varios emprendedores, sin repetir y en orden fijo (para tomarlos sin deadlock)."""
+    return [_locks[i] for i in sorted({eid % N_LOCKS for eid in emprendedor_ids})]
+
+
+def bloquear(db: Session, emprendedor_id: int) -> None:
+    """
+    Toma la fila del emprendedor para el resto de la transacción (lock de fila en
+    Postgres, de escritura en SQLite). Dos workers que validan la misma agenda
+    quedan en fila: el segundo lee los turnos que el primero ya commiteó.
+    """
+    db.execute(
+        update(models.Emprendedor)
+        .where(models.Emprendedor.id == emprendedor_id)
+        .values(version=models.Emprendedor.version)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def ventanas(db: Session, emprendedor_id: int) -> Dict[int, List[Ventana]]:
+    v = _ventanas.get(emprendedor_id)
+    if v is None:
+        v = ventanas_por_dia(
+            db.query(models.Horario.dia_semana, models.Horario.hora_inicio, models.Horario.hora_fin)
+            .filter(models.Horario.emprendedor_id == emprendedor_id)
+            .all()
+        )
+        _ventanas.set(emprendedor_id, v)
+    return v
+
+
+def _turnos(db: Session, emprendedor_id: int, desde: datetime, hasta: datetime) -> List[Intervalo]:
+    # Solo lo que puede chocar con [desde, hasta). Filas viejas sin fecha_hora_fin:
+    # se asume que ningún turno dura más de un día.
+    filas = (
+        db.query(models.Turno.id, models.Turno.fecha_hora_inicio, models.Turno.fecha_hora_fin,
+                 models.Turno.duracion_minutos)
+        .join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
+        .filter(
+            models.Servicio.emprendedor_id == emprendedor_id,
+            models.Turno.fecha_hora_inicio < hasta,
+            or_(
+                models.Turno.fecha_hora_fin > desde,
+                and_(models.Turno.fecha_hora_fin.is_(None),
+                     models.Turno.fecha_hora_inicio > desde - timedelta(days=1)),
+            ),
+        )
+        .all()
+    )
+    return [(ini, fin or fin_de(ini, dur), tid) for tid, ini, fin, dur in filas]
+
+
+def indice(db: Session, emprendedor_id: int, desde: datetime, hasta: datetime) -> AgendaIndex:
+    """Turnos que pueden chocar con [desde, hasta), leídos ahora + ventanas de Horario."""
+    return AgendaIndex(_turnos(db, emprendedor_id, desde, hasta), ventanas(db, emprendedor_id))
+
+
+def problema(
+    idx: AgendaIndex,
+    inicio: datetime,
+    fin: datetime,
+    excluir_id: Optional[int] = None,
+    permitir_superposicion: bool = False,
+) -> Optional[Tuple[int, str]]:
+    """(status, detalle) si el turno no entra en la agenda; None si entra."""
+    if fin <= inicio:
+        return 400, "La duración del turno debe ser positiva"
+    if not idx.dentro_de_horario(inicio, fin):
+        return 400, f"El turno de {inicio.isoformat()} está fuera del horario de atención"
+    if not permitir_superposicion and idx.superpuestos(inicio, fin, excluir_id):
+        return 409, f"El turno de {inicio.isoformat()} se superpone con otro turno"
+    return None
+
+
+def validar_turnos(
+    db: Session,
+    emprendedor_id: int,
+    intervalos: List[Tuple[datetime, datetime]],
+    excluir_id: Optional[int] = None,
+    permitir_superposicion: bool = False,
+) -> None:
+    """
+    400 si algún turno cae fuera de Horario; 409 si se superpone (salvo
+    permitir_superposicion). Deja la agenda bloqueada hasta el commit.
+    """
+    intervalos = sorted(intervalos)
+    if not intervalos:
+        return
+    # Filtro rápido: horario (cacheado) antes de leer turnos
+    solo_horario = AgendaIndex((), ventanas(db, emprendedor_id))
+    for inicio, fin in intervalos:
+        error = problema(solo_horario, inicio, fin, permitir_superposicion=True)
+        if error:
+            raise HTTPException(status_code=error[0], detail=error[1])
+    if permitir_superposicion:
+        return
+
+    bloquear(db, emprendedor_id)
+    idx = AgendaIndex(_turnos(db, emprendedor_id, intervalos[0][0], max(f for _, f in intervalos)))
+    max_fin_lote = None
+    for inicio, fin in intervalos:
+        if idx.superpuestos(inicio, fin, excluir_id) or (max_fin_lote is not None and inicio < max_fin_lote):
+            raise HTTPException(status_code=409, detail=f"El turno de {inicio.isoformat()} se superpone con otro turno")
+        max_fin_lote = fin if max_fin_lote is None else max(max_fin_lote, fin)
+
+
+@cambios.suscribir
+def _invalidar(lista):
+    for c in lista:
+        if c.tipo in (None, "horario"):
+            _ventanas.delete(c.emprendedor_id)
@@ -0,0 +1,54 @@
+# app/utils/cambios.py
+"""
+Cambios por emprendedor que se publican DESPUÉS del commit.
+
+Los endpoints/crud llaman registrar_cambio(db, emprendedor_id, tipo, **datos)
+dentro de la transacción. Los suscriptores (caches, índices en memoria) reciben
+la lista de cambios solo si la transacción se confirma; si hay rollback se
+descartan. Así nadie repuebla un cache con datos que todavía no están
+commiteados.
+"""
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class Cambio(NamedTuple):
+    emprendedor_id: int
+    tipo: Optional[str] = None  # ej. "turno", "horario", "servicio", "reserva"
+    datos: Dict[str, Any] = {}
+
+
+_suscriptores: List[Callable[[List[Cambio]], None]] = []
+
+
+def suscribir(fn: Callable[[List[Cambio]], None]):
+    _suscriptores.append(fn)
+    return fn
+
+
+def registrar_cambio(db: Session, emprendedor_id: int, tipo: Optional[str] = None, **datos) -> None:
+    if emprendedor_id is None:
+        return
+    db.info.setdefault("cambios", []).append(Cambio(emprendedor_id, tipo, datos))
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar(session):
+    cambios = session.info.pop("cambios", None)
+    if not cambios:
+        return
+    for fn in _suscriptores:
+        try:
+            fn(cambios)
+        except Exception:  # un suscriptor roto no puede romper el request
+            logger.exception("Error notificando cambios a %s", fn)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar(session):
+    session.info.pop("cambios", None)
@@ -0,0 +1,172 @@
+# app/utils/disponibilidad.py
+"""
+Slots libres calculados al vuelo desde Horario + Servicio.duracion.
+
+Por cada semana: se expanden los horarios semanales del emprendedor en
+ventanas concretas, se les restan los turnos ya cargados (de cualquier servicio)
+con un barrido sobre intervalos ordenados y lo que queda se corta en bloques
+de `duracion` minutos. Las semanas y los Horario son de reloj local
+(AGENDA_ZONA_HORARIA); las ventanas se pasan a UTC antes de cruzarlas con los
+turnos, así que los slots salen en UTC como el resto de la API. El resultado
+se cachea por (emprendedor, duración, semana); cualquier cambio de
+turnos/horarios del emprendedor lo invalida.
+"""
+import unicodedata
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils import cambios
+from app.utils.cache import TTLCache
+from app.utils.zona import a_local, a_utc
+
+MAX_DIAS_VENTANA = 92
+CACHE_TTL = 300  # segundos (acota lo desactualizado entre workers)
+
+Intervalo = Tuple[datetime, datetime]
+
+DIAS = {
+    "lunes": 0, "martes": 1, "miercoles": 2, "jueves": 3,
+    "viernes": 4, "sabado": 5, "domingo": 6,
+}
+
+_cache = TTLCache(maxsize=4096, ttl=CACHE_TTL)
+# Generación por emprendedor: invalidar = incrementarla (las claves viejas vencen solas)
+_generacion: Dict[int, int] = defaultdict(int)
+_contador = count(1)
+
+
+@cambios.suscribir
+def _invalidar(lista):
+    for c in lista:
+        if c.tipo in (None, "turno", "horario", "servicio"):
+            _generacion[c.emprendedor_id] = next(_contador)
+
+
+def dia_semana_idx(nombre: str) -> Optional[int]:
+    """'Miércoles' / 'miercoles' / 'MIERCOLES' → 2."""
+    plano = unicodedata.normalize("NFKD", nombre or "").encode("ascii", "ignore").decode()
+    return DIAS.get(plano.strip().lower())
+
+
+def _desde_medianoche(t: time) -> timedelta:
+    return timedelta(hours=t.hour, minutes=t.minute, seconds=t.second)
+
+
+def ventanas_por_dia(horarios) -> Dict[int, List[Tuple[timedelta, timedelta]]]:
+    """
+    Horario → {día de semana: [(desde, hasta)]} como tiempo desde la medianoche
+    local, ordenadas y sin superponerse. hora_fin 00:00 = fin del día (24 h).
+    """
+    ventanas: Dict[int, List[Tuple[timedelta, timedelta]]] = defaultdict(list)
+    for h in horarios:
+        idx = dia_semana_idx(h.dia_semana)
+        ini = _desde_medianoche(h.hora_inicio)
+        fin = timedelta(days=1) if h.hora_fin == time(0) else _desde_medianoche(h.hora_fin)
+        if idx is not None and fin > ini:
+            ventanas[idx].append((ini, fin))
+    unidas = {}
+    for idx, vs in ventanas.items():
+        unidas[idx] = []
+        for ini, fin in sorted(vs):
+            if unidas[idx] and ini <= unidas[idx][-1][1]:
+                unidas[idx][-1] = (unidas[idx][-1][0], max(unidas[idx][-1][1], fin))
+            else:
+                unidas[idx].append((ini, fin))
+    return unidas
+
+
+def restar_intervalos(ventanas: List[Intervalo], ocupados: List[Intervalo]) -> List[Intervalo]:
+    """Barrido: ventanas − ocupados. Ambas listas ordenadas por inicio."""
+    libres = []
+    j = 0
+    for inicio, fin in ventanas:
+        # ocupados que terminan antes de esta ventana no afectan a las siguientes
+        while j < len(ocupados) and ocupados[j][1] <= inicio:
+            j += 1
+        cursor = inicio
+        k = j
+        while k < len(ocupados) and ocupados[k][0] < fin:
+            o_ini, o_fin = ocupados[k]
+            if o_ini > cursor:
+                libres.append((cursor, o_ini))
+            cursor = max(cursor, o_fin)
+            k += 1
+        if cursor < fin:
+            libres.append((cursor, fin))
+    return libres
+
+
+def cortar_en_slots(libres: List[Intervalo], duracion: timedelta) -> List[Intervalo]:
+    slots = []
+    for inicio, fin in libres:
+        while inicio + duracion <= fin:
+            slots.append((inicio, inicio + duracion))
+            inicio += duracion
+    return slots
+
+
+def _ventanas_semana(horarios, lunes: date) -> List[Intervalo]:
+    """Ventanas de la semana local que arranca en `lunes`, en UTC sin zona (como los turnos)."""
+    ventanas = []
+    for idx, vs in ventanas_por_dia(horarios).items():
+        medianoche = datetime.combine(lunes + timedelta(days=idx), time(0))
+        ventanas += [(a_utc(medianoche + ini), a_utc(medianoche + fin)) for ini, fin in vs]
+    return sorted(ventanas)
+
+
+def _ocupados(db: Session, emprendedor_id: int, desde: datetime, hasta: datetime) -> List[Intervalo]:
+    # -1 día: un turno que arranca antes del corte puede invadir la ventana
+    filas = (
+        db.query(models.Turno.fecha_hora_inicio, models.Turno.duracion_minutos)
+        .join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
+        .filter(
+            models.Servicio.emprendedor_id == emprendedor_id,
+            models.Turno.fecha_hora_inicio >= desde - timedelta(days=1),
+            models.Turno.fecha_hora_inicio < hasta,
+        )
+        .all()
+    )
+    return sorted((ini, ini + timedelta(minutes=dur or 0)) for ini, dur in filas)
+
+
+def slots_libres(
+    db: Session, emprendedor_id: int, duracion_min: int, desde: datetime, hasta: datetime
+) -> List[Intervalo]:
+    duracion = timedelta(minutes=duracion_min)
+    # Semanas de calendario locales (los Horario son horas de reloj locales)
+    local = a_local(desde)
+    primer_lunes = local.date() - timedelta(days=local.weekday())
+    semanas = []
+    lunes = primer_lunes
+    while a_utc(datetime.combine(lunes, time(0))) < hasta:
+        semanas.append(lunes)
+        lunes += timedelta(days=7)
+
+    gen = _generacion[emprendedor_id]
+    por_semana = {s: _cache.get((emprendedor_id, duracion_min, s, gen)) for s in semanas}
+    faltan = [s for s, v in por_semana.items() if v is None]
+
+    if faltan:
+        horarios = (
+            db.query(models.Horario).filter(models.Horario.emprendedor_id == emprendedor_id).all()
+        )
+        inicio = a_utc(datetime.combine(faltan[0], time(0)))
+        fin = a_utc(datetime.combine(faltan[-1] + timedelta(days=7), time(0)))
+        ocupados = _ocupados(db, emprendedor_id, inicio, fin)
+        for s in faltan:
+            ventanas = _ventanas_semana(horarios, s)
+            slots = cortar_en_slots(restar_intervalos(ventanas, ocupados), duracion)
+            por_semana[s] = slots
+            _cache.set((emprendedor_id, duracion_min, s, gen), slots)
+
+    return [
+        (ini, fin)
+        for s in semanas
+        for ini, fin in por_semana[s]
+        if ini >= desde and ini < hasta
+    ]
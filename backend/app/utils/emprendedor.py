@@ -1,6 +1,8 @@
 # app/utils/emprendedor.py
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from app import models
+from app.utils.cambios import registrar_cambio
 
 def ensure_emprendedor_for_user(db: Session, usuario_id: int) -> models.Emprendedor:
     """
@@ -13,13 +15,12 @@ def ensure_emprendedor_for_user(db: Session, usuario_id: int) -> models.Emprende
 
     # buscamos el usuario para tomar username/email como fallback
     u = db.query(models.Usuario).get(usuario_id)
+    if u is None:
+        # token de un usuario borrado: no crear un emprendedor huérfano
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
     # nombre por defecto: username -> email -> "Usuario <id>"
-    nombre_defecto = None
-    if u:
-        nombre_defecto = (u.username or u.email or f"Usuario {usuario_id}")
-    else:
-        nombre_defecto = f"Usuario {usuario_id}"
+    nombre_defecto = u.username or u.email or f"Usuario {usuario_id}"
 
     # Para tolerar posibles columnas antiguas con NOT NULL, usamos "" (string vacío)
     # en apellido/negocio si querés máxima compatibilidad. Cambiá a None si seguro son NULLables.
@@ -34,6 +35,7 @@ def ensure_emprendedor_for_user(db: Session, usuario_id: int) -> models.Emprende
 
     db.add(e)
     db.flush()   # fuerza validaciones antes del commit
+    registrar_cambio(db, e.id, "emprendedor")
     db.commit()
     db.refresh(e)
     return e
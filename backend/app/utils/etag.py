@@ -0,0 +1,66 @@
+# app/utils/etag.py
+"""
+GET condicionales con ETag a partir de Emprendedor.version.
+
+Cada transacción que registró cambios (utils/cambios.registrar_cambio) sube la
+versión de esos emprendedores justo antes del commit, en la misma transacción.
+Los GET leen solo esa columna y, si coincide con If-None-Match, responden 304
+sin cargar ni serializar nada más.
+"""
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+CACHE_CONTROL = "private, no-cache"  # el cliente puede guardar, pero revalida siempre
+
+
+@event.listens_for(Session, "before_commit")
+def _subir_versiones(session):
+    ids = {c.emprendedor_id for c in session.info.get("cambios", ())}
+    if ids:
+        session.execute(
+            update(models.Emprendedor)
+            .where(models.Emprendedor.id.in_(ids))
+            .values(version=models.Emprendedor.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def consulta_version(emprendedor_id: Optional[int] = None, usuario_id: Optional[int] = None):
+    """SELECT id, version (sirve para Session y AsyncSession)."""
+    q = select(models.Emprendedor.id, models.Emprendedor.version)
+    if emprendedor_id is not None:
+        q = q.where(models.Emprendedor.id == emprendedor_id)
+    if usuario_id is not None:
+        q = q.where(models.Emprendedor.usuario_id == usuario_id)
+    return q
+
+
+def version_de(db: Session, emprendedor_id: Optional[int] = None, usuario_id: Optional[int] = None):
+    """(id, version) del emprendedor, o None si no existe."""
+    return db.execute(consulta_version(emprendedor_id, usuario_id)).first()
+
+
+def etag_de(emprendedor_id: int, version: int) -> str:
+    return f'W/"{emprendedor_id}-{version}"'
+
+
+def condicional(request: Request, response: Response, fila) -> Optional[Response]:
+    """
+    Pone ETag en la respuesta. Si el cliente ya tiene esa versión devuelve el
+    304 a retornar directamente; si no, None y el endpoint sigue normalmente.
+    """
+    if fila is None:
+        return None
+    etag = etag_de(fila.id, fila.version)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    # comparación débil (RFC 9110): se ignora el prefijo W/
+    enviados = {v.strip().removeprefix("W/") for v in request.headers.get("if-none-match", "").split(",")}
+    if etag.removeprefix("W/") in enviados or "*" in enviados:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
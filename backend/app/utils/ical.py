@@ -0,0 +1,171 @@
+# app/utils/ical.py
+"""
+Feed iCalendar (RFC 5545) con la agenda de un emprendedor, para suscribirse
+desde el calendario del teléfono.
+
+- La URL lleva un token (Emprendedor.ical_token): los clientes de calendario no
+  mandan Authorization. Rotarlo invalida las suscripciones viejas.
+- Ventana acotada y anclada al día (UTC): [hoy − dias_atras, hoy + dias_adelante).
+  El contenido solo cambia con los datos o a medianoche.
+- Los VEVENT salen de un generador sobre una query por columnas (yield_per), con
+  su propia sesión: el cuerpo se manda a medida que se arma.
+- El feed completo queda en el cache de respuestas con los tags del emprendedor
+  (ver utils/respuestas.py). Los polls siguientes salen de ahí y contestan 304
+  por ETag o If-Modified-Since sin tocar la DB.
+"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import select
+
+from app import database, models
+from app.config import get_settings
+
+MEDIA_TYPE = "text/calendar; charset=utf-8"
+PRODID = "-//Turnos//Agenda//ES"
+
+
+class Feed(NamedTuple):
+    token: str
+    etag: str
+    modificado: datetime  # Last-Modified (UTC, al segundo)
+    cuerpo: bytes
+
+
+def ventana(ahora: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    cfg = get_settings().agenda
+    hoy = (ahora or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    return hoy - timedelta(days=cfg.ical_dias_atras), hoy + timedelta(days=cfg.ical_dias_adelante)
+
+
+def segundos_hasta_manana(ahora: Optional[datetime] = None) -> float:
+    ahora = ahora or datetime.utcnow()
+    manana = ahora.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return max((manana - ahora).total_seconds(), 1.0)
+
+
+def etag_de(emprendedor_id: int, version: int, desde: datetime) -> str:
+    # la versión de los datos + el día de la ventana (al correrse cambia el contenido)
+    return f'W/"ics-{emprendedor_id}-{version}-{desde:%Y%m%d}"'
+
+
+def tags(emprendedor_id: int):
+    return [f"agenda:{emprendedor_id}", f"servicios:{emprendedor_id}", f"emprendedor:{emprendedor_id}"]
+
+
+def headers(feed_etag: str, modificado: datetime) -> dict:
+    from app.utils.etag import CACHE_CONTROL
+
+    return {
+        "ETag": feed_etag,
+        "Last-Modified": format_datetime(modificado.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+
+def no_modificado(request: Request, feed_etag: str, modificado: datetime) -> bool:
+    """If-None-Match manda sobre If-Modified-Since (RFC 9110 §13.2.2)."""
+    enviados = request.headers.get("if-none-match")
+    if enviados is not None:
+        etags = {v.strip().removeprefix("W/") for v in enviados.split(",")}
+        return feed_etag.removeprefix("W/") in etags or "*" in etags
+    desde = request.headers.get("if-modified-since")
+    if not desde:
+        return False
+    try:
+        fecha = parsedate_to_datetime(desde)
+    except (TypeError, ValueError):
+        return False
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return modificado <= fecha
+
+
+# =========================
+# Render
+# =========================
+def _texto(valor) -> str:
+    return (
+        str(valor or "")
+        .replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _plegar(linea: str) -> str:
+    """Líneas de a 75 octetos como máximo, sin cortar caracteres UTF-8."""
+    crudo = linea.encode("utf-8")
+    if len(crudo) <= 75:
+        return linea + "\r\n"
+    partes, actual, largo = [], [], 0
+    for ch in linea:
+        n = len(ch.encode("utf-8"))
+        if largo + n > (75 if not partes else 74):  # las de continuación llevan un espacio
+            partes.append("".join(actual))
+            actual, largo = [], 0
+        actual.append(ch)
+        largo += n
+    partes.append("".join(actual))
+    return "\r\n ".join(partes) + "\r\n"
+
+
+def _fecha(dt: datetime) -> str:
+    return dt.strftime("%Y%m%dT%H%M%SZ")
+
+
+def vevent(fila, dtstamp: str) -> str:
+    fin = fila.fecha_hora_fin or fila.fecha_hora_inicio + timedelta(minutes=fila.duracion_minutos or 0)
+    lineas = [
+        "BEGIN:VEVENT",
+        f"UID:turno-{fila.id}@turnos",
+        f"DTSTAMP:{dtstamp}",
+        f"DTSTART:{_fecha(fila.fecha_hora_inicio)}",
+        f"DTEND:{_fecha(fin)}",
+        f"SUMMARY:{_texto(fila.servicio)} ({fila.ocupados}/{fila.capacidad})",
+        f"DESCRIPTION:{_texto(f'Reservas: {fila.ocupados} de {fila.capacidad}')}",
+        "END:VEVENT",
+    ]
+    return "".join(_plegar(l) for l in lineas)
+
+
+def generar(emprendedor_id: int, nombre: str, desde: datetime, hasta: datetime,
+            generado: datetime) -> Iterator[bytes]:
+    """El .ics en pedazos: cabecera, un VEVENT por turno de la ventana, cierre."""
+    cabecera = [
+        "BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH", f"X-WR-CALNAME:{_texto(nombre)}",
+        "REFRESH-INTERVAL;VALUE=DURATION:PT15M", "X-PUBLISHED-TTL:PT15M",
+    ]
+    yield "".join(_plegar(l) for l in cabecera).encode("utf-8")
+
+    q = (
+        select(
+            models.Turno.id, models.Turno.fecha_hora_inicio, models.Turno.fecha_hora_fin,
+            models.Turno.duracion_minutos, models.Turno.capacidad, models.Turno.ocupados,
+            models.Servicio.nombre.label("servicio"),
+        )
+        .join(models.Servicio, models.Turno.servicio_id == models.Servicio.id)
+        .where(
+            models.Servicio.emprendedor_id == emprendedor_id,
+            models.Turno.fecha_hora_inicio >= desde,
+            models.Turno.fecha_hora_inicio < hasta,
+        )
+        .order_by(models.Turno.fecha_hora_inicio, models.Turno.id)
+        .execution_options(yield_per=500)
+    )
+    dtstamp = _fecha(generado)
+    with database.SessionLocal() as db:
+        for particion in db.execute(q).partitions():
+            yield "".join(vevent(f, dtstamp) for f in particion).encode("utf-8")
+    yield b"END:VCALENDAR\r\n"
+
+
+def guardando(partes: Iterable[bytes], al_terminar) -> Iterator[bytes]:
+    """Deja pasar los pedazos y, si se mandaron todos, llama al_terminar(cuerpo)."""
+    acumulado = []
+    for parte in partes:
+        acumulado.append(parte)
+        yield parte
+    al_terminar(b"".join(acumulado))
@@ -0,0 +1,177 @@
+# app/utils/metricas.py
+"""
+Métricas por ruta en formato Prometheus (GET /metrics).
+
+- MetricasMiddleware (ASGI puro): latencia por ruta en histograma, requests por
+  status y, si API_SERVER_TIMING=1, el header Server-Timing (db/app).
+- Hooks de SQLAlchemy sobre Engine (todas las instancias, también la async):
+  cuentan sentencias y tiempo de DB y se los atribuyen al request en curso vía
+  un ContextVar (se copia al threadpool de los endpoints sync).
+
+La ruta es la plantilla ("/turnos/{turno_id}"), no la URL, para no explotar la
+cardinalidad; lo que no matchea ninguna ruta va a "<sin_ruta>".
+"""
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# [sentencias, segundos en DB] del request actual
+_request_db: ContextVar[Optional[List[float]]] = ContextVar("request_db", default=None)
+
+
+class _Registro:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencia: Dict[Tuple[str, str], List[float]] = {}  # buckets..., +Inf, suma
+        self.status: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.db_sentencias: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.db_segundos: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.db_fuera_de_request = 0
+
+    def observar(self, metodo: str, ruta: str, status: int, segundos: float, db) -> None:
+        clave = (metodo, ruta)
+        with self._lock:
+            h = self.latencia.get(clave)
+            if h is None:
+                h = self.latencia[clave] = [0] * (len(BUCKETS) + 1) + [0.0]
+            for i, limite in enumerate(BUCKETS):
+                if segundos <= limite:
+                    h[i] += 1
+            h[len(BUCKETS)] += 1  # +Inf (= count)
+            h[-1] += segundos
+            self.status[(metodo, ruta, status)] += 1
+            self.db_sentencias[clave] += int(db[0])
+            self.db_segundos[clave] += db[1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.__init__()
+
+    def prometheus(self) -> str:
+        def etiquetas(metodo, ruta, **extra):
+            pares = {"method": metodo, "route": ruta, **extra}
+            return ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in pares.items())
+
+        lineas = [
+            "# HELP http_request_duration_seconds Latencia por ruta.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (metodo, ruta), h in sorted(self.latencia.items()):
+                for limite, n in zip(BUCKETS, h):
+                    lineas.append(
+                        f"http_request_duration_seconds_bucket{{{etiquetas(metodo, ruta, le=limite)}}} {n}"
+                    )
+                lineas.append(
+                    f'http_request_duration_seconds_bucket{{{etiquetas(metodo, ruta, le="+Inf")}}} {h[len(BUCKETS)]}'
+                )
+                lineas.append(f"http_request_duration_seconds_sum{{{etiquetas(metodo, ruta)}}} {h[-1]:.6f}")
+                lineas.append(f"http_request_duration_seconds_count{{{etiquetas(metodo, ruta)}}} {h[len(BUCKETS)]}")
+
+            lineas += ["# HELP http_requests_total Requests por ruta y status.", "# TYPE http_requests_total counter"]
+            for (metodo, ruta, status), n in sorted(self.status.items()):
+                lineas.append(f"http_requests_total{{{etiquetas(metodo, ruta, status=status)}}} {n}")
+
+            lineas += ["# HELP db_statements_total Sentencias SQL por ruta.", "# TYPE db_statements_total counter"]
+            for (metodo, ruta), n in sorted(self.db_sentencias.items()):
+                lineas.append(f"db_statements_total{{{etiquetas(metodo, ruta)}}} {n}")
+
+            lineas += ["# HELP db_seconds_total Tiempo en la DB por ruta.", "# TYPE db_seconds_total counter"]
+            for (metodo, ruta), s in sorted(self.db_segundos.items()):
+                lineas.append(f"db_seconds_total{{{etiquetas(metodo, ruta)}}} {s:.6f}")
+
+            lineas += [
+                "# HELP db_statements_outside_request_total Sentencias fuera de un request (migraciones, CLI).",
+                "# TYPE db_statements_outside_request_total counter",
+                f"db_statements_outside_request_total {self.db_fuera_de_request}",
+            ]
+        return "\n".join(lineas) + "\n"
+
+
+registro = _Registro()
+
+
+# =========================
+# Hooks de SQLAlchemy
+# =========================
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    pila = conn.info.get("metricas_inicio")
+    duracion = time.perf_counter() - pila.pop() if pila else 0.0
+    actual = _request_db.get()
+    if actual is None:
+        registro.db_fuera_de_request += 1
+        return
+    actual[0] += 1
+    actual[1] += duracion
+
+
+@event.listens_for(Engine, "handle_error")
+def _error(contexto):
+    # la sentencia falló: no hay after_cursor_execute, se descarta su inicio
+    if contexto.connection is not None:
+        pila = contexto.connection.info.get("metricas_inicio")
+        if pila:
+            pila.pop()
+
+
+def contador_actual() -> Optional[List[float]]:
+    """[sentencias, segundos] del request en curso (None fuera de un request)."""
+    return _request_db.get()
+
+
+# =========================
+# Middleware
+# =========================
+class MetricasMiddleware:
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        db = [0, 0.0]
+        token = _request_db.set(db)
+        inicio = time.perf_counter()
+        fin = None
+        status = 500
+
+        async def enviar(mensaje):
+            nonlocal status, fin
+            if mensaje["type"] == "http.response.start":
+                status = mensaje["status"]
+                # SSE: la latencia es hasta abrir el stream, no lo que dura la conexión
+                if any(k == b"content-type" and v.startswith(b"text/event-stream")
+                       for k, v in mensaje.get("headers", ())):
+                    fin = time.perf_counter()
+                if self.server_timing:
+                    app_ms = (time.perf_counter() - inicio) * 1000
+                    valor = (
+                        f'db;dur={db[1] * 1000:.1f};desc="{int(db[0])} queries", '
+                        f"app;dur={app_ms:.1f}"
+                    )
+                    mensaje.setdefault("headers", [])
+                    mensaje["headers"] = list(mensaje["headers"]) + [(b"server-timing", valor.encode())]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _request_db.reset(token)
+            ruta = getattr(scope.get("route"), "path", None) or "<sin_ruta>"
+            registro.observar(scope["method"], ruta, status, (fin or time.perf_counter()) - inicio, db)
@@ -0,0 +1,109 @@
+# app/utils/paginacion.py
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, or_
+
+MAX_PAGE_SIZE = 200
+DEFAULT_PAGE_SIZE = 50
+
+
+@dataclass
+class PaginaParams:
+    cursor: Optional[str]
+    limit: int
+
+
+def parametros_pagina(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> PaginaParams:
+    """Dependencia común: ?cursor=...&limit=..."""
+    return PaginaParams(cursor=cursor, limit=limit)
+
+
+def _codificar(valores: list) -> str:
+    plano = [v.isoformat() if isinstance(v, datetime) else v for v in valores]
+    crudo = json.dumps(plano, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def _decodificar(cursor: str, columnas) -> list:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        plano = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(plano, list) or len(plano) != len(columnas):
+            raise ValueError
+        valores = []
+        for col, v in zip(columnas, plano):
+            if col.type.python_type is datetime:
+                v = datetime.fromisoformat(v)
+            elif not isinstance(v, int):
+                raise ValueError
+            valores.append(v)
+        return valores
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _despues_de(columnas, valores, descendente=False):
+    # (a, b) > (va, vb)  ==>  a > va OR (a = va AND b > vb)   (al revés si es descendente)
+    col, valor = columnas[0], valores[0]
+    sigue = col < valor if descendente else col > valor
+    if len(columnas) == 1:
+        return sigue
+    return or_(sigue, and_(col == valor, _despues_de(columnas[1:], valores[1:], descendente)))
+
+
+def _orden(columnas, descendente: bool):
+    return [c.desc() if descendente else c.asc() for c in columnas]
+
+
+def _pagina(filas, params: PaginaParams, columnas) -> dict:
+    next_cursor = None
+    if len(filas) > params.limit:
+        filas = filas[: params.limit]
+        ultima = filas[-1]
+        next_cursor = _codificar([getattr(ultima, c.key) for c in columnas])
+
+    return {"items": filas, "next_cursor": next_cursor}
+
+
+def paginar(query, params: PaginaParams, *columnas, descendente: bool = False):
+    """
+    Paginación keyset sobre `columnas` (la última debe ser única, ej. el id).
+    Trae limit+1 filas para saber si hay otra página sin hacer COUNT.
+    Sirve también para queries de columnas (las filas deben exponer c.key).
+    Devuelve {"items": [...], "next_cursor": str | None}.
+    """
+    if params.cursor:
+        query = query.filter(
+            _despues_de(columnas, _decodificar(params.cursor, columnas), descendente)
+        )
+
+    filas = query.order_by(*_orden(columnas, descendente)).limit(params.limit + 1).all()
+    return _pagina(filas, params, columnas)
+
+
+def _es_entidad(stmt) -> bool:
+    d = stmt.column_descriptions
+    return len(d) == 1 and d[0]["expr"] is d[0]["entity"]
+
+
+async def paginar_async(db, stmt, params: PaginaParams, *columnas, descendente: bool = False):
+    """
+    Lo mismo que paginar, sobre un select() con AsyncSession (modo DB_ASYNC).
+    select(Entidad) devuelve entidades; un select de columnas, filas.
+    """
+    if params.cursor:
+        stmt = stmt.where(
+            _despues_de(columnas, _decodificar(params.cursor, columnas), descendente)
+        )
+
+    res = await db.execute(stmt.order_by(*_orden(columnas, descendente)).limit(params.limit + 1))
+    filas = res.scalars().all() if _es_entidad(stmt) else res.all()
+    return _pagina(filas, params, columnas)
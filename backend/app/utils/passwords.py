@@ -0,0 +1,95 @@
+# app/utils/passwords.py
+"""
+Hash/verificación bcrypt fuera del threadpool de Starlette.
+
+bcrypt gasta ~250 ms de CPU por llamada: si corre en el threadpool compartido,
+un pico de logins deja sin threads al resto de los endpoints. Acá corre en un
+executor propio (threads o procesos, ver AuthenticationSettings) con un límite
+de trabajos pendientes: pasado ese límite se responde 503 en vez de encolar.
+"""
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple, Union
+
+from fastapi import HTTPException
+
+from app.config import get_settings
+
+_executor: Optional[Executor] = None
+_pendientes = 0
+_lock = threading.Lock()
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        cfg = get_settings().auth
+        if cfg.hash_executor == "process":
+            _executor = ProcessPoolExecutor(max_workers=cfg.hash_workers)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=cfg.hash_workers, thread_name_prefix="bcrypt")
+    return _executor
+
+
+def cerrar() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _a_bytes(valor: Union[str, bytes]) -> bytes:
+    # user.password puede venir como str (recomendado) o bytes (datos antiguos)
+    return valor.encode("utf-8") if isinstance(valor, str) else valor
+
+
+def rondas_de(hash_guardado: Union[str, bytes]) -> Optional[int]:
+    """Costo de un hash bcrypt ("$2b$12$..." → 12)."""
+    try:
+        return int(_a_bytes(hash_guardado).split(b"$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+# --- trabajo real (funciones de módulo: picklables para ProcessPoolExecutor) ---
+# bcrypt se importa recién en el primer uso: no pesa en el arranque de cada worker
+def _hashear(password: str, rondas: int) -> str:
+    import bcrypt
+
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rondas)).decode("utf-8")
+
+
+def _verificar(password: str, hash_guardado: bytes) -> bool:
+    import bcrypt
+
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hash_guardado)
+    except ValueError:  # hash con formato inválido
+        return False
+
+
+async def _ejecutar(fn, *args):
+    global _pendientes
+    limite = get_settings().auth.hash_max_pending
+    with _lock:
+        if _pendientes >= limite:
+            raise HTTPException(status_code=503, detail="Servidor ocupado, reintentá en unos segundos")
+        _pendientes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        with _lock:
+            _pendientes -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _ejecutar(_hashear, password, get_settings().auth.bcrypt_rounds)
+
+
+async def verify_password(password: str, hash_guardado: Union[str, bytes]) -> Tuple[bool, bool]:
+    """(ok, necesita_rehash): rehash si el costo del hash no es el configurado."""
+    ok = await _ejecutar(_verificar, password, _a_bytes(hash_guardado))
+    necesita_rehash = ok and rondas_de(hash_guardado) != get_settings().auth.bcrypt_rounds
+    return ok, necesita_rehash
@@ -0,0 +1,190 @@
+# app/utils/push.py
+"""
+Push de cambios de agenda al navegador (SSE o WebSocket), para no pollear listas.
+
+- Canales: uno por emprendedor (toda su agenda) y uno por servicio (páginas de
+  reserva). Internamente todo cuelga del emprendedor; una suscripción a un
+  servicio filtra los deltas de los otros.
+- Los deltas viajan en los cambios que se publican DESPUÉS del commit
+  (utils/cambios): el endpoint agrega `deltas=[push.turno(...), ...]` a su
+  registrar_cambio. Un cambio de agenda sin deltas (importación, horarios,
+  usuario borrado, ...) manda "resync": el cliente vuelve a pedir su lista.
+  Cada conexión arranca con un "resync" (carga inicial = mismo camino).
+- Fan-out en proceso: cada delta se serializa una vez y se reparte con un solo
+  call_soon_threadsafe por event loop. Cada conexión tiene una cola acotada
+  (PUSH_COLA); si un consumidor lento la llena, se vacía y queda un único
+  "resync" en vez de acumular memoria o frenar al resto.
+
+Como los caches en memoria, el broker es por proceso: con varios
+workers, cada conexión ve los cambios hechos en su worker.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.config import get_settings
+from app.utils import cambios
+
+MEDIA_TYPE = "text/event-stream"
+
+
+def _json(delta: dict) -> str:
+    return json.dumps(delta, separators=(",", ":"))
+
+
+RESYNC = _json({"tipo": "resync"})
+
+
+# =========================
+# Deltas
+# =========================
+def turno(turno_id: int, servicio_id: int, inicio: datetime, fin: datetime,
+          capacidad: int, ocupados: int) -> dict:
+    """Turno creado o modificado (el cliente lo reemplaza por id)."""
+    return {
+        "tipo": "turno", "id": turno_id, "servicio_id": servicio_id,
+        "inicio": inicio.isoformat(), "fin": fin.isoformat(),
+        "capacidad": capacidad, "libres": max(capacidad - ocupados, 0),
+    }
+
+
+def baja(turno_id: int, servicio_id: int) -> dict:
+    return {"tipo": "baja", "id": turno_id, "servicio_id": servicio_id}
+
+
+def cupo(turno_id: int, t) -> dict:
+    """Cambió la ocupación. `t`: fila de crud.estadisticas.datos_turno."""
+    return {"tipo": "cupo", "id": turno_id, "servicio_id": t.servicio_id,
+            "libres": max(t.capacidad - t.ocupados, 0)}
+
+
+# =========================
+# Broker
+# =========================
+class Suscripcion:
+    """Una conexión. Vive en el event loop que la abrió; la cola solo se toca desde ahí."""
+
+    def __init__(self, emprendedor_id: int, servicio_id: Optional[int], tamano: int):
+        self.emprendedor_id = emprendedor_id
+        self.servicio_id = servicio_id
+        self.loop = asyncio.get_running_loop()
+        self.cola = deque([RESYNC])
+        self.tamano = tamano
+        self.desbordes = 0
+        self._hay = asyncio.Event()
+        self._hay.set()
+
+    def recibe(self, servicio_id: Optional[int]) -> bool:
+        return self.servicio_id is None or servicio_id is None or servicio_id == self.servicio_id
+
+    def _entregar(self, mensajes: List[str]) -> None:
+        for m in mensajes:
+            if len(self.cola) >= self.tamano:
+                # Consumidor lento: lo pendiente se reemplaza por un resync
+                self.cola.clear()
+                self.cola.append(RESYNC)
+                self.desbordes += 1
+                break
+            self.cola.append(m)
+        self._hay.set()
+
+    async def siguientes(self, espera: Optional[float] = None) -> List[str]:
+        """Todo lo pendiente (lista vacía si pasan `espera` segundos sin nada)."""
+        if not self.cola:
+            self._hay.clear()
+            try:
+                await asyncio.wait_for(self._hay.wait(), espera)
+            except asyncio.TimeoutError:
+                return []
+        pendientes = list(self.cola)
+        self.cola.clear()
+        return pendientes
+
+
+def _entregar_lote(lote: List[Tuple[Suscripcion, List[str]]]) -> None:
+    for sub, mensajes in lote:
+        sub._entregar(mensajes)
+
+
+class Broker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs: Dict[int, Set[Suscripcion]] = {}
+        self.conexiones = 0
+        self.publicados = 0
+        self.desbordes_cerrados = 0  # de conexiones ya cerradas
+
+    def abrir(self, emprendedor_id: int, servicio_id: Optional[int] = None) -> Optional[Suscripcion]:
+        """None si se llegó a PUSH_MAX_CONEXIONES."""
+        cfg = get_settings().push
+        with self._lock:
+            if self.conexiones >= cfg.max_conexiones:
+                return None
+            sub = Suscripcion(emprendedor_id, servicio_id, cfg.cola)
+            self._subs.setdefault(emprendedor_id, set()).add(sub)
+            self.conexiones += 1
+        return sub
+
+    def cerrar(self, sub: Suscripcion) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.emprendedor_id)
+            if subs is None or sub not in subs:
+                return
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.emprendedor_id]
+            self.conexiones -= 1
+            self.desbordes_cerrados += sub.desbordes
+
+    def publicar(self, emprendedor_id: int, mensajes: List[Tuple[Optional[int], str]]) -> None:
+        """`mensajes`: (servicio_id o None = para todos, json)."""
+        with self._lock:
+            subs = list(self._subs.get(emprendedor_id, ()))
+        por_loop = defaultdict(list)
+        for sub in subs:
+            propios = [m for servicio_id, m in mensajes if sub.recibe(servicio_id)]
+            if propios:
+                por_loop[sub.loop].append((sub, propios))
+        for loop, lote in por_loop.items():
+            try:
+                loop.call_soon_threadsafe(_entregar_lote, lote)
+            except RuntimeError:  # loop cerrado (apagando): nadie escucha
+                continue
+            self.publicados += sum(len(m) for _, m in lote)
+
+    def escuchando(self, emprendedor_id: int) -> bool:
+        return emprendedor_id in self._subs
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            abiertas = [s for subs in self._subs.values() for s in subs]
+            return {
+                "conexiones": self.conexiones,
+                "emprendedores": len(self._subs),
+                "publicados": self.publicados,
+                "pendientes": sum(len(s.cola) for s in abiertas),
+                "desbordes": self.desbordes_cerrados + sum(s.desbordes for s in abiertas),
+            }
+
+
+broker = Broker()
+
+
+# Qué se manda por cada tipo de cambio
+@cambios.suscribir
+def _difundir(lista):
+    por_emprendedor = defaultdict(list)
+    for c in lista:
+        eid = c.emprendedor_id
+        if not broker.escuchando(eid) or c.tipo == "emprendedor":
+            continue
+        deltas = c.datos.get("deltas")
+        if deltas is None:
+            por_emprendedor[eid].append((None, RESYNC))
+        else:
+            por_emprendedor[eid].extend((d.get("servicio_id"), _json(d)) for d in deltas)
+    for eid, mensajes in por_emprendedor.items():
+        broker.publicar(eid, mensajes)
@@ -0,0 +1,182 @@
+# app/utils/respuestas.py
+"""
+Cache de respuestas del catálogo público (bytes JSON ya serializados).
+
+La clave es ruta + query params. Cada entrada guarda la generación de sus tags
+(ej. "servicios", "emprendedor:3") al momento de calcularse; invalidar un tag es
+subir su generación, y la entrada queda vieja sin tener que buscarla. Las
+invalidaciones llegan por utils/cambios, o sea solo después del commit.
+
+El backend es cualquier objeto con get/set(ttl=)/clear/__len__ (TTLCache por defecto).
+"""
+import threading
+from functools import lru_cache
+from itertools import count
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.config import get_settings
+from app.utils import cambios
+from app.utils.cache import TTLCache
+
+
+class RespuestasCache:
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.vencidas = 0  # encontradas pero invalidadas por escritura
+        self._generaciones: Dict[str, int] = {}
+        self._contador = count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def activo(self) -> bool:
+        return self.backend is not None
+
+    def _generacion(self, tag: str) -> int:
+        return self._generaciones.get(tag, 0)
+
+    def obtener(self, clave) -> Optional[bytes]:
+        item = self.backend.get(clave)
+        if item is None:
+            self.misses += 1
+            return None
+        marcas, cuerpo = item
+        if any(self._generacion(tag) != gen for tag, gen in marcas):
+            self.vencidas += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return cuerpo
+
+    def marcas(self, tags: Iterable[str]):
+        return tuple((tag, self._generacion(tag)) for tag in tags)
+
+    def guardar(self, clave, marcas, cuerpo: bytes, ttl: Optional[float] = None) -> None:
+        self.backend.set(clave, (marcas, cuerpo), ttl=ttl)
+
+    def invalidar(self, *tags: str) -> None:
+        with self._lock:
+            for tag in tags:
+                self._generaciones[tag] = next(self._contador)
+
+    def limpiar(self) -> None:
+        if self.activo:
+            self.backend.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.activo else None,
+            "entradas": len(self.backend) if self.activo else 0,
+            "maxsize": getattr(self.backend, "maxsize", None),
+            "ttl": getattr(self.backend, "ttl", None),
+            "hits": self.hits,
+            "misses": self.misses,
+            "vencidas": self.vencidas,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def _backend(cfg):
+    if cfg.response_backend == "off" or cfg.response_size <= 0:
+        return None
+    return TTLCache(maxsize=cfg.response_size, ttl=cfg.response_ttl)
+
+
+def configurar(cfg) -> None:
+    """Cambia el backend según CacheSettings (arranca vacío)."""
+    cache.backend = _backend(cfg)
+
+
+cache = RespuestasCache(_backend(get_settings().cache))
+
+
+@lru_cache(maxsize=None)
+def _adaptador(modelo) -> TypeAdapter:
+    return TypeAdapter(modelo)
+
+
+def _buscar(request: Request):
+    """(clave, cuerpo cacheado o None) de esta URL."""
+    clave = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    return clave, cache.obtener(clave)
+
+
+def _guardar(adaptador: TypeAdapter, clave, marcas, crudo, vence) -> Response:
+    valor = adaptador.validate_python(crudo, from_attributes=True)
+    cuerpo = adaptador.dump_json(valor)
+    ttl = vence(valor) if vence else None
+    if ttl is not None:
+        ttl = min(ttl, getattr(cache.backend, "ttl", ttl))
+    cache.guardar(clave, marcas, cuerpo, ttl)
+    return Response(cuerpo, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
+def responder(
+    request: Request,
+    modelo,
+    tags: Iterable[str],
+    producir: Callable[[], Any],
+    vence: Optional[Callable[[Any], Optional[float]]] = None,
+) -> Response:
+    """
+    Devuelve la respuesta cacheada para esta URL o la calcula con producir(),
+    la valida/serializa con `modelo` (el mismo response_model del endpoint) y la guarda.
+    `vence(valor)` puede acortar el TTL de la entrada (ej. hasta que empiece un turno).
+    """
+    adaptador = _adaptador(modelo)
+    if not cache.activo:
+        cuerpo = adaptador.dump_json(adaptador.validate_python(producir(), from_attributes=True))
+        return Response(cuerpo, media_type="application/json")
+
+    clave, cuerpo = _buscar(request)
+    if cuerpo is not None:
+        return Response(cuerpo, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    # generaciones tomadas ANTES de leer la base: si llega una invalidación en el
+    # medio, la entrada nace vieja y no se sirve
+    marcas = cache.marcas(tags)
+    return _guardar(adaptador, clave, marcas, producir(), vence)
+
+
+async def responder_async(
+    request: Request,
+    modelo,
+    tags: Iterable[str],
+    producir: Callable[[], Awaitable[Any]],
+    vence: Optional[Callable[[Any], Optional[float]]] = None,
+) -> Response:
+    """Como responder, con `producir` async (routers del modo DB_ASYNC)."""
+    adaptador = _adaptador(modelo)
+    if not cache.activo:
+        cuerpo = adaptador.dump_json(adaptador.validate_python(await producir(), from_attributes=True))
+        return Response(cuerpo, media_type="application/json")
+
+    clave, cuerpo = _buscar(request)
+    if cuerpo is not None:
+        return Response(cuerpo, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    marcas = cache.marcas(tags)  # antes de leer la base, como en responder
+    return _guardar(adaptador, clave, marcas, await producir(), vence)
+
+
+# Qué tags invalida cada tipo de cambio
+@cambios.suscribir
+def _invalidar(lista):
+    for c in lista:
+        eid = c.emprendedor_id
+        if c.tipo is None:  # emprendedor borrado (con sus servicios y turnos)
+            cache.invalidar("emprendedores", f"emprendedor:{eid}", "servicios", f"servicios:{eid}", f"agenda:{eid}")
+        elif c.tipo == "emprendedor":
+            cache.invalidar("emprendedores", f"emprendedor:{eid}")
+        elif c.tipo == "servicio":
+            tags = ["servicios", f"servicios:{eid}"]
+            if "servicio_id" in c.datos:  # en altas no hace falta: el 404 no se cachea
+                tags.append(f"servicio:{c.datos['servicio_id']}")
+            cache.invalidar(*tags)
+        elif c.tipo in ("turno", "reserva"):
+            cache.invalidar(f"agenda:{eid}")
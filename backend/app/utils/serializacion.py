@@ -0,0 +1,66 @@
+# app/utils/serializacion.py
+"""
+Camino rápido para listas grandes (API_FAST_JSON=1).
+
+En vez de cargar entidades ORM y que FastAPI valide cada una con
+from_attributes y la vuelva a serializar, el endpoint pide solo las columnas del
+schema (filas planas, como .mappings()), las valida con un TypeAdapter ya
+compilado y pydantic-core las escribe a JSON de una vez. El response_model del
+endpoint no cambia, así que el OpenAPI tampoco.
+"""
+from functools import lru_cache
+from typing import Any, List
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+def activo(request: Request) -> bool:
+    """
+    Dependencia: ¿modo rápido en la app que atiende el request? Lo fija
+    create_app desde sus settings (app.state.fast_json), no el entorno global.
+    """
+    return request.app.state.fast_json
+
+
+def clase_respuesta(fast_json: bool):
+    """default_response_class de la app: orjson solo en modo rápido (y si está instalado)."""
+    if not fast_json:
+        return JSONResponse
+    try:
+        import orjson  # noqa: F401
+    except ImportError:  # pragma: no cover
+        return JSONResponse
+    from fastapi.responses import ORJSONResponse
+
+    return ORJSONResponse
+
+
+def columnas(schema: type[BaseModel], entidad) -> List[Any]:
+    """Columnas de `entidad` con el nombre de cada campo del schema (para db.query(*cols))."""
+    return [getattr(entidad, campo).label(campo) for campo in schema.model_fields]
+
+
+@lru_cache(maxsize=None)
+def adaptador(tipo) -> TypeAdapter:
+    return TypeAdapter(tipo)
+
+
+def filas(resultado) -> List[dict]:
+    """
+    Result/lista de Row → lista de dicts (lo que consume el TypeAdapter).
+    Equivale a .mappings(), pero armar el dict con zip es ~5x más barato.
+    """
+    if hasattr(resultado, "keys"):  # Result
+        claves = list(resultado.keys())
+    elif resultado:
+        claves = resultado[0]._fields
+    else:
+        return []
+    return [dict(zip(claves, r)) for r in resultado]
+
+
+def respuesta(tipo, valor) -> Response:
+    a = adaptador(tipo)
+    return Response(a.dump_json(a.validate_python(valor)), media_type="application/json")
@@ -0,0 +1,31 @@
+# app/utils/zona.py
+"""
+Zona horaria del negocio (AGENDA_ZONA_HORARIA).
+
+Los turnos se guardan en UTC sin zona; los Horario son horas de reloj locales
+("Lunes 09:00–13:00"). Todo lo que compara unos con otros convierte acá.
+"""
+from datetime import datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from app.config import get_settings
+
+
+@lru_cache(maxsize=None)
+def _zona(nombre: str) -> ZoneInfo:
+    return ZoneInfo(nombre)
+
+
+def zona() -> ZoneInfo:
+    return _zona(get_settings().agenda.zona_horaria)
+
+
+def a_local(dt: datetime) -> datetime:
+    """UTC sin zona → hora de reloj local sin zona."""
+    return dt.replace(tzinfo=timezone.utc).astimezone(zona()).replace(tzinfo=None)
+
+
+def a_utc(dt: datetime) -> datetime:
+    """Hora de reloj local sin zona → UTC sin zona."""
+    return dt.replace(tzinfo=zona()).astimezone(timezone.utc).replace(tzinfo=None)
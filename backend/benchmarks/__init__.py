@@ -0,0 +1 @@
+# Benchmarks y pruebas de carga. Se corren desde backend/:  python -m benchmarks.<modulo>
@@ -0,0 +1,72 @@
+# benchmarks/arranque.py
+"""
+Tiempo de arranque: import de app.main y tiempo hasta la primera respuesta.
+
+    python -m benchmarks.arranque --repeticiones 5
+
+Cada medición corre en un proceso nuevo (como un worker recién lanzado):
+  - import      : `import app.main` (arma la app, sin tocar la DB)
+  - 1er request : import + lifespan (migraciones) + GET /servicios/
+Se mide con la DB vacía (primer deploy) y ya migrada (spawn de un worker más).
+También lista qué módulos pesados quedaron cargados después del import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HIJO = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+t_import = time.perf_counter() - t0
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/servicios/")
+t_total = time.perf_counter() - t0
+pesados = [m for m in ("bcrypt", "email_validator", "aiosqlite", "orjson") if m in sys.modules]
+print(json.dumps({"import": t_import, "primer_request": t_total, "cargados": pesados}))
+"""
+
+
+def medir(db_url: str) -> dict:
+    entorno = {**os.environ, "DATABASE_URL": db_url}
+    salida = subprocess.run(
+        [sys.executable, "-c", HIJO], env=entorno, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def resumen(nombre: str, medidas: list) -> None:
+    for clave in ("import", "primer_request"):
+        valores = [m[clave] * 1000 for m in medidas]
+        print(
+            f"  {nombre:<12} {clave:<15} mediana={statistics.median(valores):7.1f} ms "
+            f"min={min(valores):7.1f} ms"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp()
+    vacias = [medir(f"sqlite:///{tmp}/vacia{i}.db") for i in range(args.repeticiones)]
+    migrada = f"sqlite:///{tmp}/migrada.db"
+    medir(migrada)  # la deja migrada
+    migradas = [medir(migrada) for _ in range(args.repeticiones)]
+
+    print(f"arranque ({args.repeticiones} procesos por caso):")
+    resumen("DB vacía", vacias)
+    resumen("DB migrada", migradas)
+    print(f"  módulos opcionales cargados tras el 1er request: {migradas[-1]['cargados']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# benchmarks/carga.py
+"""
+Prueba de carga en proceso (httpx + ASGITransport) sobre datos de benchmarks/datos.py.
+
+    python -m benchmarks.carga --db /tmp/chica.db --escala chica --segundos 30
+    python -m benchmarks.carga --db /tmp/chica.db --mezcla catalogo=6,reservar=1 \\
+        --comparar benchmarks/resultados/carga-20261018-101500.json
+
+Si `--db` no existe se genera con `--escala`/`--semilla` (y queda para la próxima).
+La corrida trabaja sobre una copia: la DB base no cambia entre corridas.
+
+`--concurrencia` usuarios virtuales eligen escenarios según `--mezcla` (pesos):
+  catalogo        listado de emprendedores → servicios por código → detalle de servicio
+  disponibilidad  slots libres de un servicio para la semana
+  reservar        turnos disponibles → POST /reservas/ → (a veces) cancelar
+  mis_turnos      agenda del emprendedor + próximas reservas de un cliente
+  login           POST /usuarios/login (usar BCRYPT_ROUNDS igual al de la generación)
+
+Reporta req/s y p50/p95/p99 por endpoint y guarda todo en JSON (`--salida`) junto
+con la config de la corrida, para comparar entre commits o settings.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from benchmarks.login import percentil
+
+RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados")
+MEZCLA = "catalogo=5,disponibilidad=2,reservar=2,mis_turnos=2,login=1"
+
+
+class Medidor:
+    """Latencias (ms) y errores por endpoint (nombre de la ruta, no la URL)."""
+
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(int)
+        self.activo = False
+
+    async def pedir(self, client, nombre, metodo, url, esperados=(200,), **kwargs):
+        t0 = time.perf_counter()
+        resp = await client.request(metodo, url, **kwargs)
+        if self.activo:
+            self.latencias[nombre].append((time.perf_counter() - t0) * 1000)
+            if resp.status_code not in esperados:
+                self.errores[nombre] += 1
+        return resp
+
+    def resumen(self, segundos):
+        endpoints = {}
+        for nombre in sorted(self.latencias):
+            lat = self.latencias[nombre]
+            endpoints[nombre] = {
+                "n": len(lat),
+                "errores": self.errores[nombre],
+                "rps": round(len(lat) / segundos, 1),
+                "p50_ms": round(percentil(lat, 50), 2),
+                "p95_ms": round(percentil(lat, 95), 2),
+                "p99_ms": round(percentil(lat, 99), 2),
+                "max_ms": round(max(lat), 2),
+            }
+        total = sum(e["n"] for e in endpoints.values())
+        return {
+            "requests": total,
+            "errores": sum(e["errores"] for e in endpoints.values()),
+            "rps": round(total / segundos, 1),
+        }, endpoints
+
+
+# =========================
+# Escenarios
+# =========================
+# `ctx`: tamaños de la DB (ids contiguos desde 1, ver benchmarks/datos.py)
+def _cliente(rng, ctx):
+    return ctx["emprendedores"] + 1 + rng.randrange(ctx["clientes"])
+
+
+def _servicio_de(rng, ctx, e):
+    # servicio s pertenece al emprendedor ((s-1) % n_emp) + 1
+    por_emp = max(1, ctx["servicios"] // ctx["emprendedores"])
+    return e + rng.randrange(por_emp) * ctx["emprendedores"]
+
+
+async def catalogo(m, client, rng, ctx):
+    await m.pedir(client, "GET /emprendedores/", "GET", "/emprendedores/", params={"limit": 20})
+    e = 1 + rng.randrange(ctx["emprendedores"])
+    await m.pedir(client, "GET /emprendedores/servicios_por_codigo/{codigo}", "GET",
+                  f"/emprendedores/servicios_por_codigo/E{e:06d}")
+    await m.pedir(client, "GET /servicios/{servicio_id}", "GET", f"/servicios/{_servicio_de(rng, ctx, e)}")
+
+
+async def disponibilidad(m, client, rng, ctx):
+    e = 1 + rng.randrange(ctx["emprendedores"])
+    await m.pedir(client, "GET /emprendedores/{emprendedor_id}/disponibilidad", "GET",
+                  f"/emprendedores/{e}/disponibilidad", params={"servicio_id": _servicio_de(rng, ctx, e)})
+
+
+async def reservar(m, client, rng, ctx):
+    s = 1 + rng.randrange(ctx["servicios"])
+    resp = await m.pedir(client, "GET /servicios/{servicio_id}/turnos/disponibles", "GET",
+                         f"/servicios/{s}/turnos/disponibles", params={"limit": 20})
+    turnos = resp.json() if resp.status_code == 200 else []
+    if not turnos:
+        return
+    # 400 = sin lugar o ya reservado: respuesta válida bajo carga, no error
+    resp = await m.pedir(client, "POST /reservas/", "POST", "/reservas/", esperados=(200, 400),
+                         json={"turno_id": rng.choice(turnos)["id"], "usuario_id": _cliente(rng, ctx)})
+    if resp.status_code == 200 and rng.random() < 0.5:
+        await m.pedir(client, "DELETE /reservas/{reserva_id}", "DELETE", f"/reservas/{resp.json()['id']}")
+
+
+async def mis_turnos(m, client, rng, ctx):
+    from app.auth import create_access_token
+
+    e = 1 + rng.randrange(ctx["emprendedores"])
+    token = create_access_token({"sub": e, "username": f"u{e}", "rol": "emprendedor"})
+    await m.pedir(client, "GET /turnos/mis-turnos", "GET", "/turnos/mis-turnos",
+                  headers={"Authorization": f"Bearer {token}"})
+    await m.pedir(client, "GET /usuarios/{usuario_id}/reservas", "GET",
+                  f"/usuarios/{_cliente(rng, ctx)}/reservas", params={"cuando": "proximas"})
+
+
+async def login(m, client, rng, ctx):
+    from benchmarks.datos import CLAVE
+
+    await m.pedir(client, "POST /usuarios/login", "POST", "/usuarios/login",
+                  json={"username": f"u{_cliente(rng, ctx)}", "password": CLAVE})
+
+
+ESCENARIOS = {f.__name__: f for f in (catalogo, disponibilidad, reservar, mis_turnos, login)}
+
+
+def parsear_mezcla(texto):
+    pesos = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        nombre = nombre.strip()
+        if nombre not in ESCENARIOS:
+            raise SystemExit(f"Escenario desconocido: {nombre} (hay: {', '.join(ESCENARIOS)})")
+        pesos[nombre] = float(peso or 1)
+    return pesos
+
+
+# =========================
+# Corrida
+# =========================
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, anterior_path):
+    with open(anterior_path, encoding="utf-8") as f:
+        anterior = json.load(f)
+    print(f"\nvs. {anterior_path} (commit {anterior.get('commit')})")
+    print(f"{'endpoint':55} {'req/s':>16} {'p95 ms':>18}")
+    for nombre, e in actual["endpoints"].items():
+        a = anterior["endpoints"].get(nombre)
+        if not a:
+            print(f"{nombre:55} (nuevo)")
+            continue
+        print(f"{nombre:55} {a['rps']:>7} → {e['rps']:<7} {a['p95_ms']:>8} → {e['p95_ms']:<8}")
+
+
+def main(argv=None) -> int:
+    from benchmarks import datos
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True, help="DB generada (se crea si no existe)")
+    parser.add_argument("--escala", choices=sorted(datos.ESCALAS), default="chica")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--mezcla", default=MEZCLA)
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--segundos", type=float, default=20)
+    parser.add_argument("--calentamiento", type=float, default=2, help="segundos sin medir al arrancar")
+    parser.add_argument("--salida", help="JSON de resultados (default: benchmarks/resultados/carga-<fecha>.json)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args(argv)
+    pesos = parsear_mezcla(args.mezcla)
+
+    # Antes de importar app: el engine global se arma con DATABASE_URL al importar
+    copia = os.path.join(tempfile.mkdtemp(), "carga.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{copia}"
+    os.environ.setdefault("API_METRICS", "1")  # la corrida se mide con el middleware puesto
+    if not os.path.exists(args.db):
+        print(f"Generando {args.db} (escala {args.escala})…", file=sys.stderr)
+    datos.preparar(args.db, datos.ESCALAS[args.escala], args.semilla)
+    shutil.copyfile(args.db, copia)
+
+    import httpx
+    from sqlalchemy import func
+    from app import database, models
+    from app.config import get_settings
+    from app.main import app
+
+    with database.SessionLocal() as db:
+        ctx = {
+            "emprendedores": db.query(func.max(models.Emprendedor.id)).scalar(),
+            "servicios": db.query(func.max(models.Servicio.id)).scalar(),
+            "clientes": db.query(func.count(models.Usuario.id)).scalar()
+            - db.query(func.count(models.Emprendedor.id)).scalar(),
+            "turnos": db.query(func.count(models.Turno.id)).scalar(),
+            "reservas": db.query(func.count(models.Reserva.id)).scalar(),
+        }
+
+    medidor = Medidor()
+    nombres, ponderaciones = list(pesos), list(pesos.values())
+
+    async def correr():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://carga", timeout=60) as client:
+            inicio = time.perf_counter()
+            medir_desde = inicio + args.calentamiento
+            fin = medir_desde + args.segundos
+
+            async def usuario_virtual(n):
+                rng = random.Random(args.semilla * 1000 + n)
+                while time.perf_counter() < fin:
+                    medidor.activo = time.perf_counter() >= medir_desde
+                    escenario = ESCENARIOS[rng.choices(nombres, ponderaciones)[0]]
+                    await escenario(medidor, client, rng, ctx)
+
+            await asyncio.gather(*[usuario_virtual(n) for n in range(args.concurrencia)])
+
+    asyncio.run(correr())
+    total, endpoints = medidor.resumen(args.segundos)
+
+    cfg = get_settings()
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "datos": {"db": os.path.abspath(args.db), "semilla": args.semilla, **ctx},
+        "corrida": {
+            "mezcla": pesos, "concurrencia": args.concurrencia,
+            "segundos": args.segundos, "calentamiento": args.calentamiento,
+        },
+        "settings": {
+            "db_async": cfg.database.async_mode,
+            "fast_json": cfg.api.fast_json,
+            "metrics": cfg.api.metrics,
+            "response_cache": cfg.cache.response_backend,
+            "bcrypt_rounds": cfg.auth.bcrypt_rounds,
+        },
+        "total": total,
+        "endpoints": endpoints,
+    }
+
+    print(f"{'endpoint':55} {'n':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for nombre, e in endpoints.items():
+        print(f"{nombre:55} {e['n']:>7} {e['errores']:>5} {e['rps']:>8} "
+              f"{e['p50_ms']:>8} {e['p95_ms']:>8} {e['p99_ms']:>8}")
+    print(f"\ntotal: {total['requests']} requests, {total['rps']} req/s, {total['errores']} errores")
+
+    salida = args.salida or os.path.join(RESULTADOS, f"carga-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"resultados: {salida}")
+
+    if args.comparar:
+        comparar(resultado, args.comparar)
+    shutil.rmtree(os.path.dirname(copia), ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# benchmarks/datos.py
+"""
+Generador determinístico de datos sintéticos con el esquema de app/models.py.
+
+    python -m benchmarks.datos --escala chica --db benchmarks/carga.db
+    python -m benchmarks.datos --escala grande --db /tmp/grande.db      # ~7M filas
+
+Misma escala + misma semilla → misma DB, fila por fila (sirve para comparar
+corridas entre commits). Se inserta con Core en lotes (executemany), sin ORM.
+
+Forma de los datos:
+  - cada emprendedor: un usuario, código `E000042`, horario 08–20 todos los días;
+  - servicios repartidos entre emprendedores; turnos de 30 min, sin superponerse
+    dentro del emprendedor, entre -30 y +60 días de hoy y dentro del horario;
+  - reservas por turno ≤ capacidad, usuarios distintos por turno (uq_turno_usuario),
+    `ocupados` consistente y estadisticas_diarias reconstruida al final.
+Todos los usuarios tienen la contraseña CLAVE (hash con BCRYPT_ROUNDS).
+"""
+import argparse
+import os
+import random
+import sys
+import time as reloj
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+CLAVE = "bench1234"
+DIAS = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo")
+LOTE = 50_000
+SLOTS_POR_DIA = 24  # 08:00–20:00 cada 30 min
+VENTANA_DIAS = 90   # de -30 a +60 días
+
+
+@dataclass(frozen=True)
+class Escala:
+    emprendedores: int
+    servicios: int
+    turnos: int
+    reservas: int
+    clientes: int
+
+
+ESCALAS = {
+    "mini": Escala(emprendedores=20, servicios=100, turnos=2_000, reservas=5_000, clientes=500),
+    "chica": Escala(emprendedores=200, servicios=2_000, turnos=40_000, reservas=100_000, clientes=5_000),
+    "media": Escala(emprendedores=2_000, servicios=20_000, turnos=400_000, reservas=1_000_000, clientes=20_000),
+    "grande": Escala(emprendedores=10_000, servicios=100_000, turnos=2_000_000, reservas=5_000_000, clientes=50_000),
+}
+
+
+def _lotes(filas):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= LOTE:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def generar(engine, escala: Escala, semilla: int = 42, hash_clave: str = "x", hoy: datetime = None) -> dict:
+    """Llena una DB ya migrada y vacía. Devuelve cuántas filas quedaron por tabla."""
+    from sqlalchemy import insert
+    from app import models
+    from app.crud import estadisticas
+
+    rng = random.Random(semilla)
+    # Fecha base fija por día: corridas del mismo día generan lo mismo
+    hoy = (hoy or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    n_emp, n_cli = escala.emprendedores, escala.clientes
+    conteos = {}
+
+    def cargar(conn, modelo, filas):
+        total = 0
+        for lote in _lotes(filas):
+            conn.execute(insert(modelo), lote)
+            total += len(lote)
+        conteos[modelo.__tablename__] = conteos.get(modelo.__tablename__, 0) + total
+
+    with engine.begin() as conn:
+        # Usuarios 1..n_emp son emprendedores; n_emp+1..n_emp+n_cli, clientes
+        cargar(conn, models.Usuario, (
+            {"id": i, "email": f"u{i}@bench.com", "username": f"u{i}", "password": hash_clave,
+             "rol": "emprendedor" if i <= n_emp else "cliente"}
+            for i in range(1, n_emp + n_cli + 1)
+        ))
+        cargar(conn, models.Emprendedor, (
+            {"id": e, "usuario_id": e, "nombre": f"Emprendedor {e}", "negocio": f"Negocio {e}",
+             "codigo_cliente": f"E{e:06d}", "version": 0}
+            for e in range(1, n_emp + 1)
+        ))
+        cargar(conn, models.Horario, (
+            {"emprendedor_id": e, "dia_semana": dia, "hora_inicio": time(8), "hora_fin": time(20)}
+            for e in range(1, n_emp + 1) for dia in DIAS
+        ))
+        # Servicio s → emprendedor ((s-1) % n_emp) + 1: todos tienen más o menos lo mismo
+        cargar(conn, models.Servicio, (
+            {"id": s, "emprendedor_id": (s - 1) % n_emp + 1, "nombre": f"Servicio {s}",
+             "duracion": 30, "precio": float(rng.randrange(5, 100) * 100)}
+            for s in range(1, escala.servicios + 1)
+        ))
+
+        proporcion = escala.reservas / max(escala.turnos, 1)
+        slots = [0] * (n_emp + 1)  # próximo slot libre de cada emprendedor
+        por_emprendedor = -(-escala.turnos // n_emp)
+        paso = max(1, VENTANA_DIAS * SLOTS_POR_DIA // por_emprendedor)
+        ocupados_por_turno = []
+
+        def turnos():
+            for t in range(1, escala.turnos + 1):
+                s = (t - 1) % escala.servicios + 1
+                e = (s - 1) % n_emp + 1
+                # slots distintos dentro del emprendedor, repartidos en la ventana
+                dia, resto = divmod(slots[e] * paso, SLOTS_POR_DIA)
+                slots[e] += 1
+                inicio = hoy + timedelta(days=dia - 30, hours=8, minutes=30 * resto)
+                capacidad = rng.randint(2, 10)
+                ocupados = min(capacidad, int(rng.random() * 2 * proporcion + 0.5), n_cli)
+                ocupados_por_turno.append(ocupados)
+                yield {
+                    "id": t, "servicio_id": s, "fecha_hora_inicio": inicio,
+                    "fecha_hora_fin": inicio + timedelta(minutes=30), "duracion_minutos": 30,
+                    "capacidad": capacidad, "ocupados": ocupados, "precio": None,
+                }
+
+        cargar(conn, models.Turno, turnos())
+
+        def reservas():
+            for t, ocupados in enumerate(ocupados_por_turno, start=1):
+                if not ocupados:
+                    continue
+                # usuarios distintos dentro del turno: arranque al azar y paso fijo
+                base = rng.randrange(n_cli)
+                for k in range(ocupados):
+                    yield {"turno_id": t, "usuario_id": n_emp + 1 + (base + k * 7919) % n_cli}
+
+        cargar(conn, models.Reserva, reservas())
+        estadisticas.reconstruir_en(conn)
+    return conteos
+
+
+def preparar(db_path: str, escala: Escala, semilla: int = 42) -> dict:
+    """Migra y genera `db_path` si no existe; si existe, la reusa tal cual."""
+    from sqlalchemy import create_engine
+    from app import migrations
+    from app.config import get_settings
+    from app.utils import passwords
+
+    nueva = not os.path.exists(db_path)
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        if not nueva:
+            return {}
+        migrations.migrar(engine)
+        hash_clave = passwords._hashear(CLAVE, get_settings().auth.bcrypt_rounds)
+        return generar(engine, escala, semilla, hash_clave)
+    finally:
+        engine.dispose()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="chica")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--db", required=True, help="archivo SQLite a crear (no se pisa si existe)")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.db):
+        print(f"{args.db} ya existe; borralo para regenerar", file=sys.stderr)
+        return 1
+    t0 = reloj.perf_counter()
+    conteos = preparar(args.db, ESCALAS[args.escala], args.semilla)
+    for tabla, n in conteos.items():
+        print(f"{tabla:15} {n:>10,}")
+    print(f"{reloj.perf_counter() - t0:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
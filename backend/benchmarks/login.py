@@ -0,0 +1,91 @@
+# benchmarks/login.py
+"""
+Logins en ráfaga vs. latencia del resto de la API.
+
+    python -m benchmarks.login --usuarios 50 --concurrencia 32 --segundos 10
+
+Mientras `--concurrencia` clientes hacen POST /usuarios/login en loop, una sonda
+pega a GET /servicios/ sin parar. Reporta logins/s y p50/p99 de la sonda.
+Correr con distintos PASSWORD_HASH_WORKERS / PASSWORD_HASH_EXECUTOR /
+BCRYPT_ROUNDS para comparar (y contra un commit anterior para ver la mejora).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    orden = sorted(valores)
+    return orden[min(len(orden) - 1, int(round(p / 100 * (len(orden) - 1))))]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--usuarios", type=int, default=50)
+    parser.add_argument("--concurrencia", type=int, default=32)
+    parser.add_argument("--segundos", type=float, default=10)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp}/login.db")
+
+    import httpx
+    from app import database, migrations, models
+    from app.main import app
+    from app.utils import passwords
+
+    migrations.migrar(database.engine)
+    hash_comun = passwords._hashear("secreto123", database.get_settings().auth.bcrypt_rounds)
+    db = database.SessionLocal()
+    db.add_all(
+        models.Usuario(email=f"u{i}@bench.com", username=f"u{i}", password=hash_comun)
+        for i in range(args.usuarios)
+    )
+    db.commit()
+    db.close()
+
+    async def correr():
+        logins = 0
+        sonda = []
+        fin = time.perf_counter() + args.segundos
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def logueador(n):
+                nonlocal logins
+                while time.perf_counter() < fin:
+                    r = await client.post(
+                        "/usuarios/login",
+                        json={"username": f"u{n % args.usuarios}", "password": "secreto123"},
+                    )
+                    if r.status_code == 200:
+                        logins += 1
+
+            async def sondear():
+                while time.perf_counter() < fin:
+                    t0 = time.perf_counter()
+                    await client.get("/servicios/")
+                    sonda.append((time.perf_counter() - t0) * 1000)
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(sondear(), *[logueador(i) for i in range(args.concurrencia)])
+        return logins, sonda
+
+    logins, sonda = asyncio.run(correr())
+    passwords.cerrar()
+
+    print(f"logins: {logins} en {args.segundos:.0f}s → {logins / args.segundos:.1f}/s")
+    print(
+        f"GET /servicios/ durante la ráfaga: n={len(sonda)} "
+        f"p50={percentil(sonda, 50):.1f}ms p99={percentil(sonda, 99):.1f}ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+# benchmarks/presupuesto_queries.py
+"""
+Presupuesto de queries por endpoint: detecta N+1 antes de que lleguen a prod.
+
+    python -m benchmarks.presupuesto_queries [--chico 4] [--grande 20] [-v]
+
+Cada ruta corre dos veces contra una SQLite en memoria recién sembrada: una con
+`--chico` filas por tabla y otra con `--grande`. Se cuentan los statements que
+llegan al cursor (before_cursor_execute) durante ESE request. Falla (código 1) si:
+  - la ruta supera su presupuesto,
+  - la cantidad de queries crece con las filas (N+1, lazy loads en un loop),
+  - la ruta no responde 2xx,
+  - hay una ruta en la app sin entrada en PRESUPUESTOS (ruta nueva = presupuesto nuevo).
+
+Los caches de proceso (usuarios, códigos, agenda, disponibilidad) se vacían
+antes de cada request: se mide el camino frío. El cache de respuestas va apagado.
+"""
+import argparse
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class Ruta:
+    presupuesto: Optional[int]          # None = no se mide (ver `omitir`)
+    path: Optional[str] = None          # con {placeholders} del contexto; default: el de la ruta
+    json: Optional[Callable[[dict], object]] = None
+    params: dict = field(default_factory=dict)
+    como: str = "duenio"                # a nombre de quién va el token (None = sin token)
+    omitir: Optional[str] = None
+
+
+def _turno(ctx, hora=10, **extra):
+    # lejos de los turnos sembrados y dentro del horario de atención (hora local)
+    from app.utils.zona import a_utc
+
+    inicio = a_utc(datetime.combine(ctx["ahora"].date() + timedelta(days=40), time(hora)))
+    return {"fecha_hora_inicio": inicio.isoformat(), "duracion_minutos": 30, "capacidad": 3, **extra}
+
+
+def _horario(ctx):
+    return {"dia_semana": "Lunes", "hora_inicio": "09:00:00", "hora_fin": "13:00:00"}
+
+
+# Clave: "MÉTODO path" tal cual está declarada la ruta.
+# Los números son los observados al escribir esto; si una ruta necesita más, que
+# sea una decisión explícita (subir el número acá en el mismo commit).
+PRESUPUESTOS = {
+    # --- usuarios ---
+    "POST /usuarios/registro": Ruta(3, json=lambda c: {
+        "username": "nuevo", "password": "clave", "email": "nuevo@test.com"}),
+    "POST /usuarios/login": Ruta(1, json=lambda c: {"username": "duenio", "password": "clave"}),
+    "GET /usuarios/perfil": Ruta(1),
+    "PUT /usuarios/{usuario_id}/activar_emprendedor": Ruta(
+        8, path="/usuarios/{cliente}/activar_emprendedor", como="cliente"),
+    "POST /usuarios/logout": Ruta(0),
+    "GET /usuarios/": Ruta(1),
+    "GET /usuarios/{usuario_id}": Ruta(1, path="/usuarios/{cliente}"),
+    "PUT /usuarios/{usuario_id}": Ruta(3, path="/usuarios/{cliente}", json=lambda c: {
+        "email": "otro@test.com", "username": "otro", "rol": "cliente"}),
+    "DELETE /usuarios/{usuario_id}": Ruta(7, path="/usuarios/{libre}"),
+    # --- emprendedores ---
+    "GET /emprendedores/mi": Ruta(1),
+    "GET /usuarios/me/emprendedor": Ruta(1),
+    "POST /emprendedores/": Ruta(4, json=lambda c: {"usuario_id": c["libre"], "nombre": "Nuevo"}),
+    "GET /emprendedores/": Ruta(1),
+    "GET /emprendedores/{emprendedor_id}": Ruta(1, path="/emprendedores/{eid}"),
+    "PUT /emprendedores/{emprendedor_id}": Ruta(4, path="/emprendedores/{eid}", json=lambda c: {
+        "nombre": "Otro"}),
+    "DELETE /emprendedores/{emprendedor_id}": Ruta(10, path="/emprendedores/{eid}"),
+    "GET /emprendedores/{emprendedor_id}/disponibilidad": Ruta(
+        3, path="/emprendedores/{eid}/disponibilidad",
+        params={"servicio_id": "{sid}", "desde": "{manana}", "hasta": "{semana}"}),
+    "GET /emprendedores/{emprendedor_id}/estadisticas": Ruta(
+        3, path="/emprendedores/{eid}/estadisticas", params={"granularidad": "mes"}),
+    "GET /emprendedores/mi/calendario": Ruta(2),
+    "POST /emprendedores/mi/calendario/rotar": Ruta(5),
+    "GET /emprendedores/{emprendedor_id}/agenda.ics": Ruta(
+        2, path="/emprendedores/{eid}/agenda.ics", params={"token": "{ical_token}"}, como=None),
+    "GET /emprendedores/servicios_por_codigo/{codigo}": Ruta(
+        3, path="/emprendedores/servicios_por_codigo/{codigo}"),
+    # --- horarios ---
+    "PUT /emprendedores/emprendimiento/{emprendimiento_id}": Ruta(
+        None, omitir="versión sync rota (Horario.emprendimiento_id no existe)"),
+    "GET /emprendedores/{emprendedor_id}/horarios": Ruta(2, path="/emprendedores/{eid}/horarios"),
+    "POST /emprendedores/{emprendedor_id}/horarios": Ruta(
+        3, path="/emprendedores/{eid}/horarios", json=_horario),
+    "PUT /emprendedores/horarios/{horario_id}": Ruta(
+        4, path="/emprendedores/horarios/{hid}", json=_horario),
+    "DELETE /emprendedores/horarios/{horario_id}": Ruta(3, path="/emprendedores/horarios/{hid}"),
+    # --- servicios ---
+    "GET /servicios/": Ruta(1),
+    "GET /servicios/mis-servicios": Ruta(3),
+    "GET /emprendedores/{emprendedor_id}/servicios": Ruta(2, path="/emprendedores/{eid}/servicios"),
+    "POST /mis/servicios": Ruta(5, json=lambda c: {"nombre": "Nuevo", "duracion": 30}),
+    "POST /servicios/": Ruta(4, json=lambda c: {
+        "nombre": "Nuevo", "duracion": 30, "emprendedor_id": c["eid"]}),
+    "GET /servicios/{servicio_id}": Ruta(1, path="/servicios/{sid}"),
+    "PUT /servicios/{servicio_id}": Ruta(7, path="/servicios/{sid}", json=lambda c: {
+        "nombre": "Otro", "duracion": 45, "precio": 10}),
+    "DELETE /servicios/{servicio_id}": Ruta(7, path="/servicios/{sid}"),
+    "GET /servicios/{servicio_id}/turnos": Ruta(1, path="/servicios/{sid}/turnos"),
+    "GET /servicios/{servicio_id}/turnos/disponibles": Ruta(
+        1, path="/servicios/{sid}/turnos/disponibles"),
+    # --- turnos ---
+    "GET /turnos/mis-turnos": Ruta(3),
+    "GET /mis/agenda": Ruta(2, params={"desde": "{manana}", "hasta": "{semana}"}),
+    "POST /turnos/": Ruta(10, json=lambda c: _turno(c, servicio_id=c["sid"])),
+    "POST /turnos/bulk": Ruta(9, json=lambda c: {
+        "servicio_id": c["sid"], "turnos": [_turno(c), _turno(c, hora=11)]}),
+    "GET /turnos/": Ruta(1),
+    "GET /turnos/{turno_id}": Ruta(1, path="/turnos/{tid}"),
+    "PUT /turnos/{turno_id}": Ruta(14, path="/turnos/{tid}", json=lambda c: _turno(c, capacidad=99)),
+    "DELETE /turnos/{turno_id}": Ruta(9, path="/turnos/{tid}"),
+    # --- reservas ---
+    "POST /reservas/": Ruta(5, json=lambda c: {"turno_id": c["tid"], "usuario_id": c["libre"]}),
+    "GET /reservas/": Ruta(1),
+    "GET /reservas/{reserva_id}": Ruta(1, path="/reservas/{rid}"),
+    "DELETE /reservas/{reserva_id}": Ruta(6, path="/reservas/{rid}"),
+    "GET /usuarios/{usuario_id}/reservas": Ruta(2, path="/usuarios/{cliente}/reservas"),
+    # --- importación (un JSON = NDJSON de una fila) ---
+    "POST /importar/turnos": Ruta(10, json=lambda c: _turno(c, servicio_id=c["sid"])),
+    "POST /importar/reservas": Ruta(9, json=lambda c: {"turno_id": c["tid"], "usuario_id": c["libre"]}),
+    # --- push (SSE: la respuesta no termina; 1 query al abrir para ubicar el canal) ---
+    "GET /emprendedores/{emprendedor_id}/eventos": Ruta(None, omitir="stream SSE sin fin"),
+    "GET /servicios/{servicio_id}/eventos": Ruta(None, omitir="stream SSE sin fin"),
+    # --- operación ---
+    "GET /metrics": Ruta(0),
+    "GET /cache/respuestas": Ruta(0),
+    "GET /push/estadisticas": Ruta(0),
+}
+
+
+# =========================
+# Datos
+# =========================
+def sembrar(n: int, hash_clave: str) -> dict:
+    """n emprendedores extra, n servicios del dueño con n turnos cada uno, ~3n reservas."""
+    from app import database, models
+    from app.crud import estadisticas
+
+    ahora = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    db = database.SessionLocal()
+    usuarios = [
+        models.Usuario(id=1, email="duenio@test.com", username="duenio", password=hash_clave, rol="emprendedor"),
+        models.Usuario(id=2, email="cliente@test.com", username="cliente", password=hash_clave),
+        models.Usuario(id=3, email="libre@test.com", username="libre", password=hash_clave),
+    ]
+    usuarios += [
+        models.Usuario(id=10 + i, email=f"u{i}@test.com", username=f"u{i}", password=hash_clave, rol="emprendedor")
+        for i in range(n)
+    ]
+    db.add_all(usuarios)
+    db.add(models.Emprendedor(id=1, usuario_id=1, nombre="Dueño", codigo_cliente="PRESU", ical_token="ICS"))
+    db.add_all(
+        models.Emprendedor(id=10 + i, usuario_id=10 + i, nombre=f"E{i}", codigo_cliente=f"C{i}")
+        for i in range(n)
+    )
+    db.add_all(
+        models.Horario(emprendedor_id=1, dia_semana=dia, hora_inicio=time(9), hora_fin=time(18))
+        for dia in ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo")
+    )
+    db.add_all(
+        models.Servicio(id=1 + s, nombre=f"S{s}", duracion=30, precio=10.0, emprendedor_id=1)
+        for s in range(n)
+    )
+    turnos = []
+    for s in range(n):
+        for k in range(n):
+            # uno de cada cuatro en el pasado
+            delta = timedelta(days=1 + k % 10, minutes=30 * (k // 10))
+            inicio = ahora - delta if k % 4 == 3 else ahora + delta
+            turnos.append(models.Turno(
+                id=1 + s * n + k, servicio_id=1 + s, fecha_hora_inicio=inicio,
+                duracion_minutos=30, capacidad=n + 5,
+            ))
+    db.add_all(turnos)
+    db.flush()
+
+    reservas = []
+    # cliente: todos los turnos del servicio 1 y el primero de cada servicio
+    reservas += [(t.id, 2) for t in turnos[:n]]
+    reservas += [(1 + s * n, 2) for s in range(1, n)]
+    # usuarios extra: todos en el turno 1
+    reservas += [(1, 10 + i) for i in range(n)]
+    db.add_all(models.Reserva(turno_id=tid, usuario_id=uid) for tid, uid in reservas)
+    ocupados = {}
+    for tid, _ in reservas:
+        ocupados[tid] = ocupados.get(tid, 0) + 1
+    for t in turnos:
+        t.ocupados = ocupados.get(t.id, 0)
+    db.commit()
+    estadisticas.reconstruir_en(db.connection())
+    db.commit()
+
+    ctx = {
+        "eid": 1, "sid": 1, "tid": 1, "codigo": "PRESU", "ical_token": "ICS",
+        "cliente": 2, "libre": 3,
+        "hid": db.query(models.Horario.id).order_by(models.Horario.id).limit(1).scalar(),
+        "rid": db.query(models.Reserva.id).order_by(models.Reserva.id).limit(1).scalar(),
+        "ahora": ahora,
+        "manana": (ahora + timedelta(days=1)).date().isoformat() + "T00:00:00",
+        "semana": (ahora + timedelta(days=7)).date().isoformat() + "T00:00:00",
+    }
+    db.close()
+    return ctx
+
+
+def vaciar_caches():
+    from app import auth
+    from app.routers import emprendedores
+    from app.utils import agenda, disponibilidad, respuestas
+
+    for cache in (auth._usuarios_cache, emprendedores._codigos, agenda._ventanas, disponibilidad._cache):
+        cache.clear()
+    respuestas.cache.limpiar()
+
+
+# =========================
+# Medición
+# =========================
+class Contador:
+    def __init__(self):
+        self.activo = False
+        self.statements = []
+        event.listen(Engine, "before_cursor_execute", self._contar)
+
+    def _contar(self, conn, cursor, statement, parameters, context, executemany):
+        if self.activo:
+            self.statements.append(statement)
+
+
+def medir(client, contador, settings, metodo, path, ruta, n, hash_clave, tokens):
+    from app import database, migrations
+
+    database.init_engine(settings.database)
+    migrations.migrar(database.engine)
+    ctx = sembrar(n, hash_clave)
+    vaciar_caches()
+
+    url = (ruta.path or path).format(**ctx)
+    params = {k: v.format(**ctx) for k, v in ruta.params.items()}
+    headers = {"Authorization": f"Bearer {tokens[ruta.como]}"} if ruta.como else {}
+    cuerpo = ruta.json(ctx) if ruta.json else None
+
+    contador.statements = []
+    contador.activo = True
+    try:
+        resp = client.request(metodo, url, params=params, json=cuerpo, headers=headers)
+    finally:
+        contador.activo = False
+    return resp.status_code, list(contador.statements)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chico", type=int, default=4)
+    parser.add_argument("--grande", type=int, default=20)
+    parser.add_argument("-v", "--verbose", action="store_true", help="imprime los statements de cada falla")
+    args = parser.parse_args(argv)
+
+    from fastapi.routing import APIRoute
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.config import ApiSettings, AuthenticationSettings, CacheSettings, DatabaseSettings, Settings
+    from app.main import create_app
+    from app.utils import passwords
+
+    settings = Settings(
+        database=DatabaseSettings(url="sqlite:///:memory:", auto_migrate=False),
+        auth=AuthenticationSettings(bcrypt_rounds=4),
+        cache=CacheSettings(response_backend="off"),
+        api=ApiSettings(metrics=True),  # también se miden /metrics y compañía
+    )
+    app = create_app(settings)
+    hash_clave = passwords._hashear("clave", 4)
+    tokens = {
+        "duenio": create_access_token({"sub": 1, "username": "duenio", "rol": "emprendedor"}),
+        "cliente": create_access_token({"sub": 2, "username": "cliente", "rol": "cliente"}),
+    }
+    contador = Contador()
+
+    fallas = 0
+    declaradas = set(PRESUPUESTOS)
+    with TestClient(app) as client:
+        for r in app.routes:
+            if not isinstance(r, APIRoute):
+                continue
+            for metodo in sorted(r.methods - {"HEAD"}):
+                clave = f"{metodo} {r.path}"
+                declaradas.discard(clave)
+                ruta = PRESUPUESTOS.get(clave)
+                if ruta is None:
+                    print(f"FALLA  {clave:58} sin presupuesto declarado")
+                    fallas += 1
+                    continue
+                if ruta.omitir:
+                    print(f"--     {clave:58} omitida: {ruta.omitir}")
+                    continue
+
+                medidas = [
+                    medir(client, contador, settings, metodo, r.path, ruta, n, hash_clave, tokens)
+                    for n in (args.chico, args.grande)
+                ]
+                (st_chico, q_chico), (st_grande, q_grande) = medidas
+                problemas = []
+                for st in (st_chico, st_grande):
+                    if not 200 <= st < 300:
+                        problemas.append(f"status {st}")
+                if len(q_grande) > len(q_chico):
+                    problemas.append(f"crece con las filas ({len(q_chico)} → {len(q_grande)})")
+                if max(len(q_chico), len(q_grande)) > ruta.presupuesto:
+                    problemas.append(f"supera el presupuesto de {ruta.presupuesto}")
+
+                estado = "FALLA " if problemas else "OK    "
+                print(f"{estado} {clave:58} {len(q_chico):>3} / {len(q_grande):>3}  (≤{ruta.presupuesto})"
+                      + (f"  {'; '.join(problemas)}" if problemas else ""))
+                if problemas:
+                    fallas += 1
+                    if args.verbose:
+                        for sql in q_grande:
+                            print("         ", " ".join(sql.split())[:160])
+
+    for clave in sorted(declaradas):
+        print(f"FALLA  {clave:58} en PRESUPUESTOS pero no existe en la app")
+        fallas += 1
+
+    print(f"\n{fallas} falla(s)")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# benchmarks/reservas_concurrentes.py
+"""
+Stress de sobreventa: cientos de POST /reservas/ en paralelo contra UN turno.
+
+    python -m benchmarks.reservas_concurrentes --reservas 500 --capacidad 25
+
+Usa una DB SQLite temporal (en archivo, para que haya concurrencia real entre
+conexiones). Sale con código 1 si se vendieron más lugares que la capacidad o si
+el contador `ocupados` no coincide con las filas de reservas.
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from collections import Counter
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reservas", type=int, default=500)
+    parser.add_argument("--capacidad", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    import httpx
+    from datetime import datetime, timedelta
+    from app import database, migrations, models
+    from app.config import DatabaseSettings, Settings
+    from app.main import create_app
+
+    # Settings propios (no DATABASE_URL): así también corre dentro de pytest,
+    # aunque app.main ya se haya importado con otra base
+    tmp = tempfile.mkdtemp()
+    app = create_app(Settings(database=DatabaseSettings(url=f"sqlite:///{tmp}/stress.db")))
+    migrations.migrar(database.engine)
+    db = database.SessionLocal()
+    db.add_all(
+        models.Usuario(id=i, email=f"u{i}@test.com", username=f"u{i}", password="x")
+        for i in range(1, args.reservas + 1)
+    )
+    db.add(models.Emprendedor(id=1, usuario_id=1, nombre="Stress"))
+    db.add(models.Servicio(id=1, nombre="Clase", duracion=60, emprendedor_id=1))
+    db.add(models.Turno(
+        id=1, servicio_id=1, fecha_hora_inicio=datetime.utcnow() + timedelta(days=1),
+        duracion_minutos=60, capacidad=args.capacidad,
+    ))
+    db.commit()
+    db.close()
+
+    async def disparar():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://stress") as client:
+            return await asyncio.gather(*[
+                client.post("/reservas/", json={"turno_id": 1, "usuario_id": i})
+                for i in range(1, args.reservas + 1)
+            ])
+
+    t0 = time.perf_counter()
+    respuestas = asyncio.run(disparar())
+    dt = time.perf_counter() - t0
+
+    estados = Counter(r.status_code for r in respuestas)
+    db = database.SessionLocal()
+    filas = db.query(models.Reserva).filter(models.Reserva.turno_id == 1).count()
+    ocupados = db.query(models.Turno.ocupados).filter(models.Turno.id == 1).scalar()
+    db.close()
+
+    print(f"{args.reservas} requests en {dt:.2f}s  estados={dict(estados)}")
+    print(f"capacidad={args.capacidad} reservas={filas} ocupados={ocupados}")
+
+    ok = estados[200] == filas == ocupados and filas <= args.capacidad
+    print("OK" if ok else "FALLA: sobreventa o contador desfasado")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
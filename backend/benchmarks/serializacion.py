@@ -0,0 +1,108 @@
+# benchmarks/serializacion.py
+"""
+Listas grandes: camino ORM + response_model vs. camino rápido (API_FAST_JSON).
+
+    python -m benchmarks.serializacion --filas 10000 --repeticiones 5
+
+1) Micro: misma lista de N turnos serializada como lo hace FastAPI (entidades
+   ORM → validación from_attributes → dump a python → json.dumps) y como lo hace
+   utils/serializacion (columnas → .mappings() → TypeAdapter → dump_json).
+2) Punta a punta: GET /servicios/{id}/turnos con el modo apagado y prendido.
+Verifica además que ambos caminos devuelvan el mismo JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+
+def mejor_de(n, fn):
+    tiempos = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return min(tiempos)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, default=10_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp}/serializacion.db")
+
+    from fastapi.testclient import TestClient
+    from pydantic import TypeAdapter
+    from app import database, migrations, models, schemas
+    from app.main import app
+    from app.utils import serializacion
+
+    migrations.migrar(database.engine)
+    db = database.SessionLocal()
+    u = models.Usuario(email="bench@bench.com", username="bench", password="x")
+    db.add(u)
+    db.flush()
+    e = models.Emprendedor(usuario_id=u.id, nombre="Bench")
+    db.add(e)
+    db.flush()
+    s = models.Servicio(nombre="S", duracion=30, emprendedor_id=e.id)
+    db.add(s)
+    db.flush()
+    base = datetime(2030, 1, 1)
+    db.add_all(
+        models.Turno(
+            servicio_id=s.id, fecha_hora_inicio=base + timedelta(minutes=30 * i),
+            duracion_minutos=30, capacidad=1 + i % 5, precio=(i % 7) * 10.0 or None,
+        )
+        for i in range(args.filas)
+    )
+    db.commit()
+    servicio_id = s.id
+    db.close()
+
+    tipo = List[schemas.TurnoResponseCreate]
+    lento = TypeAdapter(tipo)
+
+    def orm():
+        with database.SessionLocal() as sess:
+            objs = sess.query(models.Turno).filter(models.Turno.servicio_id == servicio_id).all()
+            return json.dumps(lento.dump_python(lento.validate_python(objs, from_attributes=True), mode="json")).encode()
+
+    def rapido():
+        with database.SessionLocal() as sess:
+            filas = sess.query(*serializacion.columnas(schemas.TurnoResponseCreate, models.Turno)).filter(
+                models.Turno.servicio_id == servicio_id
+            ).all()
+            return serializacion.respuesta(tipo, serializacion.filas(filas)).body
+
+    assert json.loads(orm()) == json.loads(rapido()), "los caminos devuelven JSON distinto"
+    t_orm = mejor_de(args.repeticiones, orm)
+    t_rap = mejor_de(args.repeticiones, rapido)
+    print(f"micro ({args.filas} filas, mejor de {args.repeticiones}):")
+    print(f"  ORM + from_attributes + json.dumps : {t_orm:8.1f} ms")
+    print(f"  mappings + TypeAdapter.dump_json   : {t_rap:8.1f} ms  (x{t_orm / t_rap:.1f})")
+
+    client = TestClient(app)
+    url = f"/servicios/{servicio_id}/turnos"
+    resultados = {}
+    for modo in (False, True):
+        app.state.fast_json = modo  # lo que fija create_app desde API_FAST_JSON
+        cuerpo = client.get(url).json()
+        resultados[modo] = (cuerpo, mejor_de(args.repeticiones, lambda: client.get(url)))
+    assert resultados[False][0] == resultados[True][0], "la API devuelve JSON distinto según el modo"
+    t_off, t_on = resultados[False][1], resultados[True][1]
+    print(f"GET {url}:")
+    print(f"  API_FAST_JSON=0 : {t_off:8.1f} ms")
+    print(f"  API_FAST_JSON=1 : {t_on:8.1f} ms  (x{t_off / t_on:.1f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+# tests/test_benchmarks.py
+"""
+Los chequeos de benchmarks/ que tienen veredicto (código de salida 0/1), para
+que corran con `python -m pytest` desde backend/:
+
+  - presupuesto_queries: queries por endpoint, sin N+1 (incluye
+    /usuarios/{id}/reservas) y ninguna ruta sin presupuesto.
+  - reservas_concurrentes: sin sobreventa con reservas en paralelo.
+
+Los de tiempos (carga, login, arranque, serializacion) no: dependen de la máquina.
+"""
+from benchmarks import presupuesto_queries, reservas_concurrentes
+
+
+def test_presupuesto_queries():
+    assert presupuesto_queries.main([]) == 0
+
+
+def test_reservas_concurrentes():
+    assert reservas_concurrentes.main([]) == 0
@@ -26,6 +26,7 @@ export default function Calendario({
   turnos = [],
   onSelectEvent = () => {},
   onSelectSlot = () => {},
+  onRangeChange = () => {},
   defaultView = "month",
 }) {
   const [view, setView] = useState(defaultView); // Vista actual
@@ -78,6 +79,7 @@ export default function Calendario({
         date={date}
         onView={(v) => setView(v)}
         onNavigate={(newDate) => setDate(newDate)}
+        onRangeChange={onRangeChange}
         selectable
         onSelectEvent={onSelectEvent}
         onSelectSlot={onSelectSlot}
@@ -1,51 +1,140 @@
-import { useState, useEffect, useMemo, useContext, useCallback } from "react";
+import { useState, useEffect, useMemo, useContext, useCallback, useRef } from "react";
 import api from "../components/api";
 import { UserContext } from "../context/UserContext";
 import moment from "moment";
 
+// Ventana inicial: el mes actual con los bordes que muestra la vista de mes
+const rangoInicial = () => ({
+  desde: moment().startOf("month").startOf("week").toDate(),
+  hasta: moment().endOf("month").endOf("week").toDate(),
+});
+
+// Rango de react-big-calendar (array de días o {start, end}) → { desde, hasta }
+const normalizarRango = (range) => {
+  const dias = Array.isArray(range) ? range : [range.start, range.end];
+  return {
+    desde: moment(dias[0]).startOf("day").toDate(),
+    hasta: moment(dias[dias.length - 1]).endOf("day").toDate(),
+  };
+};
+
+const enRango = (inicioISO, rango) => {
+  const inicio = moment.utc(inicioISO).toDate();
+  return inicio >= rango.desde && inicio < rango.hasta;
+};
+
+// Turno de /mis/agenda → evento, con el servicio anidado como lo usa el calendario
+const deAgenda = (t, serviciosById) => {
+  const s = serviciosById.get(t.servicio_id) || {};
+  return {
+    ...t,
+    servicio: { id: t.servicio_id, nombre: t.servicio_nombre, duracion: s.duracion, precio: s.precio },
+  };
+};
+
+// Delta del server (ver backend/app/utils/push.py) aplicado a la lista de turnos
+const aplicarDelta = (prev, d, serviciosById, rango) => {
+  switch (d.tipo) {
+    case "turno": {
+      if (!enRango(d.inicio, rango)) return prev.filter((e) => e.id !== d.id);
+      const s = serviciosById.get(d.servicio_id) || {};
+      const turno = deAgenda({
+        id: d.id,
+        servicio_id: d.servicio_id,
+        servicio_nombre: s.nombre,
+        fecha_hora_inicio: d.inicio,
+        fecha_hora_fin: d.fin,
+        duracion_minutos: moment.utc(d.fin).diff(moment.utc(d.inicio), "minutes"),
+        capacidad: d.capacidad,
+        reservados: d.capacidad - d.libres,
+      }, serviciosById);
+      return prev.some((e) => e.id === d.id)
+        ? prev.map((e) => (e.id === d.id ? { ...e, ...turno } : e))
+        : [...prev, turno];
+    }
+    case "cupo":
+      return prev.map((e) => (e.id === d.id ? { ...e, reservados: e.capacidad - d.libres } : e));
+    case "baja":
+      return prev.filter((e) => e.id !== d.id);
+    default:
+      return prev;
+  }
+};
+
 export const useTurnos = () => {
   const { user } = useContext(UserContext);
   const [services, setServices] = useState([]);
   const [events, setEvents] = useState([]);
   const [formAdd, setFormAdd] = useState({ servicioId: null });
+  const [emprendedorId, setEmprendedorId] = useState(null);
+  const [rango, setRango] = useState(rangoInicial);
 
   const refreshAllMine = useCallback(async () => {
     try {
       if (!user?.id) return;
 
-      // 1) Mis servicios (nombre, duración, precio, emprendedor_id)
-      const servRes = await api.get("/servicios/mis-servicios");
-      const servicios = servRes.data || [];
-      setServices(servicios);
-
-      // 2) Mis turnos (no necesariamente incluye info del servicio)
-      const turnRes = await api.get("/turnos/mis-turnos");
-      const misTurnos = turnRes.data || [];
-
-      // 3) Join por servicio_id para enriquecer cada turno con nombre/duración/precio
-      const serviciosById = new Map(servicios.map(s => [s.id, s]));
-      const turnosEnriquecidos = misTurnos.map(t => {
-        const s = serviciosById.get(t.servicio_id) || {};
-        return {
-          ...t,
-          servicio: { id: s.id, nombre: s.nombre, duracion: s.duracion, precio: s.precio },
-        };
+      // Servicios + turnos de la ventana visible (con nombre del servicio y reservados),
+      // en un solo request
+      const res = await api.get("/mis/agenda", {
+        params: { desde: rango.desde.toISOString(), hasta: rango.hasta.toISOString() },
       });
+      const { emprendedor_id, servicios = [], turnos = [] } = res.data || {};
+      setEmprendedorId(emprendedor_id);
+      setServices(servicios);
 
-      setEvents(turnosEnriquecidos);
+      const serviciosById = new Map(servicios.map((s) => [s.id, s]));
+      setEvents(turnos.map((t) => deAgenda(t, serviciosById)));
 
       if (!formAdd.servicioId && servicios.length > 0) {
         setFormAdd((prev) => ({ ...prev, servicioId: servicios[0].id }));
       }
     } catch (err) {
-      console.error("Error cargando mis servicios/turnos:", err);
+      console.error("Error cargando mi agenda:", err);
     }
-  }, [user?.id, formAdd.servicioId]);
+  }, [user?.id, formAdd.servicioId, rango]);
+
+  // El calendario avisa qué ventana muestra (onRangeChange)
+  const cambiarRango = useCallback((range) => {
+    const nuevo = normalizarRango(range);
+    setRango((prev) =>
+      prev.desde.getTime() === nuevo.desde.getTime() && prev.hasta.getTime() === nuevo.hasta.getTime()
+        ? prev
+        : nuevo
+    );
+  }, []);
 
   useEffect(() => {
     refreshAllMine();
   }, [refreshAllMine]);
 
+  // =========================
+  // Push (SSE): deltas de mi agenda en vez de volver a pedir todo
+  // =========================
+  const serviciosRef = useRef(new Map());
+  serviciosRef.current = new Map(services.map((s) => [s.id, s]));
+  const refreshRef = useRef(refreshAllMine);
+  refreshRef.current = refreshAllMine;
+  const rangoRef = useRef(rango);
+  rangoRef.current = rango;
+
+  useEffect(() => {
+    if (!emprendedorId) return;
+    const fuente = new EventSource(`${api.defaults.baseURL}/emprendedores/${emprendedorId}/eventos`);
+    let primera = true;
+    fuente.onmessage = (ev) => {
+      const d = JSON.parse(ev.data);
+      if (d.tipo === "resync") {
+        // El primero llega al conectar y recién cargamos; los demás son reconexiones o
+        // cola desbordada en el server: hay que recargar
+        if (!primera) refreshRef.current();
+        primera = false;
+        return;
+      }
+      setEvents((prev) => aplicarDelta(prev, d, serviciosRef.current, rangoRef.current));
+    };
+    return () => fuente.close();
+  }, [emprendedorId]);
+
   // =========================
   // Normalizar eventos
   // =========================
@@ -84,8 +173,9 @@ export const useTurnos = () => {
       precio: serv.precio || 0,
     });
 
-    const nuevoTurno = { ...res.data, servicio: serv };
-    setEvents((prev) => [...prev, nuevoTurno]);
+    const nuevoTurno = { ...res.data, servicio_id: serv.id, reservados: 0, servicio: serv };
+    // el delta del push puede haber llegado antes que la respuesta
+    setEvents((prev) => [...prev.filter((e) => e.id !== nuevoTurno.id), nuevoTurno]);
 
     return res.data;
   };
@@ -107,6 +197,7 @@ export const useTurnos = () => {
     events,
     turnosForCalendar,
     refreshAllMine,
+    cambiarRango,
     addTurno,
     updateTurno,
     deleteTurno,
@@ -27,14 +27,13 @@ export default function EmprendedorForm({ onCreated }) {
     const fetchEmprendedor = async () => {
     setLoading(true);
     try {
-      const res = await api.get("/emprendedores/");
-      // Buscar emprendimiento del usuario logueado
-      const empr = res.data.find((e) => e.usuario?.id === Number(user.id));
+      // Un cliente todavía no tiene emprendimiento (/emprendedores/mi lo crearía)
+      const empr = user.rol === "emprendedor" ? (await api.get("/emprendedores/mi")).data : null;
       if (empr) {
         setFormData({
           nombre: empr.nombre,
-          apellido: empr.apellido,
-          negocio: empr.negocio,
+          apellido: empr.apellido || "",
+          negocio: empr.negocio || "",
           descripcion: empr.descripcion || "",
           codigo_cliente: empr.codigo_cliente || "",
         });
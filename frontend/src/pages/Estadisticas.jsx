@@ -1,6 +1,7 @@
 // src/pages/Estadisticas.jsx
-import React, { useEffect, useRef } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { Chart, registerables } from "chart.js";
+import api from "../components/api";
 
 Chart.register(...registerables);
 
@@ -12,13 +13,15 @@ function StatCard({ title, value, change, icon, iconColor, bgColor }) {
         <div>
           <p className="text-sm font-medium text-gray-600">{title}</p>
           <p className="text-3xl font-bold text-gray-900 mt-2">{value}</p>
-          <div className="flex items-center mt-2">
-            <span className="text-green-600 text-sm font-medium flex items-center">
-              <i className="fas fa-arrow-up mr-1"></i>
-              {change}
-            </span>
-            <span className="text-gray-500 text-sm ml-2">vs last month</span>
-          </div>
+          {change != null && (
+            <div className="flex items-center mt-2">
+              <span className={`${change >= 0 ? "text-green-600" : "text-red-600"} text-sm font-medium flex items-center`}>
+                <i className={`fas ${change >= 0 ? "fa-arrow-up" : "fa-arrow-down"} mr-1`}></i>
+                {Math.abs(change)}%
+              </span>
+              <span className="text-gray-500 text-sm ml-2">vs mes anterior</span>
+            </div>
+          )}
         </div>
         <div className={`w-12 h-12 ${bgColor} rounded-lg flex items-center justify-center`}>
           <i className={`fas ${icon} ${iconColor} text-xl`}></i>
@@ -28,9 +31,36 @@ function StatCard({ title, value, change, icon, iconColor, bgColor }) {
   );
 }
 
+// Variación % del último período contra el anterior (null si no hay base)
+function variacion(periodos, campo) {
+  if (periodos.length < 2) return null;
+  const previo = periodos[periodos.length - 2][campo];
+  const actual = periodos[periodos.length - 1][campo];
+  if (!previo) return null;
+  return Math.round(((actual - previo) / previo) * 100);
+}
+
 export default function Estadisticas() {
   const chartRef = useRef(null);
   const chartInstance = useRef(null);
+  const [stats, setStats] = useState(null);
+
+  useEffect(() => {
+    (async () => {
+      try {
+        const me = await api.get("/emprendedores/mi");
+        const res = await api.get(`/emprendedores/${me.data.id}/estadisticas`, {
+          params: { granularidad: "mes" },
+        });
+        setStats(res.data);
+      } catch (err) {
+        console.error("Error cargando estadísticas:", err);
+      }
+    })();
+  }, []);
+
+  const periodos = stats?.periodos || [];
+  const totales = stats?.totales;
 
   useEffect(() => {
     if (chartRef.current) {
@@ -39,11 +69,11 @@ export default function Estadisticas() {
       chartInstance.current = new Chart(chartRef.current, {
         type: "line",
         data: {
-          labels: ["Jan", "Feb", "Mar", "Apr", "May", "Jun"],
+          labels: periodos.map((p) => p.periodo),
           datasets: [
             {
-              label: "Revenue",
-              data: [1200, 1900, 3000, 2500, 3200, 4000],
+              label: "Ingresos",
+              data: periodos.map((p) => p.ingresos),
               borderColor: "#1e40af",
               backgroundColor: "rgba(30, 64, 175, 0.2)",
               tension: 0.4,
@@ -61,41 +91,40 @@ export default function Estadisticas() {
     return () => {
       if (chartInstance.current) chartInstance.current.destroy();
     };
-  }, []);
+  }, [stats]);
 
   return (
     <div className="p-6">
       {/* Stats Cards */}
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6 mb-8">
         <StatCard
-          title="Total Revenue"
-          value="$48,291"
-          change="12%"
+          title="Ingresos"
+          value={`$${(totales?.ingresos ?? 0).toLocaleString()}`}
+          change={variacion(periodos, "ingresos")}
           icon="fa-dollar-sign"
           iconColor="text-cordes-blue"
           bgColor="bg-cordes-blue bg-opacity-10"
         />
         <StatCard
-          title="Total Users"
-          value="15,847"
-          change="8%"
+          title="Reservas"
+          value={(totales?.reservas ?? 0).toLocaleString()}
+          change={variacion(periodos, "reservas")}
           icon="fa-users"
           iconColor="text-green-600"
           bgColor="bg-green-100"
         />
         <StatCard
-          title="Total Orders"
-          value="2,847"
-          change="15%"
-          icon="fa-shopping-cart"
+          title="Turnos"
+          value={(totales?.turnos ?? 0).toLocaleString()}
+          change={variacion(periodos, "turnos")}
+          icon="fa-calendar"
           iconColor="text-orange-600"
           bgColor="bg-orange-100"
         />
         <StatCard
-          title="Products"
-          value="1,247"
-          change="5%"
-          icon="fa-box"
+          title="Ocupación"
+          value={`${Math.round((totales?.ocupacion ?? 0) * 100)}%`}
+          icon="fa-chart-pie"
           iconColor="text-purple-600"
           bgColor="bg-purple-100"
         />
@@ -103,7 +132,7 @@ export default function Estadisticas() {
 
       {/* Chart Example */}
       <div className="bg-white rounded-xl shadow-sm border border-gray-200 p-6 h-96">
-        <h3 className="text-lg font-semibold text-gray-900 mb-4">Revenue Analytics</h3>
+        <h3 className="text-lg font-semibold text-gray-900 mb-4">Ingresos por mes</h3>
         <canvas ref={chartRef}></canvas>
       </div>
     </div>
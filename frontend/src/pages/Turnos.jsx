@@ -37,6 +37,7 @@ export default function Turnos() {
     deleteTurno,
     normalizeEvent,
     refreshServices,
+    cambiarRango,
   } = useTurnos();
 
   // ==============================
@@ -178,7 +179,7 @@ export default function Turnos() {
 
       {/* Calendario */}
       <main className="bg-white p-4 rounded-xl shadow-md">
-        <Calendario turnos={turnosForCalendar} onSelectEvent={onSelectEvent} onSelectSlot={onSelectSlot} defaultView="week"/>
+        <Calendario turnos={turnosForCalendar} onSelectEvent={onSelectEvent} onSelectSlot={onSelectSlot} onRangeChange={cambiarRango} defaultView="week"/>
       </main>
 
       {/* Sidebar */}